@@ -0,0 +1,37 @@
+"""
+AMMM Project
+Benchmark main function
+Eloy Marín, Pablo Pazos
+"""
+
+import sys
+from argparse import ArgumentParser
+
+from AMMMGlobals import AMMMException
+from Benchmark.benchmarkRunner import BenchmarkRunner
+from Benchmark.ValidateConfig import ValidateConfig
+from Heuristics.datParser import DATParser
+
+
+def run(configFile):
+    try:
+        print("AMMM Benchmark")
+        print("--------------")
+        print("Reading Config file %s..." % configFile)
+        config = DATParser.parse(configFile)
+        ValidateConfig.validate(config)
+        print("Running benchmark...")
+        results = BenchmarkRunner(config).run()
+        jsonFile, csvFile = BenchmarkRunner.writeResults(results, config.resultsDirectory)
+        print("Results written to %s and %s" % (jsonFile, csvFile))
+        return 0
+    except AMMMException as e:
+        print("Exception: %s" % e)
+        return 1
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='AMMM Lab Project - benchmark of the heuristics')
+    parser.add_argument('-c', '--configFile', type=str, default='config/config.dat')
+    args = parser.parse_args()
+    sys.exit(run(args.configFile))
@@ -0,0 +1,95 @@
+"""
+AMMM Project
+Benchmark config attributes validator.
+Eloy Marín, Pablo Pazos
+"""
+
+import os
+
+from AMMMGlobals import AMMMException
+from Benchmark.benchmarkRunner import SOLVERS
+
+
+class ValidateConfig(object):
+    # Validate config attributes read from a DAT file.
+    @staticmethod
+    def validate(data):
+        # Validate that mandatory input parameters were found
+        paramList = ['solverConfigFile', 'instancesDirectory', 'resultsDirectory', 'solvers', 'repetitions',
+                     'maxExecTime']
+        for paramName in paramList:
+            if paramName not in data.__dict__:
+                raise AMMMException('Parameter(%s) has not been not specified in Configuration' % str(paramName))
+
+        solverConfigFile = data.solverConfigFile
+        if not os.path.exists(solverConfigFile):
+            raise AMMMException('solverConfigFile(%s) does not exist' % solverConfigFile)
+
+        instancesDirectory = data.instancesDirectory
+        if not os.path.isdir(instancesDirectory):
+            raise AMMMException('Directory(%s) does not exist' % instancesDirectory)
+
+        resultsDirectory = data.resultsDirectory
+        if len(resultsDirectory) == 0: raise AMMMException('Value for resultsDirectory is empty')
+
+        # Validate instances, by default every instance of instancesDirectory
+        if 'instances' in data.__dict__:
+            data.instances = [str(instance) for instance in data.instances]
+            for instance in data.instances:
+                if not os.path.exists(os.path.join(instancesDirectory, instance)):
+                    raise AMMMException('Instance(%s) does not exist in %s' % (instance, instancesDirectory))
+        else:
+            data.instances = None
+
+        data.solvers = [str(solver) for solver in data.solvers]
+        for solver in data.solvers:
+            if solver not in SOLVERS:
+                raise AMMMException('Unsupported solver(%s). Supported: %s' % (solver, ' / '.join(SOLVERS)))
+
+        repetitions = data.repetitions
+        if not isinstance(repetitions, int) or isinstance(repetitions, bool) or (repetitions <= 0):
+            raise AMMMException('repetitions(%s) has to be a positive integer value.' % str(repetitions))
+
+        maxExecTime = data.maxExecTime
+        if not isinstance(maxExecTime, (int, float)) or isinstance(maxExecTime, bool) or (maxExecTime <= 0):
+            raise AMMMException('maxExecTime(%s) has to be a positive value.' % str(maxExecTime))
+
+        # Validate maxIterations
+        maxIterations = None
+        if 'maxIterations' in data.__dict__:
+            maxIterations = data.maxIterations
+            if not isinstance(maxIterations, int) or isinstance(maxIterations, bool) or (maxIterations <= 0):
+                raise AMMMException('maxIterations(%s) has to be a positive integer value.' % str(maxIterations))
+        else:
+            data.maxIterations = maxIterations
+
+        # Validate seed
+        seed = 0
+        if 'seed' in data.__dict__:
+            seed = data.seed
+            if not isinstance(seed, int) or isinstance(seed, bool) or (seed < 0):
+                raise AMMMException('seed(%s) has to be a non-negative integer value.' % str(seed))
+        else:
+            data.seed = seed
+
+        # Validate targetGap
+        targetGap = 0
+        if 'targetGap' in data.__dict__:
+            targetGap = data.targetGap
+            if not isinstance(targetGap, (int, float)) or isinstance(targetGap, bool) or (targetGap < 0):
+                raise AMMMException('targetGap(%s) has to be a non-negative value.' % str(targetGap))
+        else:
+            data.targetGap = targetGap
+
+        # Validate referencesFile
+        if 'referencesFile' in data.__dict__:
+            if not os.path.exists(data.referencesFile):
+                raise AMMMException('referencesFile(%s) does not exist' % data.referencesFile)
+        else:
+            data.referencesFile = None
+
+        # Validate label, by default the current version of the code
+        if 'label' in data.__dict__:
+            data.label = str(data.label)
+        else:
+            data.label = None
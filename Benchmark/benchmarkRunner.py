@@ -0,0 +1,194 @@
+"""
+AMMM Project
+Benchmark runner: solves a set of instances with a matrix of solvers
+Eloy Marín, Pablo Pazos
+"""
+
+import csv
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+
+import numpy as np
+
+from AMMMGlobals import AMMMException
+from Heuristics.binaryInstance import BinaryInstanceParser
+from Heuristics.datParser import DATParser
+from Heuristics.problem.instance import Instance
+from Heuristics.solvers.solver_BRKGA import Solver_BRKGA
+from Heuristics.solvers.solver_GRASP import Solver_GRASP
+from Heuristics.solvers.solver_Greedy import Solver_Greedy
+from Heuristics.validateInputDataProject import ValidateInputData
+from Heuristics.ValidateConfig import ValidateConfig
+
+# Solver matrix: solver parameters that override the solver configuration file for each benchmarked solver
+SOLVERS = {
+    'Greedy': {'solver': 'Greedy', 'localSearch': False},
+    'Greedy_LS_First': {'solver': 'Greedy', 'localSearch': True, 'policy': 'FirstImprovement'},
+    'Greedy_LS_Best': {'solver': 'Greedy', 'localSearch': True, 'policy': 'BestImprovement'},
+    'GRASP': {'solver': 'GRASP', 'localSearch': False},
+    'GRASP_LS_First': {'solver': 'GRASP', 'localSearch': True, 'policy': 'FirstImprovement'},
+    'GRASP_LS_Best': {'solver': 'GRASP', 'localSearch': True, 'policy': 'BestImprovement'},
+    'BRKGA': {'solver': 'BRKGA', 'localSearch': False},
+}
+SOLVER_CLASSES = {'Greedy': Solver_Greedy, 'GRASP': Solver_GRASP, 'BRKGA': Solver_BRKGA}
+
+INSTANCE_EXTENSIONS = ('.dat', '.inst')
+CSV_FIELDS = ['instance', 'solver', 'repetition', 'seed', 'feasible', 'objective', 'wallTime', 'timeToTarget',
+              'target', 'reference', 'referenceSource', 'gap']
+
+
+# Best known objectives. The references file is a DAT file with the vectors instances, objectives and,
+# optionally, times (time the reference solver took).
+def readReferences(referencesFile):
+    if referencesFile is None:
+        return {}
+    data = DATParser.parse(referencesFile)
+    for paramName in ['instances', 'objectives']:
+        if paramName not in data.__dict__:
+            raise AMMMException('Parameter(%s) not contained in references file %s' % (paramName, referencesFile))
+    times = data.__dict__.get('times', [None] * len(data.instances))
+    source = str(data.__dict__.get('source', 'reference'))
+    if not (len(data.instances) == len(data.objectives) == len(times)):
+        raise AMMMException('instances, objectives and times of %s have different sizes' % referencesFile)
+    return {str(name): {'objective': float(objective), 'time': time_, 'source': source}
+            for name, objective, time_ in zip(data.instances, data.objectives, times)}
+
+
+# Version of the code being benchmarked, so the results of different versions can be told apart
+def codeVersion():
+    try:
+        return subprocess.check_output(['git', 'describe', '--always', '--dirty'], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+# Time at which the trace <time, objective> first reaches an objective <= target, None if it never does
+def timeToTarget(trace, target):
+    for elapsedTime, objective in trace:
+        if objective <= target:
+            return elapsedTime
+    return None
+
+
+class BenchmarkRunner(object):
+    def __init__(self, config):
+        self.config = config
+        self.references = readReferences(config.referencesFile)
+
+    def instanceFiles(self):
+        directory = self.config.instancesDirectory
+        names = self.config.instances
+        if names is None:
+            names = sorted(name for name in os.listdir(directory) if name.endswith(INSTANCE_EXTENSIONS))
+        return [os.path.join(directory, name) for name in names]
+
+    # Solver configuration of a solver of the matrix for an instance
+    def solverConfig(self, solverName, instanceFile):
+        config = DATParser.parse(self.config.solverConfigFile)
+        config.__dict__.update(SOLVERS[solverName])
+        config.inputDataFile = instanceFile
+        config.solutionFile = os.path.join(self.config.resultsDirectory, 'solution.sol')
+        config.verbose = False
+        config.maxExecTime = self.config.maxExecTime
+        if self.config.maxIterations is not None:
+            config.maxIterations = self.config.maxIterations
+        ValidateConfig.validate(config)
+        return config
+
+    # Solve the instance once. Returns the run without reference data (see _addReferences).
+    def runOnce(self, config, instance, solverName, repetition):
+        config.seed = self.config.seed + repetition
+        random.seed(config.seed)
+        solver = SOLVER_CLASSES[config.solver](config, instance)
+        startTime = time.perf_counter()
+        try:
+            solution = solver.solve()
+            feasible = solution.isFeasible()
+        except AMMMException:
+            feasible = False
+        wallTime = time.perf_counter() - startTime
+
+        trace = [[record[1], record[2]] for record in solver.trace.records]
+        objective = solution.cost if feasible else None
+        return {'instance': os.path.splitext(os.path.basename(config.inputDataFile))[0], 'solver': solverName,
+                'repetition': repetition, 'seed': config.seed, 'feasible': feasible, 'objective': objective,
+                'wallTime': wallTime, 'trace': trace if feasible else []}
+
+    def run(self):
+        runs = []
+        instanceTimes = {}
+        for instanceFile in self.instanceFiles():
+            if BinaryInstanceParser.isBinaryFile(instanceFile):
+                data = BinaryInstanceParser.parse(instanceFile)
+            else:
+                data = DATParser.parse(instanceFile)
+            ValidateInputData.validate(data)
+
+            # the solvers only override solver parameters, the precomputed instance is shared by all of them
+            configs = [self.solverConfig(solverName, instanceFile) for solverName in self.config.solvers]
+            startTime = time.perf_counter()
+            instance = Instance(configs[0], data)
+            instanceTimes[os.path.basename(instanceFile)] = time.perf_counter() - startTime
+
+            for solverName, config in zip(self.config.solvers, configs):
+                for repetition in range(self.config.repetitions):
+                    run = self.runOnce(config, instance, solverName, repetition)
+                    runs.append(run)
+                    print('%-16s %-16s %3d %10s %10.3fs' % (run['instance'], solverName, repetition,
+                                                            run['objective'], run['wallTime']))
+
+        references = self._addReferences(runs)
+        results = {'label': self.config.label or codeVersion(),
+                   'date': datetime.datetime.now().isoformat(timespec='seconds'),
+                   'python': platform.python_version(), 'numpy': np.__version__, 'machine': platform.node(),
+                   'config': {name: value for name, value in self.config.__dict__.items()},
+                   'references': references, 'instanceTimes': instanceTimes, 'runs': runs}
+        return results
+
+    # Reference objective of each instance: the one of the references file or, if there is none, the best
+    # objective found by the benchmark. Adds the target, time-to-target and gap to the reference to each run.
+    def _addReferences(self, runs):
+        references = {}
+        for run in runs:
+            name = run['instance']
+            if name in self.references:
+                references[name] = self.references[name]
+            elif run['feasible']:
+                best = references.get(name)
+                if best is None or run['objective'] < best['objective']:
+                    references[name] = {'objective': run['objective'], 'time': None, 'source': 'best found'}
+
+        for run in runs:
+            reference = references.get(run['instance'])
+            run['reference'] = reference['objective'] if reference is not None else None
+            run['referenceSource'] = reference['source'] if reference is not None else None
+            run['target'] = None
+            run['timeToTarget'] = None
+            run['gap'] = None
+            if reference is None:
+                continue
+            run['target'] = reference['objective'] * (1 + self.config.targetGap / 100.0)
+            run['timeToTarget'] = timeToTarget(run['trace'], run['target'])
+            if run['feasible'] and reference['objective'] > 0:
+                run['gap'] = 100.0 * (run['objective'] - reference['objective']) / reference['objective']
+        return references
+
+    # Write results.json (all the data, with the incumbent traces) and results.csv (one line per run)
+    @staticmethod
+    def writeResults(results, resultsDirectory):
+        os.makedirs(resultsDirectory, exist_ok=True)
+        prefix = os.path.join(resultsDirectory, 'results_%s' % results['label'])
+        with open(prefix + '.json', 'w') as f:
+            json.dump(results, f, indent=1)
+            f.write('\n')
+        with open(prefix + '.csv', 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(results['runs'])
+        return prefix + '.json', prefix + '.csv'
@@ -0,0 +1,59 @@
+"""
+AMMM Project
+Comparison of two benchmark results to find speed and quality regressions
+Eloy Marín, Pablo Pazos
+"""
+
+from argparse import ArgumentParser
+
+import json
+import sys
+
+import numpy as np
+
+
+# Median wall time, mean objective and number of feasible runs of each <instance, solver>
+def summarize(results):
+    groups = {}
+    for run in results['runs']:
+        groups.setdefault((run['instance'], run['solver']), []).append(run)
+    summary = {}
+    for key, runs in groups.items():
+        objectives = [run['objective'] for run in runs if run['feasible']]
+        summary[key] = {'wallTime': float(np.median([run['wallTime'] for run in runs])),
+                        'objective': float(np.mean(objectives)) if objectives else None,
+                        'feasible': len(objectives), 'runs': len(runs)}
+    return summary
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='AMMM Lab Project - comparison of benchmark results')
+    parser.add_argument('baselineFile', type=str, help='results_<label>.json of the reference version')
+    parser.add_argument('resultsFile', type=str, help='results_<label>.json of the version to check')
+    parser.add_argument('-t', '--tolerance', type=float, default=10.0,
+                        help='allowed increase of the median wall time in percent')
+    args = parser.parse_args()
+
+    with open(args.baselineFile, 'r') as f:
+        baseline = json.load(f)
+    with open(args.resultsFile, 'r') as f:
+        results = json.load(f)
+    before = summarize(baseline)
+    after = summarize(results)
+
+    print('%-16s %-16s %12s %12s %8s %10s %10s' % ('instance', 'solver', baseline['label'][:12],
+                                                   results['label'][:12], 'time', 'obj. old', 'obj. new'))
+    regressions = 0
+    for key in sorted(set(before) & set(after)):
+        old, new = before[key], after[key]
+        ratio = new['wallTime'] / old['wallTime'] if old['wallTime'] > 0 else 1.0
+        slower = ratio > 1 + args.tolerance / 100.0
+        worse = (new['feasible'] < old['feasible'] or
+                 (old['objective'] is not None and new['objective'] is not None and new['objective'] > old['objective']))
+        mark = ' <- slower' if slower else ''
+        mark += ' <- worse' if worse else ''
+        regressions += slower or worse
+        print('%-16s %-16s %11.3fs %11.3fs %7.2fx %10s %10s%s' % (key[0], key[1], old['wallTime'], new['wallTime'],
+                                                               ratio, old['objective'], new['objective'], mark))
+    print('%d regressions' % regressions)
+    sys.exit(1 if regressions > 0 else 0)
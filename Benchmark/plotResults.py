@@ -0,0 +1,80 @@
+"""
+AMMM Project
+Performance and time-to-target plots of benchmark results (see Benchmark/Main.py)
+Eloy Marín, Pablo Pazos
+"""
+
+from argparse import ArgumentParser
+
+import json
+import os
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+COLORS = {'Greedy': 'red', 'Greedy_LS_First': 'brown', 'Greedy_LS_Best': 'green', 'GRASP': 'black',
+          'GRASP_LS_First': 'pink', 'GRASP_LS_Best': 'violet', 'BRKGA': 'orange'}
+
+
+def runsBy(runs, instance):
+    bySolver = {}
+    for run in runs:
+        if run['instance'] == instance:
+            bySolver.setdefault(run['solver'], []).append(run)
+    return bySolver
+
+
+# Mean wall time vs mean gap to the reference of each solver, with the reference itself at gap 0
+def plotPerformance(results, instance, path):
+    plt.figure()
+    plt.xlabel('Time (seconds)')
+    plt.ylabel('Obj. value difference (%)')
+    reference = results['references'].get(instance)
+    if reference is not None and reference['time'] is not None:
+        plt.plot(reference['time'], 0, 's', color='blue', label=reference['source'], markersize=12)
+    for solver, runs in runsBy(results['runs'], instance).items():
+        gaps = [run['gap'] for run in runs if run['gap'] is not None]
+        if not gaps: continue
+        times = [run['wallTime'] for run in runs]
+        plt.plot(np.mean(times), np.mean(gaps), 'o', color=COLORS.get(solver), label=solver, markersize=12)
+    plt.title('%s (%s)' % (instance, results['label']))
+    plt.legend()
+    plt.savefig(path)
+    plt.close()
+
+
+# Empirical distribution of the time-to-target of each solver. Runs not reaching the target count as not solved,
+# so the curve of a solver ends at the fraction of its runs that reached it.
+def plotTimeToTarget(results, instance, path):
+    plt.figure()
+    plt.xlabel('Time to target (seconds)')
+    plt.ylabel('Cumulative probability')
+    target = None
+    for solver, runs in runsBy(results['runs'], instance).items():
+        times = np.sort([run['timeToTarget'] for run in runs if run['timeToTarget'] is not None])
+        target = runs[0]['target']
+        if len(times) == 0: continue
+        probabilities = np.arange(1, len(times) + 1) / len(runs)
+        plt.step(times, probabilities, where='post', color=COLORS.get(solver), label=solver)
+        plt.plot(times, probabilities, 'o', color=COLORS.get(solver), markersize=4)
+    plt.ylim(0, 1.05)
+    plt.title('%s, target %s (%s)' % (instance, target, results['label']))
+    plt.legend()
+    plt.savefig(path)
+    plt.close()
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='AMMM Lab Project - plots of benchmark results')
+    parser.add_argument('resultsFile', type=str, help='results_<label>.json written by the benchmark')
+    parser.add_argument('-o', '--outputDir', type=str, default='plots')
+    args = parser.parse_args()
+
+    with open(args.resultsFile, 'r') as f:
+        results = json.load(f)
+    os.makedirs(args.outputDir, exist_ok=True)
+    instances = sorted({run['instance'] for run in results['runs']})
+    for instance in instances:
+        plotPerformance(results, instance, os.path.join(args.outputDir, 'performance_%s.png' % instance))
+        plotTimeToTarget(results, instance, os.path.join(args.outputDir, 'ttt_%s.png' % instance))
+    print('%d instances plotted in %s' % (len(instances), args.outputDir))
@@ -6,127 +6,198 @@ File given Luis Velasco and under its copyright policy
 Modified for project purposes
 """
 
-import os, random, math, re
+import hashlib
+import json
+import multiprocessing
+import os
+import random
+
+import numpy as np
+
 from AMMMGlobals import AMMMException
 
+# The mean distance between locations is exact up to this number of pairs of locations, and it is estimated
+# on MEAN_DISTANCE_SAMPLES random pairs above it
+MEAN_DISTANCE_EXACT_PAIRS = 10 ** 7
+MEAN_DISTANCE_SAMPLES = 10 ** 6
+# rows of the pairwise distance matrix computed at once
+BLOCK_ROWS = 1024
+# parameters of the configuration that determine the generated instances
+PARAMETERS = ['fileNamePrefix', 'fileNameExtension', 'numInstances', 'nLocations', 'nCities', 'nTypes',
+              'min_d_city', 'max_d_city', 'min_cap', 'max_cap', 'min_cost', 'max_cost']
+
+# Generator run by a pool worker. It is set by _initWorker when the process starts.
+_worker = {}
+
+
+def _initWorker(generator):
+    _worker['generator'] = generator
+
+
+def _runWorker(baseSeed, index):
+    return _worker['generator'].generateFile(baseSeed, index)
+
+
+# Random stream of instance index of a batch generated from baseSeed. It only depends on both numbers,
+# so an instance can be generated again on its own, in any order and by any worker.
+def instanceRng(baseSeed, index):
+    return np.random.default_rng(np.random.SeedSequence([baseSeed, index]))
+
+
+def fileHash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
 
 class InstanceGenerator(object):
     # Generate instances based on read configuration.
     def __init__(self, config):
         self.config = config
 
-    def mean_distance(self, distances):
-        total_distance = 0
-        num_distances = 0
-        for i, l1 in enumerate(distances):
-            l1_xy = re.findall(r'\d+', l1)
-            x1 = int(l1_xy[0])
-            y1 = int(l1_xy[1])
-            for j, l2 in enumerate(distances):
-                if i == j: continue
-                l2_xy = re.findall(r'\d+', l2)
-                x2 = int(l2_xy[0])
-                y2 = int(l2_xy[1])
-                total_distance += math.sqrt(math.pow(x1 - x2, 2) + math.pow(y1 - y2, 2))
-                num_distances += 1
-        return total_distance / num_distances
-
-    def generate(self):
-        # Read ./config/config.dat with tune parameters
-        instancesDirectory = self.config.instancesDirectory
-        fileNamePrefix = self.config.fileNamePrefix
-        fileNameExtension = self.config.fileNameExtension
-        numInstances = self.config.numInstances
-
+    # Mean distance between two different positions of an array of positions (n x 2)
+    @staticmethod
+    def mean_distance(positions, rng):
+        positions = np.asarray(positions, dtype=float)
+        n = len(positions)
+        if n < 2:
+            return 0.0
+
+        if n * (n - 1) // 2 <= MEAN_DISTANCE_EXACT_PAIRS:
+            total_distance = 0.0
+            for start in range(0, n, BLOCK_ROWS):
+                block = positions[start:start + BLOCK_ROWS]
+                delta = block[:, np.newaxis, :] - positions[np.newaxis, :, :]
+                # the distance of a position to itself is 0, it does not add to the total
+                total_distance += np.sqrt((delta * delta).sum(axis=2)).sum()
+            return total_distance / (n * (n - 1))
+
+        i = rng.integers(0, n, MEAN_DISTANCE_SAMPLES)
+        # j != i: shifting by 1..n-1 positions picks any other position with the same probability
+        j = (i + rng.integers(1, n, MEAN_DISTANCE_SAMPLES)) % n
+        delta = positions[i] - positions[j]
+        return float(np.sqrt((delta * delta).sum(axis=1)).mean())
+
+    # Distinct positions of a side x side grid, sampled without replacement
+    @staticmethod
+    def create_locations(n, min_pos, max_pos, rng):
+        side = max_pos - min_pos + 1
+        if n > side * side:
+            raise AMMMException('Cannot place %d different positions in a grid of %dx%d' % (n, side, side))
+        cells = rng.choice(side * side, size=n, replace=False)
+        return np.stack((cells // side, cells % side), axis=1) + min_pos
+
+    # Generate the data of one instance
+    def generateInstance(self, rng):
         nLocations = self.config.nLocations
         nCities = self.config.nCities
         nTypes = self.config.nTypes
 
-        min_d_city = self.config.min_d_city
-        max_d_city = self.config.max_d_city
-        min_cap = self.config.min_cap
-        max_cap = self.config.max_cap
-        min_cost = self.config.min_cost
-        max_cost = self.config.max_cost
-
         min_pos = 0
         max_pos = (nLocations + nCities) // 4
 
-        if not os.path.isdir(instancesDirectory):
-            raise AMMMException('Directory(%s) does not exist' % instancesDirectory)
-
-        for i in range(numInstances):
-            instancePath = os.path.join(instancesDirectory, '%s_%d.%s' % (fileNamePrefix, i, fileNameExtension))
-            fInstance = open(instancePath, 'w')
-
-            p = [0] * nCities
-            for c in range(nCities):
-                p[c] = random.randint(min_cap, max_cap)
-
-            posCities = [''] * nCities
-            for idy, x in enumerate(posCities):
-                newValue = self.create_locations(min_pos, max_pos, posCities)
-                posCities[idy] = newValue
-
-            posLocations = [''] * nLocations
-            for idx, x in enumerate(posLocations):
-                newValue = self.create_locations(min_pos, max_pos, posLocations)
-                posLocations[idx] = newValue
-
-            d_city = [0] * nTypes
-            cap = [0] * nTypes
-            cost = [0] * nTypes
-
-            maxPopulationCity = max(p)
-            min_population = min(p)
-            avg_population = sum(p) // len(p)
-
-            total_population = sum(p)
-            avg_population_per_location = sum(p) // nLocations
-
-            for t in range(nTypes):
-                d_city[t] = random.randint(min_d_city, max_d_city)
-                cap[t] = random.randint(avg_population * (t + 4), maxPopulationCity * (t + 6))
-                cost[t] = random.randint(min_cost, max_cost)
-
-            # d_center = random.uniform(max_pos // 4, max_pos // 3)
-            d_center = self.mean_distance(posLocations)
-            # Order arrays in order to get type with sense
-            # The more cost, the better capacity and working distance
-            d_city.sort()
-            cap.sort()
-            cost.sort()
-
-            fInstance.write('nLocations = %d;\n' % nLocations)
-            fInstance.write('nCities = %d;\n' % nCities)
-            fInstance.write('nTypes = %d;\n' % nTypes)
-            fInstance.write('\n')
-
-            # translate vector of integers into vector of strings and
-            # concatenate that strings separating them by a single space character
-            # in order to keep the data file characteristics
+        p = rng.integers(self.config.min_cap, self.config.max_cap, size=nCities, endpoint=True)
+        posCities = self.create_locations(nCities, min_pos, max_pos, rng)
+        posLocations = self.create_locations(nLocations, min_pos, max_pos, rng)
 
-            fInstance.write('p = [%s];\n' % (' '.join(map(str, p))))
-            fInstance.write('posCities = [%s];\n' % (' '.join(map(str, posCities))))
-            fInstance.write('posLocations = [%s];\n' % (' '.join(map(str, posLocations))))
-            fInstance.write('\n')
+        maxPopulationCity = int(p.max())
+        avg_population = int(p.sum()) // nCities
 
-            fInstance.write('d_city = [%s];\n' % (' '.join(map(str, d_city))))
-            fInstance.write('cap = [%s];\n' % (' '.join(map(str, cap))))
-            fInstance.write('cost = [%s];\n' % (' '.join(map(str, cost))))
-            fInstance.write('\n')
+        # Order arrays in order to get type with sense
+        # The more cost, the better capacity and working distance
+        t = np.arange(nTypes)
+        d_city = np.sort(rng.integers(self.config.min_d_city, self.config.max_d_city, size=nTypes, endpoint=True))
+        cap = np.sort(rng.integers(avg_population * (t + 4), maxPopulationCity * (t + 6), endpoint=True))
+        cost = np.sort(rng.integers(self.config.min_cost, self.config.max_cost, size=nTypes, endpoint=True))
 
-            fInstance.write('d_center = %s;\n' % "{:.1f}".format(d_center))
+        d_center = self.mean_distance(posLocations, rng)
 
-            fInstance.close()
+        return {'nLocations': nLocations, 'nCities': nCities, 'nTypes': nTypes, 'p': p, 'posCities': posCities,
+                'posLocations': posLocations, 'd_city': d_city, 'cap': cap, 'cost': cost, 'd_center': d_center}
 
-    # recursive function that guarantees no repetitions in the array
-    def create_locations(self, min_pos, max_pos, locations):
-        value1 = random.randint(min_pos, max_pos)
-        value2 = random.randint(min_pos, max_pos)
+    # Write the data of an instance in the .dat format. Each vector is formatted at once and written in one call.
+    @staticmethod
+    def writeInstance(instancePath, data):
+        def vector(values):
+            # translate vector of integers into vector of strings and
+            # concatenate that strings separating them by a single space character
+            return ' '.join(map(str, np.asarray(values).tolist()))
+
+        def positions(values):
+            return ' '.join('[%d %d]' % (x, y) for x, y in np.asarray(values).tolist())
+
+        content = ['nLocations = %d;\n' % data['nLocations'],
+                   'nCities = %d;\n' % data['nCities'],
+                   'nTypes = %d;\n' % data['nTypes'],
+                   '\n',
+                   'p = [%s];\n' % vector(data['p']),
+                   'posCities = [%s];\n' % positions(data['posCities']),
+                   'posLocations = [%s];\n' % positions(data['posLocations']),
+                   '\n',
+                   'd_city = [%s];\n' % vector(data['d_city']),
+                   'cap = [%s];\n' % vector(data['cap']),
+                   'cost = [%s];\n' % vector(data['cost']),
+                   '\n',
+                   'd_center = %s;\n' % "{:.1f}".format(data['d_center'])]
+        with open(instancePath, 'w') as fInstance:
+            fInstance.write(''.join(content))
+
+    def instancePath(self, index):
+        return os.path.join(self.config.instancesDirectory, '%s_%d.%s' % (self.config.fileNamePrefix, index,
+                                                                         self.config.fileNameExtension))
+
+    def manifestPath(self):
+        return os.path.join(self.config.instancesDirectory, '%s_manifest.json' % self.config.fileNamePrefix)
+
+    # Generate and write instance index of the batch. Returns its manifest entry.
+    def generateFile(self, baseSeed, index):
+        instancePath = self.instancePath(index)
+        self.writeInstance(instancePath, self.generateInstance(instanceRng(baseSeed, index)))
+        return {'index': index, 'file': os.path.basename(instancePath), 'seed': [baseSeed, index],
+                'sha256': fileHash(instancePath)}
+
+    # Write the manifest of the batch: parameters, base seed and, for each instance, its file, seed and hash.
+    # Entries of instances that were not generated now are kept if the manifest is of the same batch.
+    def writeManifest(self, baseSeed, entries):
+        parameters = {name: self.config.__dict__[name] for name in PARAMETERS}
+        manifest = {'seed': baseSeed, 'parameters': parameters, 'instances': []}
+        manifestPath = self.manifestPath()
+        if os.path.exists(manifestPath):
+            with open(manifestPath, 'r') as f:
+                previous = json.load(f)
+            if previous.get('seed') == baseSeed and previous.get('parameters') == parameters:
+                manifest['instances'] = previous['instances']
+
+        byIndex = {entry['index']: entry for entry in manifest['instances']}
+        byIndex.update({entry['index']: entry for entry in entries})
+        manifest['instances'] = [byIndex[index] for index in sorted(byIndex)]
+        with open(manifestPath, 'w') as f:
+            json.dump(manifest, f, indent=2)
+            f.write('\n')
+
+    # Generate the instances of the batch, all of them by default. Instances are spread over config.workers
+    # processes; instance i always uses the random stream of (seed, i), so the result does not depend on workers.
+    def generate(self, indices=None):
+        instancesDirectory = self.config.instancesDirectory
+        if not os.path.isdir(instancesDirectory):
+            raise AMMMException('Directory(%s) does not exist' % instancesDirectory)
 
-        newValue = '[%d %d]' % (value1, value2)
-        if newValue in locations:
-            return self.create_locations(min_pos, max_pos, locations)
+        # without a seed a base seed is drawn, and recorded in the manifest to reproduce the batch
+        baseSeed = self.config.seed
+        if baseSeed is None:
+            baseSeed = random.randrange(2 ** 31)
+        if indices is None:
+            indices = range(self.config.numInstances)
+        tasks = [(baseSeed, index) for index in indices]
+
+        numWorkers = min(self.config.workers, len(tasks))
+        if numWorkers > 1:
+            with multiprocessing.Pool(numWorkers, initializer=_initWorker, initargs=(self,)) as pool:
+                entries = pool.starmap(_runWorker, tasks, chunksize=1)
         else:
-            return newValue
+            entries = [self.generateFile(*task) for task in tasks]
+
+        self.writeManifest(baseSeed, entries)
+        return entries
@@ -1,13 +1,14 @@
 import sys
+from argparse import ArgumentParser
+
 from Heuristics.datParser import DATParser
 from AMMMGlobals import AMMMException
 from Generator.ValidateConfig import ValidateConfig
 from Generator.InstanceGenerator import InstanceGenerator
 
 
-def run():
+def run(configFile, indices=None):
     try:
-        configFile = "config/config.dat"
         print("AMMM Instance Generator")
         print("-----------------------")
         print("Reading Config file %s..." % configFile)
@@ -15,7 +16,8 @@ def run():
         ValidateConfig.validate(config)
         print("Creating Instances...")
         instGen = InstanceGenerator(config)
-        instGen.generate()
+        entries = instGen.generate(indices)
+        print("Created %d instances, manifest in %s" % (len(entries), instGen.manifestPath()))
         print("Done")
         return 0
     except AMMMException as e:
@@ -24,4 +26,9 @@ def run():
 
 
 if __name__ == '__main__':
-    sys.exit(run())
+    parser = ArgumentParser(description='AMMM Lab Project - instance generator')
+    parser.add_argument('-c', '--configFile', type=str, default='config/config.dat')
+    parser.add_argument('-i', '--instances', nargs='+', type=int, default=None,
+                        help='indices of the instances to (re)generate, all of them by default')
+    args = parser.parse_args()
+    sys.exit(run(args.configFile, args.instances))
@@ -78,3 +78,21 @@ class ValidateConfig(object):
 
         if max_d_city < min_d_city:
             raise AMMMException('max_d_city(%s) has to be >= min_d_city(%s).' % (str(max_d_city), str(min_d_city)))
+
+        # Validate workers
+        workers = 1
+        if 'workers' in data.__dict__:
+            workers = data.workers
+            if not isinstance(workers, int) or isinstance(workers, bool) or (workers <= 0):
+                raise AMMMException('workers(%s) has to be a positive integer value.' % str(workers))
+        else:
+            data.workers = workers
+
+        # Validate seed
+        seed = None
+        if 'seed' in data.__dict__:
+            seed = data.seed
+            if not isinstance(seed, int) or isinstance(seed, bool) or (seed < 0):
+                raise AMMMException('seed(%s) has to be a non-negative integer value.' % str(seed))
+        else:
+            data.seed = seed
@@ -20,21 +20,37 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 from argparse import ArgumentParser
 from pathlib import Path
 
+import cProfile
+import pstats
 import sys
 
+from Heuristics import instrumentation
+from Heuristics.binaryInstance import BinaryInstanceParser
 from Heuristics.datParser import DATParser
 from AMMMGlobals import AMMMException
+from Heuristics.solvers.solver_BRKGA import Solver_BRKGA
 from Heuristics.solvers.solver_GRASP import Solver_GRASP
 from Heuristics.validateInputDataProject import ValidateInputData
 from Heuristics.ValidateConfig import ValidateConfig
 from Heuristics.solvers.solver_Greedy import Solver_Greedy
 from Heuristics.problem.instance import Instance
+from Heuristics.trace import traceFilePath
 
 
 class Main:
     def __init__(self, config):
         self.config = config
 
+    @staticmethod
+    def createSolver(config, instance):
+        if config.solver == 'Greedy' or config.solver == 'Random':
+            return Solver_Greedy(config, instance)
+        elif config.solver == 'GRASP':
+            return Solver_GRASP(config, instance)
+        elif config.solver == 'BRKGA':
+            return Solver_BRKGA(config, instance)
+        raise AMMMException('Solver %s not supported.' % str(config.solver))
+
     def run(self, data):
         try:
             if self.config.verbose: print('Creating Problem Instance...')
@@ -42,16 +58,16 @@ class Main:
             if self.config.verbose: print('Solving the Problem...')
             if instance.checkInstance():
                 initialSolution = None
-                if self.config.solver == 'Greedy' or self.config.solver == 'Random':
-                    solver = Solver_Greedy(self.config, instance)
-                elif self.config.solver == 'GRASP':
-                    solver = Solver_GRASP(self.config, instance)
-                else:
-                    raise AMMMException('Solver %s not supported.' % str(self.config.solver))
+                solver = Main.createSolver(self.config, instance)
                 solution = solver.solve(solution=initialSolution)
+                if self.config.instrument:
+                    instrumentation.report()
                 if solution.feasible:
                     print(str(solution))
                     solution.saveToFile(self.config.solutionFile)
+                if self.config.traceFormat is not None:
+                    solver.trace.write(traceFilePath(self.config.solutionFile, self.config.traceFormat),
+                                       self.config.traceFormat)
             else:
                 print('Instance is infeasible.')
                 solution = instance.createSolution()
@@ -67,11 +83,17 @@ if __name__ == '__main__':
     parser = ArgumentParser(description='AMMM Lab Project')
     parser.add_argument('-c', '--configFile', nargs='?', type=Path,
                         default=Path(__file__).parent / 'config/config.dat', help='specifies the config file')
+    parser.add_argument('--profile', nargs='?', type=Path, const=True, default=None,
+                        help='dump cProfile stats of the run to the given file (default: <solutionFile>.prof)')
     args = parser.parse_args()
 
     config = DATParser.parse(args.configFile)
     ValidateConfig.validate(config)
-    inputData = DATParser.parse(config.inputDataFile)
+    # the input data can be a .dat file or a binary instance (see convertInstance.py)
+    if BinaryInstanceParser.isBinaryFile(config.inputDataFile):
+        inputData = BinaryInstanceParser.parse(config.inputDataFile)
+    else:
+        inputData = DATParser.parse(config.inputDataFile)
     ValidateInputData.validate(inputData)
 
     if config.verbose:
@@ -80,5 +102,19 @@ if __name__ == '__main__':
         print('Config file %s' % args.configFile)
         print('Input Data file %s' % config.inputDataFile)
 
+    if config.instrument:
+        instrumentation.enable()
+
     main = Main(config)
-    sys.exit(main.run(inputData))
+    if args.profile is None:
+        sys.exit(main.run(inputData))
+
+    profileFile = args.profile
+    if profileFile is True:
+        profileFile = Path(config.solutionFile).with_suffix('.prof')
+    profiler = cProfile.Profile()
+    status = profiler.runcall(main.run, inputData)
+    profiler.dump_stats(str(profileFile))
+    print('Profile stats written to %s' % profileFile)
+    pstats.Stats(profiler).sort_stats('cumulative').print_stats(20)
+    sys.exit(status)
@@ -19,6 +19,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import os
 from AMMMGlobals import AMMMException
+from Heuristics.trace import TRACE_FORMATS
 
 
 # Validate config attributes read from a DAT file.
@@ -51,6 +52,66 @@ class ValidateConfig(object):
         else:
             data.verbose = verbose
 
+        # Validate useCache
+        useCache = False
+        if 'useCache' in data.__dict__:
+            useCache = data.useCache
+            if not isinstance(useCache, bool):
+                raise AMMMException('useCache(%s) has to be a boolean value.' % str(useCache))
+        else:
+            data.useCache = useCache
+
+        # Validate cacheMaxEntries: number of instances kept in the cache, the least recently used ones are removed
+        cacheMaxEntries = 32
+        if 'cacheMaxEntries' in data.__dict__:
+            cacheMaxEntries = data.cacheMaxEntries
+            if not isinstance(cacheMaxEntries, int) or isinstance(cacheMaxEntries, bool) or (cacheMaxEntries <= 0):
+                raise AMMMException('cacheMaxEntries(%s) has to be a positive integer value.' % str(cacheMaxEntries))
+        else:
+            data.cacheMaxEntries = cacheMaxEntries
+
+        # Validate instrument
+        instrument = False
+        if 'instrument' in data.__dict__:
+            instrument = data.instrument
+            if not isinstance(instrument, bool):
+                raise AMMMException('instrument(%s) has to be a boolean value.' % str(instrument))
+        else:
+            data.instrument = instrument
+
+        # Validate lowerBound: compute a lower bound of the optimal cost and report the optimality gap
+        lowerBound = False
+        if 'lowerBound' in data.__dict__:
+            lowerBound = data.lowerBound
+            if not isinstance(lowerBound, bool):
+                raise AMMMException('lowerBound(%s) has to be a boolean value.' % str(lowerBound))
+        else:
+            data.lowerBound = lowerBound
+
+        # Validate lowerBoundTime: maximum time spent computing the lower bound
+        lowerBoundTime = 10
+        if 'lowerBoundTime' in data.__dict__:
+            lowerBoundTime = data.lowerBoundTime
+            if not isinstance(lowerBoundTime, (int, float)) or isinstance(lowerBoundTime, bool) or (lowerBoundTime <= 0):
+                raise AMMMException('lowerBoundTime(%s) has to be a positive real value.' % str(lowerBoundTime))
+        else:
+            data.lowerBoundTime = lowerBoundTime
+
+        # Validate traceFormat: format of the convergence trace written next to the solution file, None to skip it
+        traceFormat = None
+        if 'traceFormat' in data.__dict__:
+            traceFormat = data.traceFormat
+            if traceFormat not in TRACE_FORMATS:
+                raise AMMMException('traceFormat(%s) has to be one of: %s.' % (str(traceFormat), ', '.join(TRACE_FORMATS)))
+        else:
+            data.traceFormat = traceFormat
+
+        # Validate cacheDir, by default a cache directory next to the input data file
+        if 'cacheDir' in data.__dict__:
+            data.cacheDir = str(data.cacheDir)
+        else:
+            data.cacheDir = os.path.join(os.path.dirname(inputDataFile), 'cache')
+
         # Validate solver and per-solver parameters
         solver = data.solver
         if solver == 'Greedy' or solver == 'Random':
@@ -71,8 +132,75 @@ class ValidateConfig(object):
             alpha = data.alpha
             if not isinstance(alpha, (int, float)) or (alpha < 0) or (alpha > 1):
                 raise AMMMException('alpha(%s) has to be a real value in range [0, 1].' % str(alpha))
+
+            # Validate maxIterations
+            maxIterations = None
+            if 'maxIterations' in data.__dict__:
+                maxIterations = data.maxIterations
+                if not isinstance(maxIterations, int) or isinstance(maxIterations, bool) or (maxIterations <= 0):
+                    raise AMMMException('maxIterations(%s) has to be a positive integer value.' % str(maxIterations))
+            else:
+                data.maxIterations = maxIterations
+
+            # Validate reactive: draw the alpha of each iteration from reactiveAlphas instead of using alpha
+            reactive = False
+            if 'reactive' in data.__dict__:
+                reactive = data.reactive
+                if not isinstance(reactive, bool):
+                    raise AMMMException('reactive(%s) has to be a boolean value.' % str(reactive))
+            else:
+                data.reactive = reactive
+
+            # Validate reactiveAlphas
+            reactiveAlphas = [0.05, 0.1, 0.2, 0.3, 0.5]
+            if 'reactiveAlphas' in data.__dict__:
+                reactiveAlphas = data.reactiveAlphas
+                if not isinstance(reactiveAlphas, list):
+                    reactiveAlphas = [reactiveAlphas]
+                if len(reactiveAlphas) == 0:
+                    raise AMMMException('Value for reactiveAlphas is empty')
+                for value in reactiveAlphas:
+                    if not isinstance(value, (int, float)) or isinstance(value, bool) or (value < 0) or (value > 1):
+                        raise AMMMException('reactiveAlphas(%s) have to be real values in range [0, 1].' % str(value))
+            data.reactiveAlphas = reactiveAlphas
+
+            # Validate reactivePeriod: iterations between updates of the probabilities of the reactive alphas
+            reactivePeriod = 20
+            if 'reactivePeriod' in data.__dict__:
+                reactivePeriod = data.reactivePeriod
+                if not isinstance(reactivePeriod, int) or isinstance(reactivePeriod, bool) or (reactivePeriod <= 0):
+                    raise AMMMException('reactivePeriod(%s) has to be a positive integer value.' % str(reactivePeriod))
+            else:
+                data.reactivePeriod = reactivePeriod
+
+            # Validate pathRelinking: relink every local optimum with a member of an elite set of solutions
+            pathRelinking = False
+            if 'pathRelinking' in data.__dict__:
+                pathRelinking = data.pathRelinking
+                if not isinstance(pathRelinking, bool):
+                    raise AMMMException('pathRelinking(%s) has to be a boolean value.' % str(pathRelinking))
+            else:
+                data.pathRelinking = pathRelinking
+
+            # Validate eliteSize
+            eliteSize = 10
+            if 'eliteSize' in data.__dict__:
+                eliteSize = data.eliteSize
+                if not isinstance(eliteSize, int) or isinstance(eliteSize, bool) or (eliteSize <= 0):
+                    raise AMMMException('eliteSize(%s) has to be a positive integer value.' % str(eliteSize))
+            else:
+                data.eliteSize = eliteSize
+
+            # Validate eliteMinDistance: city roles in which a new elite solution must differ from every member
+            eliteMinDistance = 2
+            if 'eliteMinDistance' in data.__dict__:
+                eliteMinDistance = data.eliteMinDistance
+                if not isinstance(eliteMinDistance, int) or isinstance(eliteMinDistance, bool) or (eliteMinDistance <= 0):
+                    raise AMMMException('eliteMinDistance(%s) has to be a positive integer value.' % str(eliteMinDistance))
+            else:
+                data.eliteMinDistance = eliteMinDistance
         elif solver == 'BRKGA':
-            # Validate that mandatory input parameters for GRASP solver were found
+            # Validate that mandatory input parameters for BRKGA solver were found
             for paramName in ['maxExecTime', 'eliteProp', 'mutantProp', 'inheritanceProb', 'IndividualsMultiplier']:
                 if not paramName in data.__dict__:
                     raise AMMMException('Parameter/Set(%s) not contained in Configuration. Required by BRKGA solver.' % str(paramName))
@@ -102,9 +230,31 @@ class ValidateConfig(object):
             if not isinstance(IndividualsMultiplier, (int, float)) or (IndividualsMultiplier <= 0):
                 raise AMMMException('IndividualsMultiplier(%s) has to be a positive real value.' % str(IndividualsMultiplier))
 
+            # Validate that elite and mutant individuals fit in the population
+            if eliteProp + mutantProp > 1:
+                raise AMMMException('eliteProp(%s) + mutantProp(%s) cannot be larger than 1.' % (str(eliteProp), str(mutantProp)))
         else:
             raise AMMMException('Unsupported solver specified(%s) in Configuration.' % str(solver))
 
+        if solver == 'GRASP' or solver == 'BRKGA':
+            # Validate workers
+            workers = 1
+            if 'workers' in data.__dict__:
+                workers = data.workers
+                if not isinstance(workers, int) or isinstance(workers, bool) or (workers <= 0):
+                    raise AMMMException('workers(%s) has to be a positive integer value.' % str(workers))
+            else:
+                data.workers = workers
+
+            # Validate seed
+            seed = None
+            if 'seed' in data.__dict__:
+                seed = data.seed
+                if not isinstance(seed, int) or isinstance(seed, bool) or (seed < 0):
+                    raise AMMMException('seed(%s) has to be a non-negative integer value.' % str(seed))
+            else:
+                data.seed = seed
+
         if data.localSearch:
             # Validate that mandatory input parameters for local search were found
             for paramName in ['neighborhoodStrategy', 'policy']:
@@ -113,8 +263,8 @@ class ValidateConfig(object):
 
             # Validate neighborhoodStrategy
             neighborhoodStrategy = data.neighborhoodStrategy
-            if neighborhoodStrategy not in ['TaskExchange', 'Reassignment']:
-                raise AMMMException('neighborhoodStrategy(%s) has to be one of [Reassignment, Exchange].' % str(neighborhoodStrategy))
+            if neighborhoodStrategy not in ['TaskExchange', 'Reassignment', 'CloseCenter', 'Relocation']:
+                raise AMMMException('neighborhoodStrategy(%s) has to be one of [Reassignment, TaskExchange, CloseCenter, Relocation].' % str(neighborhoodStrategy))
 
             # Validate policy
             policy = data.policy
@@ -0,0 +1,181 @@
+"""
+AMMM Project
+Batch runner: solves every <instance, config> pair of a set of instances and configs in a process pool
+Eloy Marín, Pablo Pazos
+"""
+
+from argparse import ArgumentParser
+
+import csv
+import glob
+import math
+import multiprocessing
+import os
+import sys
+import time
+
+from AMMMGlobals import AMMMException
+from Heuristics.binaryInstance import BinaryInstanceParser
+from Heuristics.datParser import DATParser
+from Heuristics.Main import Main
+from Heuristics.problem.instance import Instance
+from Heuristics.problem.lowerBound import optimalityGap
+from Heuristics.trace import traceFilePath
+from Heuristics.validateInputDataProject import ValidateInputData
+from Heuristics.ValidateConfig import ValidateConfig
+
+FIELDS = ['instance', 'config', 'solver', 'status', 'objective', 'lowerBound', 'gap', 'time', 'iterations', 'solutionFile',
+          'message']
+
+
+def _name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def readInstance(instanceFile):
+    if BinaryInstanceParser.isBinaryFile(instanceFile):
+        data = BinaryInstanceParser.parse(instanceFile)
+    else:
+        data = DATParser.parse(instanceFile)
+    ValidateInputData.validate(data)
+    return data
+
+
+# Solve one instance with several configs. The instance is parsed once, and the precomputed Instance is shared
+# by the configs with the same cache settings. Returns one result row per config.
+def solveJobs(instanceFile, configFiles, solutionsDir):
+    try:
+        data = readInstance(instanceFile)
+    except AMMMException as e:
+        return [{'instance': _name(instanceFile), 'config': _name(configFile), 'status': 'error', 'message': str(e)}
+                for configFile in configFiles]
+
+    instances = {}
+    rows = []
+    for configFile in configFiles:
+        row = {'instance': _name(instanceFile), 'config': _name(configFile)}
+        try:
+            config = DATParser.parse(configFile)
+            config.inputDataFile = instanceFile
+            config.solutionFile = os.path.join(solutionsDir, '%s_%s.sol' % (row['instance'], row['config']))
+            config.verbose = False
+            ValidateConfig.validate(config)
+            # jobs already run in parallel, and pool workers cannot start pools of their own
+            config.workers = 1
+            row['solver'] = config.solver
+            row['solutionFile'] = config.solutionFile
+
+            key = (config.useCache, config.cacheDir)
+            if key not in instances:
+                instances[key] = Instance(config, data)
+            instance = instances[key]
+
+            startTime = time.perf_counter()
+            if not instance.checkInstance():
+                solution = instance.createSolution()
+                solution.makeInfeasible()
+                row['message'] = 'Instance is infeasible.'
+            else:
+                solver = Main.createSolver(config, instance)
+                solution = solver.solve(solution=None)
+                row['iterations'] = solver.numSolutionsConstructed
+                if solver.lowerBound is not None:
+                    row['lowerBound'] = solver.lowerBound
+                    row['gap'] = optimalityGap(solution.cost if solution.isFeasible() else float('infinity'),
+                                               solver.lowerBound)
+                if config.traceFormat is not None:
+                    solver.trace.write(traceFilePath(config.solutionFile, config.traceFormat), config.traceFormat)
+            row['time'] = time.perf_counter() - startTime
+            row['status'] = 'feasible' if solution.isFeasible() else 'infeasible'
+            if solution.isFeasible():
+                row['objective'] = solution.cost
+            solution.saveToFile(config.solutionFile)
+        except AMMMException as e:
+            row['status'] = 'error'
+            row['message'] = str(e)
+        rows.append(row)
+    return rows
+
+
+# Instance files given as paths or glob patterns, in order and without repetitions
+def expandPaths(patterns):
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            raise AMMMException('No file matches (%s)' % pattern)
+        for path in matches:
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+# Jobs of the batch: the configs of each instance are split in as many groups as needed to keep every worker
+# busy, each group is solved by one task that parses the instance once
+def createTasks(instanceFiles, configFiles, numWorkers, solutionsDir):
+    groups = max(1, min(len(configFiles), math.ceil(numWorkers / len(instanceFiles))))
+    tasks = []
+    for instanceFile in instanceFiles:
+        for g in range(groups):
+            tasks.append((instanceFile, configFiles[g::groups], solutionsDir))
+    return tasks
+
+
+def runBatch(instanceFiles, configFiles, numWorkers, solutionsDir):
+    os.makedirs(solutionsDir, exist_ok=True)
+    tasks = createTasks(instanceFiles, configFiles, numWorkers, solutionsDir)
+    numJobs = len(instanceFiles) * len(configFiles)
+    rows = []
+
+    def collect(taskRows):
+        for row in taskRows:
+            rows.append(row)
+            print('[%d/%d] %s %s: %s %s' % (len(rows), numJobs, row['instance'], row['config'], row['status'],
+                                            row.get('objective', row.get('message', ''))))
+
+    if numWorkers > 1 and len(tasks) > 1:
+        with multiprocessing.Pool(min(numWorkers, len(tasks))) as pool:
+            for taskRows in pool.imap_unordered(_solveTask, tasks):
+                collect(taskRows)
+    else:
+        for task in tasks:
+            collect(solveJobs(*task))
+
+    rows.sort(key=lambda row: (row['instance'], row['config']))
+    return rows
+
+
+def _solveTask(task):
+    return solveJobs(*task)
+
+
+def writeResults(rows, resultsFile):
+    with open(resultsFile, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='AMMM Lab Project - batch runner')
+    parser.add_argument('-i', '--instances', nargs='+', required=True,
+                        help='instance files (.dat or .inst) or glob patterns, e.g. "data/instance_*.dat"')
+    parser.add_argument('-c', '--configs', nargs='+', required=True, help='config files or glob patterns')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count(), help='number of worker processes')
+    parser.add_argument('-s', '--solutionsDir', default='solutions/batch',
+                        help='directory of the solutions, named <instance>_<config>.sol')
+    parser.add_argument('-o', '--resultsFile', default='batch_results.csv', help='aggregated results table')
+    args = parser.parse_args()
+
+    try:
+        instanceFiles = expandPaths(args.instances)
+        configFiles = expandPaths(args.configs)
+        if args.workers <= 0:
+            raise AMMMException('workers(%s) has to be a positive integer value.' % args.workers)
+        startTime = time.time()
+        rows = runBatch(instanceFiles, configFiles, args.workers, args.solutionsDir)
+        writeResults(rows, args.resultsFile)
+        print('%d jobs solved in %.2f s, results in %s' % (len(rows), time.time() - startTime, args.resultsFile))
+    except AMMMException as e:
+        print('Exception:', e)
+        sys.exit(1)
@@ -0,0 +1,65 @@
+"""
+AMMM Project
+Benchmark of the instance parsers on synthetic instances
+Eloy Marín, Pablo Pazos
+"""
+
+from argparse import ArgumentParser
+
+import os
+import random
+import tempfile
+import time
+
+from Heuristics.binaryInstance import BinaryInstanceParser
+from Heuristics.datParser import DATParser
+from Heuristics.validateInputDataProject import ValidateInputData
+
+
+# Write a synthetic instance with about numValues values. Cities take 3 values (p and position) and
+# locations 2 values (position), with the ratio 5/8 between locations and cities of the generator.
+def writeInstance(filePath, numValues, seed):
+    rng = random.Random(seed)
+    nCities = max(1, numValues * 8 // 34)
+    nLocations = max(1, nCities * 5 // 8)
+    side = int(nCities ** 0.5) * 4 + 1
+    with open(filePath, 'w') as f:
+        f.write('nLocations = %d;\nnCities = %d;\nnTypes = 3;\n\n' % (nLocations, nCities))
+        f.write('p = [%s];\n' % ' '.join(str(rng.randint(1, 40)) for _ in range(nCities)))
+        f.write('posCities = [%s];\n' % ' '.join(
+            '[%d %d]' % (rng.randrange(side), rng.randrange(side)) for _ in range(nCities)))
+        f.write('posLocations = [%s];\n\n' % ' '.join(
+            '[%d %d]' % (rng.randrange(side), rng.randrange(side)) for _ in range(nLocations)))
+        f.write('d_city = [7 11 19];\ncap = [23 41 114];\ncost = [28 32 36];\n\nd_center = 6.0;\n')
+    return nCities + 2 * nCities + 2 * nLocations
+
+
+def timeParse(parser, filePath, repetitions):
+    best = float('inf')
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        ValidateInputData.validate(parser.parse(filePath))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='AMMM Lab Project - instance parser benchmark')
+    parser.add_argument('-s', '--sizes', nargs='+', type=int, default=[10000, 100000, 1000000],
+                        help='approximate number of values of each synthetic instance')
+    parser.add_argument('-r', '--repetitions', type=int, default=3, help='parses per instance, the best is reported')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print('%10s %10s %12s %12s %14s' % ('values', 'MB', 'dat (s)', 'binary (s)', 'dat values/s'))
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            datFile = os.path.join(directory, 'instance_%d.dat' % size)
+            binFile = os.path.join(directory, 'instance_%d.inst' % size)
+            numValues = writeInstance(datFile, size, args.seed)
+            BinaryInstanceParser.write(binFile, DATParser.parse(datFile))
+
+            datTime = timeParse(DATParser, datFile, args.repetitions)
+            binTime = timeParse(BinaryInstanceParser, binFile, args.repetitions)
+            print('%10d %10.1f %12.4f %12.4f %14.0f' % (numValues, os.path.getsize(datFile) / 1e6, datTime, binTime,
+                                                        numValues / datTime))
@@ -0,0 +1,96 @@
+"""
+AMMM Project
+Binary, memory-mappable instance format
+Eloy Marín, Pablo Pazos
+"""
+
+import json
+import os
+
+import numpy as np
+
+from AMMMGlobals import AMMMException
+from Heuristics.datParser import DATAttributes
+
+# File layout:
+#   MAGIC (8 bytes) | header length (uint32, little endian) | JSON header | padding | arrays
+# The header holds the scalars of the instance and, for each array, its dtype, shape and byte offset.
+# Arrays are stored raw (C order) at offsets aligned to ALIGNMENT bytes, so they can be memory-mapped.
+MAGIC = b'AMMMINST'
+VERSION = 1
+ALIGNMENT = 64
+SCALARS = ['nLocations', 'nCities', 'nTypes', 'd_center']
+ARRAYS = ['p', 'posCities', 'posLocations', 'd_city', 'cap', 'cost']
+
+
+class BinaryInstanceParser(object):
+    # Check if a file is a binary instance by looking at its first bytes
+    @staticmethod
+    def isBinaryFile(filePath):
+        if not os.path.exists(filePath):
+            return False
+        with open(filePath, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+
+    @staticmethod
+    def _align(offset):
+        return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+    # Read a binary instance. Arrays are memory-mapped read-only: the data is only loaded when it is accessed.
+    @staticmethod
+    def parse(filePath):
+        if not BinaryInstanceParser.isBinaryFile(filePath):
+            raise AMMMException('The file (%s) is not a binary instance' % filePath)
+        with open(filePath, 'rb') as f:
+            f.seek(len(MAGIC))
+            headerLength = int(np.frombuffer(f.read(4), dtype='<u4')[0])
+            header = json.loads(f.read(headerLength).decode('utf-8'))
+        if header.get('version') != VERSION:
+            raise AMMMException('Unsupported binary instance version(%s) in (%s)' % (header.get('version'), filePath))
+
+        datAttr = DATAttributes()
+        for name, value in header['scalars'].items():
+            datAttr.__dict__[name] = value
+        for name, array in header['arrays'].items():
+            shape = tuple(array['shape'])
+            if 0 in shape:
+                datAttr.__dict__[name] = np.empty(shape, dtype=array['dtype'])
+            else:
+                datAttr.__dict__[name] = np.memmap(filePath, dtype=array['dtype'], mode='r',
+                                                   offset=array['offset'], shape=shape)
+        return datAttr
+
+    # Write validated instance data in the binary format. Integer data keeps an integer dtype.
+    @staticmethod
+    def write(filePath, data):
+        arrays = {}
+        for name in ARRAYS:
+            array = np.asarray(data.__dict__[name])
+            if array.dtype.kind not in 'iuf':
+                raise AMMMException('Parameter(%s) has to be numeric to be stored in a binary instance' % name)
+            arrays[name] = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder('<'))
+        scalars = {}
+        for name in SCALARS:
+            value = data.__dict__[name]
+            scalars[name] = value.item() if isinstance(value, np.generic) else value
+
+        # offsets are relative to the start of the file, so the header is sized before being written
+        header = {'version': VERSION, 'scalars': scalars, 'arrays': {}}
+        headerLength = 0
+        while True:
+            offset = BinaryInstanceParser._align(len(MAGIC) + 4 + headerLength)
+            for name, array in arrays.items():
+                header['arrays'][name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+                offset = BinaryInstanceParser._align(offset + array.nbytes)
+            encoded = json.dumps(header).encode('utf-8')
+            if len(encoded) <= headerLength: break
+            headerLength = len(encoded)
+        encoded = encoded.ljust(headerLength)
+
+        with open(filePath, 'wb') as f:
+            f.write(MAGIC)
+            f.write(np.array([headerLength], dtype='<u4').tobytes())
+            f.write(encoded)
+            for name, array in arrays.items():
+                f.write(b'\0' * (header['arrays'][name]['offset'] - f.tell()))
+                f.write(array.tobytes())
@@ -0,0 +1,40 @@
+"""
+AMMM Project
+Converter from .dat instances to the binary instance format
+Eloy Marín, Pablo Pazos
+"""
+
+from argparse import ArgumentParser
+from pathlib import Path
+
+import sys
+
+from AMMMGlobals import AMMMException
+from Heuristics.binaryInstance import BinaryInstanceParser
+from Heuristics.datParser import DATParser
+from Heuristics.validateInputDataProject import ValidateInputData
+
+
+def convert(inputFile, outputFile):
+    inputData = DATParser.parse(inputFile)
+    ValidateInputData.validate(inputData)
+    BinaryInstanceParser.write(outputFile, inputData)
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='AMMM Lab Project - .dat to binary instance converter')
+    parser.add_argument('inputFiles', nargs='+', type=Path, help='.dat instance files to convert')
+    parser.add_argument('-o', '--outputDir', type=Path, default=None,
+                        help='directory of the binary instances (default: next to each input file)')
+    args = parser.parse_args()
+
+    try:
+        for inputFile in args.inputFiles:
+            outputDir = args.outputDir if args.outputDir is not None else inputFile.parent
+            outputDir.mkdir(parents=True, exist_ok=True)
+            outputFile = outputDir / (inputFile.stem + '.inst')
+            convert(str(inputFile), str(outputFile))
+            print('%s -> %s' % (inputFile, outputFile))
+    except AMMMException as e:
+        print('Exception:', e)
+        sys.exit(1)
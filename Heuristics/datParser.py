@@ -17,7 +17,7 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 '''
 
-import os, re
+import functools, os, re
 from AMMMGlobals import AMMMException
 
 
@@ -57,43 +57,117 @@ class DATParser(object):
             raise AMMMException('The file (%s) does not exist' % filePath)
         return open(filePath, 'r')
 
+    # Start of a statement: <spaces>name<spaces>=<spaces>. Lines not starting like this are ignored.
+    _header = re.compile(r'[\s]*([a-zA-Z][\w]*)[\s]*\=[\s]*')
+    # A value and the content of a vector (values separated by spaces)
+    _value = re.compile(r'[\w\/\.\-]+')
+    _values = re.compile(r'[\w\/\.\-\s]*')
+    # Content of a 2-dimension vector: rows [values] separated by spaces
+    _rows = re.compile(r'(?:[\s]*\[[\w\/\.\-\s]*\])+[\s]*')
+    _emptyRow = re.compile(r'\[[\s]*\]')
+
     @staticmethod
-    def parse(filePath):
-        fileHandler = DATParser._openFile(filePath)
-        fileContent = fileHandler.read()
-        fileHandler.close()
+    @functools.lru_cache(maxsize=None)
+    def _rowsOfWidth(width):
+        # content of a 2-dimension vector whose rows have exactly width values
+        value = r'[\w\/\.\-]+'
+        return re.compile(r'(?:[\s]*\[[\s]*%s(?:[\s]+%s){%d}[\s]*\])+[\s]*' % (value, value, width - 1))
 
-        datAttr = DATAttributes()
+    @staticmethod
+    def _parseValues(text):
+        # values of a vector, None if text is not a non-empty list of values
+        if DATParser._values.fullmatch(text) is None:
+            return None
+        values = text.split()
+        if not values:
+            return None
+        # most vectors are integer-only, they are converted at once
+        try:
+            return list(map(int, values))
+        except ValueError:
+            return list(map(DATParser._tryParse, values))
 
-        # lines not starting with <spaces>[a-zA-Z] are ignored.
-        # comments can be added using for instance '$','//','#', ...
+    @staticmethod
+    def _parseStatement(statement):
+        # statement is the text of a statement up to its ';'. Returns <name, value> or None if it is not well formed.
+        header = DATParser._header.match(statement)
+        if header is None:
+            return None
+        name = header.group(1)
+        body = statement[header.end():].rstrip()
+
+        # scalar
+        if not body.startswith('['):
+            if DATParser._value.fullmatch(body) is None:
+                return None
+            return name, DATParser._tryParse(body)
+
+        if not body.endswith(']'):
+            return None
+        body = body[1:-1]
+
+        # 1-dimension vector
+        if '[' not in body:
+            values = DATParser._parseValues(body)
+            return None if values is None else (name, values)
+
+        # 2-dimension vector: each row is [values] and rows are separated by spaces
+        tokens = body.replace('[', ' ').replace(']', ' ').split()
+        numRows = body.count('[')
+        width = len(tokens) // numRows
+        if width > 0 and width * numRows == len(tokens) and DATParser._rowsOfWidth(width).fullmatch(body) is not None:
+            # all the rows have the same number of values (positions...), they are converted at once
+            try:
+                values = list(map(int, tokens))
+            except ValueError:
+                values = list(map(DATParser._tryParse, tokens))
+            return name, [list(row) for row in zip(*[iter(values)] * width)]
+
+        if DATParser._rows.fullmatch(body) is None or DATParser._emptyRow.search(body) is not None:
+            return None
+        rows = [row.split() for row in body.replace('[', ' ').split(']')[:-1]]
+        try:
+            return name, [list(map(int, row)) for row in rows]
+        except ValueError:
+            return name, [list(map(DATParser._tryParse, row)) for row in rows]
 
-        # parse scalar attributes
-        pattern = re.compile(r'^[\s]*([a-zA-Z][\w]*)[\s]*\=[\s]*([\w\/\.\-]+)[\s]*\;', re.M)
-        entries = pattern.findall(fileContent)
-        for entry in entries:
-            datAttr.__dict__[entry[0]] = DATParser._tryParse(entry[1])
-
-        # parse 1-dimension vector attributes
-        pattern = re.compile(r'^[\s]*([a-zA-Z][\w]*)[\s]*\=[\s]*\[[\s]*(([\w\/\.\-]+[\s]*)+)\][\s]*\;', re.M)
-        entries = pattern.findall(fileContent)
-        for entry in entries:
-            pattern2 = re.compile(r'([\w\/\.]+)[\s]*')
-            values = pattern2.findall(entry[1])
-            datAttr.__dict__[entry[0]] = map(DATParser._tryParse, values)
-
-        # parse 2-dimension vector attributes
-        pattern = re.compile(r'^[\s]*([a-zA-Z][\w]*)[\s]*\=[\s]*\[(([\s]*\[[\s]*(([\w\/\.\-]+[\s]*)+)\][\s]*)+)[\s]*\][\s]*\;', re.M)
-        entries = pattern.findall(fileContent)
-
-        for entry in entries:
-            pattern2 = re.compile(r'[\s]*\[[\s]*(([\w\/\.\-]+[\s]*)+)\][\s]*')
-            entries2 = pattern2.findall(entry[1])
-            values = []
-            for entry2 in entries2:
-                pattern2 = re.compile(r'([\w\/\.\-]+)[\s]*')
-                values2 = pattern2.findall(entry2[0])
-                values.append(map(DATParser._tryParse, values2))
-            datAttr.__dict__[entry[0]] = values
+    @staticmethod
+    def parse(filePath):
+        datAttr = DATAttributes()
 
+        # lines not starting with <spaces>name<spaces>= are ignored.
+        # comments can be added using for instance '$','//','#', ...
+        # A statement ends with the first ';' after its name and can span several lines. The rest of that line is
+        # ignored. If a statement is not well formed, parsing restarts at the line following its first line.
+        with DATParser._openFile(filePath) as fileHandler:
+            lines = iter(fileHandler)
+            pushedBack = []
+            statement = []
+            while True:
+                if pushedBack:
+                    line = pushedBack.pop()
+                else:
+                    line = next(lines, None)
+                if line is None:
+                    # statement without ';' at the end of the file
+                    if len(statement) <= 1:
+                        break
+                    pushedBack.extend(reversed(statement[1:]))
+                    statement = []
+                    continue
+
+                if not statement and DATParser._header.match(line) is None:
+                    continue
+                end = line.find(';')
+                if end < 0:
+                    statement.append(line)
+                    continue
+
+                entry = DATParser._parseStatement(''.join(statement) + line[:end])
+                if entry is not None:
+                    datAttr.__dict__[entry[0]] = entry[1]
+                elif statement:
+                    pushedBack.append(line)
+                    pushedBack.extend(reversed(statement[1:]))
+                statement = []
         return datAttr
@@ -0,0 +1,164 @@
+"""
+AMMM Project
+Counters and timers of the hot spots of the heuristics
+Eloy Marín, Pablo Pazos
+"""
+
+import collections
+import functools
+import time
+
+# Instrumentation is installed by enable(): it wraps the hot methods with counting versions, so the code runs
+# unmodified when it is disabled. The few counts taken inside method bodies are guarded by ENABLED.
+ENABLED = False
+counters = collections.Counter()
+timers = collections.Counter()
+maxima = collections.Counter()
+
+_originals = []
+
+
+def count(name, n=1):
+    counters[name] += n
+
+
+# Count an attempt and, if it did not succeed, a rejection. Returns success.
+def countAttempt(name, rejectedName, success):
+    counters[name] += 1
+    if not success:
+        counters[rejectedName] += 1
+    return success
+
+
+def observeMax(name, value):
+    if value > maxima[name]:
+        maxima[name] = value
+
+
+def reset():
+    counters.clear()
+    timers.clear()
+    maxima.clear()
+
+
+# Counters of another process (pool workers) added to the ones of this process
+def snapshot():
+    return dict(counters), dict(timers), dict(maxima)
+
+
+def merge(data):
+    workerCounters, workerTimers, workerMaxima = data
+    counters.update(workerCounters)
+    timers.update(workerTimers)
+    for name, value in workerMaxima.items():
+        observeMax(name, value)
+
+
+def _wrap(cls, name, wrapper):
+    original = getattr(cls, name)
+    _originals.append((cls, name, original))
+    setattr(cls, name, functools.wraps(original)(wrapper(original)))
+
+
+def _counted(counter, rejectedCounter=None):
+    def wrapper(method):
+        def counted(*args, **kwargs):
+            counters[counter] += 1
+            result = method(*args, **kwargs)
+            if rejectedCounter is not None and result is False:
+                counters[rejectedCounter] += 1
+            return result
+        return counted
+    return wrapper
+
+
+def _timed(timer):
+    def wrapper(method):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                timers[timer] += time.perf_counter() - start
+                counters[timer] += 1
+        return timed
+    return wrapper
+
+
+def _feasibilityChecked(method):
+    def checked(solution, c_id, l_id, t_id, role):
+        counters['feasibility checks'] += 1
+        reason = solution.rejectionReason(c_id, l_id, t_id, role)
+        if reason is not None:
+            counters['rejected: %s' % reason] += 1
+        return reason is None
+    return checked
+
+
+def _candidatesCounted(method):
+    def candidates(candidateList, *args):
+        result = method(candidateList, *args)
+        counters['construction steps'] += 1
+        counters['candidates'] += candidateList.numFeasible
+        observeMax('candidates', candidateList.numFeasible)
+        return result
+    return candidates
+
+
+def enable():
+    global ENABLED
+    if ENABLED: return
+    # imported here, the solvers import this module
+    from Heuristics.problem.candidateList import CandidateList
+    from Heuristics.problem.solution import Solution
+    from Heuristics.solvers.localSearch import LocalSearch
+    from Heuristics.solvers.pathRelinking import PathRelinking
+    from Heuristics.solvers.solver_GRASP import Solver_GRASP
+    from Heuristics.solvers.solver_Greedy import Solver_Greedy
+
+    _wrap(Solution, 'isFeasibleToAssign', _feasibilityChecked)
+    _wrap(Solution, 'assignCenter', _counted('assign calls', 'assign rejected'))
+    _wrap(Solution, 'unassignCenter', _counted('unassign calls', 'unassign rejected'))
+    _wrap(CandidateList, 'getRestricted', _candidatesCounted)
+    _wrap(CandidateList, 'getAssignments', _candidatesCounted)
+    _wrap(Solution, 'copy', _timed('solution copies'))
+    _wrap(LocalSearch, 'evaluateNeighbor', _counted('ls neighbors evaluated'))
+    _wrap(LocalSearch, '_planClosure', _counted('ls neighbors evaluated'))
+    _wrap(LocalSearch, 'exploreNeighborhood', _timed('ls iterations'))
+    _wrap(LocalSearch, 'solve', _timed('local search'))
+    _wrap(Solver_Greedy, 'construction', _timed('construction'))
+    _wrap(Solver_GRASP, '_greedyRandomizedConstruction', _timed('construction'))
+    _wrap(PathRelinking, 'relink', _timed('path relinking'))
+    ENABLED = True
+
+
+def disable():
+    global ENABLED
+    while _originals:
+        cls, name, original = _originals.pop()
+        setattr(cls, name, original)
+    ENABLED = False
+
+
+def report():
+    print('Instrumentation:')
+    print('  Phases:')
+    for name in ['construction', 'local search', 'ls iterations', 'path relinking', 'solution copies']:
+        if counters[name] == 0: continue
+        print('    %-20s %10d calls %12.4f s' % (name, counters[name], timers[name]))
+
+    checks = counters['feasibility checks']
+    print('  Feasibility checks:   %10d' % checks)
+    for name in sorted(n for n in counters if n.startswith('rejected: ')):
+        print('    %-20s %10d (%.1f%%)' % (name, counters[name], 100.0 * counters[name] / checks if checks else 0.0))
+    print('  Assign calls:         %10d (%d rejected)' % (counters['assign calls'], counters['assign rejected']))
+    print('  Unassign calls:       %10d (%d rejected)' % (counters['unassign calls'], counters['unassign rejected']))
+
+    steps = counters['construction steps']
+    print('  Construction steps:   %10d, %.1f candidates per step (max %d)'
+          % (steps, counters['candidates'] / steps if steps else 0.0, maxima['candidates']))
+    print('  LS neighbors:         %10d evaluated, %d created (%d infeasible), %d best moves re-applied'
+          % (counters['ls neighbors evaluated'], counters['ls neighbors created'], counters['ls neighbors infeasible'],
+             counters['ls moves re-applied']))
+    if counters['pr steps'] > 0:
+        print('  Path relinking steps: %10d (%d infeasible)' % (counters['pr steps'], counters['pr steps infeasible']))
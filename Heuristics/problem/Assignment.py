@@ -0,0 +1,22 @@
+"""
+AMMM Project
+Assignment class.
+Eloy Marín, Pablo Pazos
+"""
+
+
+# This class stores the location and center type that serves as primary/secondary center a given city.
+class Assignment(object):
+    def __init__(self, location, type, city, is_primary, cost=None):
+        self.location = location
+        self.type = type
+        self.city = city
+        self.is_primary = is_primary
+        if cost is None:
+            self.cost = float('infinity')
+        else:
+            self.cost = cost
+
+    def __str__(self):
+        return "<c_%d, l_%d, t_%d>: %s center" % (
+            self.city.getId(), self.location.getId(), self.type.get_id(), 'Primary' if self.is_primary else 'Secondary')
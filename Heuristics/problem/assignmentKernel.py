@@ -0,0 +1,208 @@
+"""
+AMMM Project
+Batched feasibility and cost kernel for assignment candidates
+Eloy Marín, Pablo Pazos
+"""
+
+import bisect
+
+import numpy as np
+
+# role index used in the last axis of the masks
+PRIMARY = 0
+SECONDARY = 1
+
+
+# Per-location and per-city state of a (partial) solution in array form.
+# type_at[l] is the type id of the center at location l (-1 if unused), load[l] the population it serves
+# (in tenths of inhabitants, see AssignmentKernel),
+# max_need[l] the lowest rank in the type ladder able to reach all the cities it serves,
+# blocked[l] the number of open centers closer than d_center to l and
+# primary_at[c]/secondary_at[c] the location serving city c in each role (-1 if not assigned yet).
+class AssignmentState(object):
+    def __init__(self, type_at, load, max_need, blocked, primary_at, secondary_at):
+        self.type_at = type_at
+        self.load = load
+        self.max_need = max_need
+        self.blocked = blocked
+        self.primary_at = primary_at
+        self.secondary_at = secondary_at
+
+
+# Evaluates isFeasibleToAssignCenterToCity and the resulting cost increment for whole blocks of
+# <city, location, type, role> candidates at once using NumPy broadcasting.
+# Only the admissible city-location pairs (distance <= 3 * max(d_city)) are stored, in CSR form sorted by
+# distance: the locations of city c are pairLocation[cityPtr[c]:cityPtr[c + 1]] and the pairs of location l
+# are locationPairs[locationPtr[l]:locationPtr[l + 1]]. A given <city, location> pair is found with a binary
+# search over the pairs sorted by city and location, so the memory grows with the number of admissible pairs.
+# Capacities, demands and loads are counted in tenths of inhabitants: a city adds 10 * p to its primary center
+# and p to its secondary one, so with integer populations every load is an integer and the capacity tests are exact
+# (a center that is filled exactly is not rejected because of the rounding of 0.1 * p).
+# The kernel only holds instance data, so it is shared by every solution of the instance.
+class AssignmentKernel(object):
+    def __init__(self, nLocations, pairs, population, d_city, cap, cost, compatible):
+        self.nLocations = nLocations
+        self.population = np.asarray(population, dtype=float)
+        self.nCities = len(self.population)
+        self.d_city = np.asarray(d_city, dtype=float)
+        self.cap = 10 * np.asarray(cap, dtype=float)
+        self.cost = np.asarray(cost, dtype=float)
+        # compatible[l1, l2] is True if l2 can be used together with l1
+        self.compatible = np.asarray(compatible, dtype=bool)
+        # conflicts[l1] are the locations that cannot be used while l1 is used (l1 itself excluded)
+        self.conflicts = ~self.compatible
+        np.fill_diagonal(self.conflicts, False)
+
+        # admissible city-location pairs
+        self.cityPtr, self.pairLocation, self.pairDistance = pairs
+        self.pairCity = np.repeat(np.arange(self.nCities), np.diff(self.cityPtr))
+        self.locationPairs = np.argsort(self.pairLocation, kind='stable')
+        self.locationPtr = np.zeros(nLocations + 1, dtype=int)
+        self.locationPtr[1:] = np.cumsum(np.bincount(self.pairLocation, minlength=nLocations))
+        # keys city * nLocations + location of the pairs in increasing order and their pairs, ended by a key
+        # larger than any other so a search always lands on an entry
+        pairKey = self.pairCity.astype(np.int64) * nLocations + self.pairLocation
+        keyOrder = np.argsort(pairKey, kind='stable')
+        self.sortedKeys = np.append(pairKey[keyOrder], np.iinfo(np.int64).max)
+        self.keyPairs = np.append(keyOrder, -1)
+
+        # maximum distance for each <type, role> and population served for each <city, role>
+        self.reach = np.stack([self.d_city, 3 * self.d_city], axis=1)
+        self.demand = np.stack([10 * self.population, self.population], axis=1)
+
+        # Type ladder. Types are ranked by the position of their d_city among the distinct d_city values.
+        # pairNeed[role, k] is the lowest rank that can serve the city of pair k from its location in the given
+        # role (nRanks if none can), so a type can serve a set of cities iff its rank is >= the largest need.
+        # Pairs that are not admissible have need nRanks (see getNeed). need <= typeRank[t] is the distance
+        # constraint of type t.
+        thresholds = np.unique(self.d_city)
+        self.nRanks = len(thresholds)
+        self.typeRank = np.searchsorted(thresholds, self.d_city)
+        self.pairNeed = np.stack([np.searchsorted(thresholds, self.pairDistance),
+                                  np.searchsorted(3 * thresholds, self.pairDistance)])
+        # the same keys and the needs of their pairs as lists, single lookups are faster on Python objects
+        self.keyList = self.sortedKeys.tolist()
+        self.keyNeed = [need + [self.nRanks] for need in self.pairNeed[:, keyOrder].tolist()]
+
+        # For each need, the types able to serve it sorted by cost (then id) keeping only the ones whose
+        # capacity is larger than the capacity of every cheaper type: the cheapest type fitting a load is
+        # found with a binary search on the capacities.
+        self.ladderCaps = []
+        self.ladderTypes = []
+        order = sorted(range(len(self.cost)), key=lambda t: (self.cost[t], t))
+        for need in range(self.nRanks + 1):
+            caps = []
+            types = []
+            for t in order:
+                if self.typeRank[t] >= need and (not caps or self.cap[t] > caps[-1]):
+                    caps.append(float(self.cap[t]))
+                    types.append(t)
+            self.ladderCaps.append(caps)
+            self.ladderTypes.append(types)
+
+    # The kernel is read-only, copies of a solution can share it
+    def __deepcopy__(self, memo):
+        return self
+
+    # Cheapest type able to serve the given need and load, -1 if there is none
+    def cheapestType(self, need, load):
+        caps = self.ladderCaps[need]
+        i = bisect.bisect_left(caps, load)
+        return self.ladderTypes[need][i] if i < len(caps) else -1
+
+    # Vectorized cheapestType for arrays of needs and loads
+    def cheapestTypes(self, needs, loads):
+        types = np.full(len(needs), -1, dtype=int)
+        for need in np.unique(needs).tolist():
+            selected = np.flatnonzero(needs == need)
+            caps = self.ladderCaps[need]
+            i = np.searchsorted(caps, loads[selected], side='left')
+            fits = i < len(caps)
+            types[selected[fits]] = np.asarray(self.ladderTypes[need], dtype=int)[i[fits]]
+        return types
+
+    # Cost increment of placing each type at each of the given locations, shape (nl, T)
+    def assignmentCost(self, state, locations=None):
+        if locations is None: locations = slice(None)
+        type_at = state.type_at[locations]
+        old_cost = np.where(type_at >= 0, self.cost[type_at], 0.0)
+        return self.cost[np.newaxis, :] - old_cost[:, np.newaxis]
+
+    # Pair of each given city and location (arrays broadcast together), -1 if the pair is not admissible
+    def pairIndex(self, cities, locations):
+        keys = np.asarray(cities, dtype=np.int64) * self.nLocations + locations
+        k = np.searchsorted(self.sortedKeys, keys)
+        return np.where(self.sortedKeys[k] == keys, self.keyPairs[k], -1)
+
+    # Need of serving city c_id from location l_id in the given role, nRanks if the pair is not admissible
+    def getNeed(self, role, c_id, l_id):
+        key = int(c_id) * self.nLocations + int(l_id)
+        k = bisect.bisect_left(self.keyList, key)
+        return self.keyNeed[role][k] if self.keyList[k] == key else self.nRanks
+
+    # Vectorized getNeed for arrays of roles, cities and locations broadcast together
+    def needs(self, roles, cities, locations):
+        pairs = self.pairIndex(cities, locations)
+        return np.where(pairs >= 0, self.pairNeed[roles, pairs], self.nRanks)
+
+    # Distance between a city and a location (infinity if the pair is not admissible)
+    def distance(self, c_id, l_id):
+        k = int(self.pairIndex(c_id, l_id))
+        return float(self.pairDistance[k]) if k >= 0 else float('infinity')
+
+    # Pairs of the given city, sorted by distance
+    def cityPairs(self, c_id):
+        return np.arange(self.cityPtr[c_id], self.cityPtr[c_id + 1])
+
+    # Pairs of the given location, sorted by city
+    def locationPairsOf(self, l_id):
+        return self.locationPairs[self.locationPtr[l_id]:self.locationPtr[l_id + 1]]
+
+    # Feasibility of each given city-location pair with each type and role, shape (n, T, 2)
+    def evaluatePairs(self, state, pairs):
+        cities = self.pairCity[pairs]
+        locations = self.pairLocation[pairs]
+        nTypes = len(self.cost)
+
+        # city already has this role or the other role is served from the same location
+        primary_at = state.primary_at[cities]
+        secondary_at = state.secondary_at[cities]
+        role_ok = np.empty((len(pairs), 2), dtype=bool)
+        role_ok[:, PRIMARY] = (primary_at < 0) & (secondary_at != locations)
+        role_ok[:, SECONDARY] = (secondary_at < 0) & (primary_at != locations)
+
+        # distance constraint of the role
+        mask = self.pairNeed[:, pairs].T[:, np.newaxis, :] <= self.typeRank[np.newaxis, :, np.newaxis]
+        mask &= role_ok[:, np.newaxis, :]
+
+        # compatibility with the locations already used
+        mask &= (state.blocked[locations] == 0)[:, np.newaxis, np.newaxis]
+
+        # capacity of the type with the population already served
+        residual = self.cap[np.newaxis, :] - state.load[locations][:, np.newaxis]
+        mask &= residual[:, :, np.newaxis] >= self.demand[cities][:, np.newaxis, :]
+
+        # a type change has to keep serving the cities already assigned to the location
+        type_at = state.type_at[locations]
+        type_ok = state.max_need[locations][:, np.newaxis] <= self.typeRank[np.newaxis, :]
+        type_ok |= (type_at < 0)[:, np.newaxis] | (type_at[:, np.newaxis] == np.arange(nTypes))
+        mask &= type_ok[:, :, np.newaxis]
+        return mask
+
+    # Feasibility of moving role[i] of city[i] to each given (used) location keeping its current type.
+    # Returns a boolean mask of shape (n, nl).
+    def reassignmentMask(self, state, cities, roles, locations):
+        cities = np.asarray(cities, dtype=int)
+        roles = np.asarray(roles, dtype=int)
+        locations = np.asarray(locations, dtype=int)
+
+        other_at = np.where(roles == PRIMARY, state.secondary_at[cities], state.primary_at[cities])
+        mask = other_at[:, np.newaxis] != locations[np.newaxis, :]
+
+        type_at = state.type_at[locations]
+        need = self.needs(roles[:, np.newaxis], cities[:, np.newaxis], locations[np.newaxis, :])
+        mask &= need <= self.typeRank[type_at][np.newaxis, :]
+
+        residual = self.cap[type_at] - state.load[locations]
+        mask &= residual[np.newaxis, :] >= self.demand[cities, roles][:, np.newaxis]
+        return mask
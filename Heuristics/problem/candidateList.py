@@ -0,0 +1,152 @@
+"""
+AMMM Project
+Incremental candidate list used by the constructive algorithms
+Eloy Marín, Pablo Pazos
+"""
+
+import numpy as np
+
+from Heuristics.problem.Assignment import Assignment
+from Heuristics.problem.assignmentKernel import PRIMARY
+
+
+# Keeps the feasible assignments of a partial solution between construction steps.
+# Committing an assignment <c, l, t, role> can only change the feasibility of:
+#  - the remaining role of city c,
+#  - every candidate at location l (its load, type and served cities changed),
+#  - every candidate at a location that is not compatible with l, when l has just been opened.
+# The rest of the entries and their cost increments are kept, so a construction step only re-evaluates
+# the entries touched by the last commit instead of trying every <city, location, type, role> tuple.
+# Candidates are only kept for the admissible city-location pairs of the kernel.
+# The capacity test is exact (see AssignmentKernel), so an assignment that fills a center exactly is a candidate.
+# The list is the one of the assign()/unassign() probing of the original findFeasibleAssignments except where
+# that probing drifted the load of a location and rejected such an exact fit.
+class CandidateList(object):
+    def __init__(self, solution):
+        self.solution = solution
+        self.kernel = solution.kernel
+        state = solution.getAssignmentState()
+        # mask[p, t, role] is True if the assignment of pair p with type t is feasible
+        self.mask = self.kernel.evaluatePairs(state, np.arange(len(self.kernel.pairCity)))
+        # increment[l, t] is the cost increment of using type t at location l
+        self.increment = self.kernel.assignmentCost(state)
+        # count[l, t] is the number of feasible assignments at location l with type t: the cost of an assignment
+        # only depends on its location and type, so the cost range of the candidates is found on this matrix
+        self.count = np.zeros(self.increment.shape, dtype=int)
+        np.add.at(self.count, self.kernel.pairLocation, self.mask.sum(axis=2))
+        # number of feasible assignments found by the last getRestricted/getAssignments
+        self.numFeasible = 0
+
+    # Update the candidates after assignment <c_id, l_id, role> has been committed into the solution
+    def update(self, c_id, l_id, role, opened):
+        rows = slice(self.kernel.cityPtr[c_id], self.kernel.cityPtr[c_id + 1])
+        before = self.mask[rows].sum(axis=2)
+        if self.solution.primary[c_id] >= 0 and self.solution.secondary[c_id] >= 0:
+            self.mask[rows] = False
+        else:
+            # the city cannot take this role anymore
+            self.mask[rows, :, role] = False
+        np.subtract.at(self.count, self.kernel.pairLocation[rows], before - self.mask[rows].sum(axis=2))
+
+        # a new center restricts the locations that can still be used
+        if opened:
+            conflicts = np.flatnonzero(self.kernel.conflicts[l_id]).tolist()
+            if conflicts:
+                self.mask[np.concatenate([self.kernel.locationPairsOf(l) for l in conflicts])] = False
+                self.count[conflicts] = 0
+
+        # load, type and served cities of the location have changed
+        state = self.solution.getAssignmentState()
+        pairs = self.kernel.locationPairsOf(l_id)
+        cities = self.kernel.pairCity[pairs]
+        pairs = pairs[(state.primary_at[cities] < 0) | (state.secondary_at[cities] < 0)]
+        self.mask[pairs] = self.kernel.evaluatePairs(state, pairs)
+        self.count[l_id] = self.mask[self.kernel.locationPairsOf(l_id)].sum(axis=(0, 2))
+        self.increment[l_id] = self.kernel.assignmentCost(state, [l_id])[0]
+
+    # Restricted candidate list of GRASP: the feasible assignments whose cost is at most min + alpha * (max - min),
+    # see RestrictedCandidates. With alpha 0 these are the assignments of minimum cost.
+    def getRestricted(self, alpha):
+        feasible = self.count > 0
+        self.numFeasible = int(self.count.sum())
+        cellCost = self.solution.cost + self.increment
+        if self.numFeasible == 0:
+            return RestrictedCandidates(self, feasible, cellCost)
+        minCost = cellCost[feasible].min()
+        maxCost = cellCost[feasible].max()
+        boundary = minCost + (maxCost - minCost) * alpha
+        return RestrictedCandidates(self, feasible & (cellCost <= boundary), cellCost)
+
+    # return the feasible assignments in the order <city, location, type, primary/secondary>
+    def getAssignments(self):
+        p_idx, t_idx, r_idx = np.nonzero(self.mask)
+        self.numFeasible = len(p_idx)
+        c_idx = self.kernel.pairCity[p_idx]
+        l_idx = self.kernel.pairLocation[p_idx]
+        order = np.lexsort((r_idx, t_idx, l_idx, c_idx))
+        c_idx, l_idx, t_idx, r_idx = c_idx[order], l_idx[order], t_idx[order], r_idx[order]
+        costs = (self.solution.cost + self.increment[l_idx, t_idx]).tolist()
+
+        cities = self.solution.cities
+        locations = self.solution.locations
+        types = self.solution.types
+        feasibleAssignments = []
+        for c, l, t, r, cost in zip(c_idx.tolist(), l_idx.tolist(), t_idx.tolist(), r_idx.tolist(), costs):
+            feasibleAssignments.append(Assignment(locations[l], types[t], cities[c], r == PRIMARY, cost))
+        return feasibleAssignments
+
+
+# Restricted candidate list as a read-only sequence of Assignments sorted by cost and, for the same cost, in the
+# order <city, location, type, primary/secondary>, as the sorted list of getAssignments. The cost of an assignment
+# only depends on its <location, type> cell, so the length of the list comes from the counts of the candidate list
+# and accessing an entry only reads the pairs of the cells with its cost: picking a random candidate does not
+# create an Assignment for every entry.
+class RestrictedCandidates(object):
+    def __init__(self, candidateList, cells, cellCost):
+        self.candidateList = candidateList
+        cells = np.flatnonzero(cells)
+        costs = cellCost.ravel()[cells]
+        order = np.argsort(costs, kind='stable')
+        self.cells = cells[order]
+        self.costs = costs[order]
+        # ends[k] is the number of entries in the first k + 1 cells
+        self.ends = np.cumsum(candidateList.count.ravel()[self.cells])
+
+    def __len__(self):
+        return int(self.ends[-1]) if len(self.ends) > 0 else 0
+
+    def __getitem__(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError('restricted candidate index out of range')
+        candidateList = self.candidateList
+        kernel = candidateList.kernel
+        nTypes = candidateList.count.shape[1]
+
+        # cells with the cost of entry i and the number of entries before them
+        cost = self.costs[np.searchsorted(self.ends, i, side='right')]
+        first = np.searchsorted(self.costs, cost, side='left')
+        last = np.searchsorted(self.costs, cost, side='right')
+        before = int(self.ends[first - 1]) if first > 0 else 0
+
+        # entries of those cells in the order <city, location, type, role>: the pairs of the location of each cell,
+        # read in the column of its type
+        cells = self.cells[first:last]
+        starts = kernel.locationPtr[cells // nTypes]
+        sizes = kernel.locationPtr[cells // nTypes + 1] - starts
+        offsets = np.repeat(starts - np.cumsum(sizes) + sizes, sizes) + np.arange(int(sizes.sum()))
+        pairs = kernel.locationPairs[offsets]
+        types = np.repeat(cells % nTypes, sizes)
+        k_idx, r_idx = np.nonzero(candidateList.mask[pairs, types])
+        c_idx = kernel.pairCity[pairs[k_idx]]
+        l_idx = kernel.pairLocation[pairs[k_idx]]
+        t_idx = types[k_idx]
+        # city of the entry and its position among the entries of the city, which are sorted by location, type and role
+        cityEnds = np.cumsum(np.bincount(c_idx, minlength=kernel.nCities))
+        c_id = int(np.searchsorted(cityEnds, i - before, side='right'))
+        j = i - before - (int(cityEnds[c_id - 1]) if c_id > 0 else 0)
+        inCity = np.flatnonzero(c_idx == c_id)
+        k = inCity[np.lexsort((r_idx[inCity], t_idx[inCity], l_idx[inCity]))[j]]
+
+        solution = candidateList.solution
+        return Assignment(solution.locations[l_idx[k]], solution.types[t_idx[k]], solution.cities[c_idx[k]],
+                          bool(r_idx[k] == PRIMARY), float(cost))
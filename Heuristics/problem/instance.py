@@ -6,21 +6,42 @@ File given Luis Velasco and under its copyright policy
 Modified for project purposes
 """
 
-import math
+import numpy as np
 
+from Heuristics.problem.assignmentKernel import AssignmentKernel
 from Heuristics.problem.City import City
+from Heuristics.problem.instanceCache import InstanceCache, instanceHash
 from Heuristics.problem.Location import Location
+from Heuristics.problem.lowerBound import LagrangianBound
 from Heuristics.problem.solution import Solution
+from Heuristics.problem.spatialIndex import SpatialGrid
 from Heuristics.problem.Type import Type
 
-# function that compute the euclidean distance between 2 points
-# It is used to check distance constraints
-def distance(l1, l2, min_dist=None):
-    d = math.sqrt(math.pow(l1.getX() - l2.getX(), 2) + math.pow(l1.getY() - l2.getY(), 2))
-    if min_dist is not None:
-        return d >= min_dist
-    else:
-        return d
+# rows of the location-location distance matrix computed at once when building the compatibility matrix
+BLOCK_ROWS = 1024
+
+
+# Geometric precomputation of an instance:
+#  - compatible[l1, l2] is True if l1 != l2 are at distance >= d_center, so both can host a center,
+#  - the admissible city-location pairs (distance <= 3 * max(d_city)) in CSR form (see AssignmentKernel).
+# The compatibility matrix is stored packed to 1 bit per location pair.
+def precompute(posCities, posLocations, d_city, d_center):
+    locations = np.asarray(posLocations, dtype=float).reshape(-1, 2)
+    cities = np.asarray(posCities, dtype=float).reshape(-1, 2)
+    nLocations = len(locations)
+
+    # distances computed by blocks of rows with NumPy broadcasting
+    compatible = np.empty((nLocations, nLocations), dtype=bool)
+    for start in range(0, nLocations, BLOCK_ROWS):
+        delta = locations[start:start + BLOCK_ROWS, np.newaxis, :] - locations[np.newaxis, :, :]
+        distances = np.sqrt(delta[:, :, 0] * delta[:, :, 0] + delta[:, :, 1] * delta[:, :, 1])
+        compatible[start:start + BLOCK_ROWS] = distances >= d_center
+    np.fill_diagonal(compatible, False)
+
+    radius = 3 * max(d_city)
+    cityPtr, pairLocation, pairDistance = SpatialGrid(locations, radius).pairsWithin(cities, radius)
+    return {'compatible': np.packbits(compatible, axis=1), 'cityPtr': cityPtr, 'pairLocation': pairLocation,
+            'pairDistance': pairDistance}
 
 
 class Instance(object):
@@ -42,42 +63,47 @@ class Instance(object):
 
         d_center = inputData.d_center
 
+        # Binary instances hold (memory-mapped) NumPy arrays: the objects below are built from plain Python values,
+        # the precomputation and the kernel take the arrays as they are
+        values = lambda data: data.tolist() if isinstance(data, np.ndarray) else data
+
         # Create Location objects
         self.locations = [None] * nLocations
-        for i, location in enumerate(posLocations):
+        for i, location in enumerate(values(posLocations)):
             self.locations[i] = Location(location[0], location[1], i)
 
         # Create City objects
         self.cities = [None] * nCities
-        for i in range(nCities):
-            x = posCities[i][0]
-            y = posCities[i][1]
-            self.cities[i] = City(Location(x, y, i), p[i])
+        for i, (position, population) in enumerate(zip(values(posCities), values(p))):
+            self.cities[i] = City(Location(position[0], position[1], i), population)
 
         # Create Type objects
         self.types = [None] * nTypes
-        for i in range(nTypes):
-            self.types[i] = Type(d_city[i], cap[i], cost[i], i)
-
-        # Get locations that are at distance >= d_center
-        self.distance_l1l2 = [None] * nLocations
-        for i in range(nLocations):
-            self.distance_l1l2[i] = []
-
-        for i in range(nLocations):
-            for j in range(nLocations):
-                if i != j and distance(self.locations[i], self.locations[j], d_center):
-                    self.distance_l1l2[i].append(j)
-
-        # Get distance between locations and cities
-        self.distance_cl = [None] * nCities
-        for i in range(nCities):
-            self.distance_cl[i] = [None] * nLocations
-
-        for i in range(nCities):
-            for j in range(nLocations):
-                d = distance(self.cities[i].getLocation(), self.locations[j])
-                self.distance_cl[i][j] = d
+        for i, (d, c, k) in enumerate(zip(values(d_city), values(cap), values(cost))):
+            self.types[i] = Type(d, c, k, i)
+
+        # Get locations that are at distance >= d_center and the admissible city-location pairs: a city can only
+        # be served by locations within the reach of a secondary center of the largest type. The pairs are
+        # found with a grid over the locations and kept in CSR form (see AssignmentKernel), so the memory grows
+        # with the number of admissible pairs. The result only depends on the coordinates and distances of the
+        # instance, so it is cached on disk under their content hash.
+        arrays = None
+        if self.config.useCache:
+            key = instanceHash(posCities, posLocations, d_city, d_center)
+            cache = InstanceCache(self.config.cacheDir, self.config.cacheMaxEntries)
+            arrays = cache.load(key)
+        if arrays is None:
+            arrays = precompute(posCities, posLocations, d_city, d_center)
+            if self.config.useCache:
+                cache.save(key, arrays)
+
+        # compatible[l1, l2] is True if l2 can be used together with l1
+        self.distance_l1l2 = np.unpackbits(arrays['compatible'], axis=1, count=nLocations).astype(bool)
+        self.distance_cl = (arrays['cityPtr'], arrays['pairLocation'], arrays['pairDistance'])
+
+        # Batched feasibility/cost evaluation of assignment candidates
+        self.kernel = AssignmentKernel(nLocations, self.distance_cl, p, d_city, cap, cost, self.distance_l1l2)
+        self.lowerBound = None
 
     def getNumLocations(self):
         return len(self.locations)
@@ -94,20 +120,25 @@ class Instance(object):
     def getTypes(self):
         return self.types
 
+    # boolean matrix, row l1 marks the locations that can be used together with l1
     def get_locations_at_min_distance(self):
         return self.distance_l1l2
 
+    # admissible city-location pairs in CSR form (indptr, locations, distances)
     def get_cities_locations_distance(self):
         return self.distance_cl
 
     def createSolution(self):
-        solution = Solution(self.cities, self.locations, self.types, self.distance_l1l2, self.distance_cl)
+        solution = Solution(self.cities, self.locations, self.types, self.kernel)
         solution.setVerbose(self.config.verbose)
         return solution
 
+    # Lagrangian lower bound of the optimal cost (see lowerBound.py), computed on first use in at most
+    # timeLimit seconds
+    def getLowerBound(self, timeLimit=None):
+        if self.lowerBound is None:
+            self.lowerBound = LagrangianBound(self.kernel).compute(timeLimit=timeLimit)
+        return self.lowerBound
+
     def checkInstance(self):
-        for v in self.distance_l1l2:
-            for j in v:
-                if j is not None:
-                    return True
-        return False
+        return bool(self.distance_l1l2.any())
@@ -0,0 +1,93 @@
+"""
+AMMM Project
+On-disk cache of the geometric precomputation of an instance
+Eloy Marín, Pablo Pazos
+"""
+
+import hashlib
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+
+# bump when the cached arrays change their meaning, so caches written by older versions are not used
+CACHE_VERSION = 1
+
+
+# Content hash of the instance data the precomputation depends on.
+# Two inputs with the same coordinates and distances get the same key whatever their file name or layout.
+def instanceHash(posCities, posLocations, d_city, d_center):
+    digest = hashlib.sha256()
+    digest.update(('v%d' % CACHE_VERSION).encode())
+    for values in (posCities, posLocations, d_city, [d_center]):
+        array = np.ascontiguousarray(values, dtype=float)
+        digest.update(str(array.shape).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+# Directory of .npz files, one per instance, named after the content hash of the instance.
+# A file whose stored key does not match (stale, truncated or from another version) is ignored and rewritten.
+# At most maxEntries files are kept: the modification time of a file is updated when it is used, and the least
+# recently used files are removed when a new one is stored.
+class InstanceCache(object):
+    def __init__(self, directory, maxEntries=None):
+        self.directory = directory
+        self.maxEntries = maxEntries
+
+    def _path(self, key):
+        return os.path.join(self.directory, '%s.npz' % key)
+
+    # Arrays stored for the key, None if there is no valid cache entry
+    def load(self, key):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if str(data['key']) != key:
+                    return None
+                arrays = {name: data[name] for name in data.files if name != 'key'}
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return arrays
+
+    # Store the arrays for the key. The file is written aside and renamed, so readers never see half a file.
+    def save(self, key, arrays):
+        os.makedirs(self.directory, exist_ok=True)
+        handle, tmpPath = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as f:
+                np.savez(f, key=np.array(key), **arrays)
+            os.chmod(tmpPath, 0o644)
+            os.replace(tmpPath, self._path(key))
+        except OSError:
+            if os.path.exists(tmpPath):
+                os.remove(tmpPath)
+        self.prune()
+
+    # Remove the least recently used files beyond maxEntries. Other processes may be using the cache, so files
+    # that are already gone are skipped.
+    def prune(self):
+        if self.maxEntries is None:
+            return
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.npz'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:
+                continue
+        entries.sort(reverse=True)
+        for _, path in entries[self.maxEntries:]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,146 @@
+"""
+AMMM Project
+Lagrangian lower bound of the cost of the optimal solution
+Eloy Marín, Pablo Pazos
+"""
+
+import math
+import time
+
+import numpy as np
+
+from Heuristics.problem.assignmentKernel import PRIMARY, SECONDARY
+
+# Subgradient optimization: iterations, iterations without improvement before the step is halved and smallest step
+MAX_ITERATIONS = 500
+PATIENCE = 20
+MIN_STEP = 1e-3
+
+
+# Lagrangian relaxation of the constraints "every city has one primary and one secondary center" with multiplier
+# u[c, role]. The relaxed problem splits by location: each location takes the type t (or no center) that maximizes
+# the multipliers of the city roles it can serve within its capacity minus cost[t], a knapsack per <location, type>
+# in which every city is served in one role at most. The knapsacks are solved as linear relaxations and the
+# compatibility between centers is dropped, which can only lower the bound.
+# The linear relaxation of a knapsack with a choice of roles is solved greedily over incremental items: the
+# secondary role of a city and then its upgrade to primary role (demand 0.9 * p), or the primary role alone when
+# serving the city as secondary is not worth it. The items of all the <location, type> knapsacks are the admissible
+# city-location pairs of the kernel, so every knapsack of a type is evaluated at once with NumPy.
+class LagrangianBound(object):
+    def __init__(self, kernel):
+        self.kernel = kernel
+        self.pairCity = kernel.pairCity
+        self.pairLocation = kernel.pairLocation
+        self.demandP = kernel.demand[kernel.pairCity, PRIMARY]
+        self.demandS = kernel.demand[kernel.pairCity, SECONDARY]
+        # item i is the first item of pair i, item nPairs + i its upgrade
+        self.itemLocation = np.concatenate([kernel.pairLocation, kernel.pairLocation])
+        # the costs of the centers are integer in the usual instances, then so is the optimal cost
+        self.integerCosts = bool(np.all(kernel.cost == np.round(kernel.cost)))
+
+    # Value of the Lagrangian function for the multipliers u (shape nCities x 2) and a subgradient
+    def evaluate(self, u):
+        kernel = self.kernel
+        nPairs = len(self.pairCity)
+        uP = u[self.pairCity, PRIMARY]
+        uS = u[self.pairCity, SECONDARY]
+
+        bestValue = np.zeros(kernel.nLocations)
+        bestType = np.full(kernel.nLocations, -1, dtype=int)
+        servedByType = []
+        for t in range(len(kernel.cost)):
+            secondary = (kernel.pairNeed[SECONDARY] <= kernel.typeRank[t]) & (uS > 0)
+            primary = (kernel.pairNeed[PRIMARY] <= kernel.typeRank[t]) & (uP > 0) & (~secondary | (uP > uS))
+            # serving as secondary and then upgrading is on the hull if its profit per demand is not smaller
+            upgrade = secondary & primary & (10 * uS >= uP)
+            firstIsSecondary = secondary & (~primary | upgrade)
+            firstIsPrimary = primary & ~upgrade
+            weight = np.concatenate([np.where(firstIsSecondary, self.demandS, np.where(firstIsPrimary, self.demandP, 0.0)),
+                                     np.where(upgrade, self.demandP - self.demandS, 0.0)])
+            profit = np.concatenate([np.where(firstIsSecondary, uS, np.where(firstIsPrimary, uP, 0.0)),
+                                     np.where(upgrade, uP - uS, 0.0)])
+
+            # items by location and, within a location, by profit per unit of demand (upgrades after their pair)
+            ratio = np.where(weight > 0, profit / np.where(weight > 0, weight, 1.0), -1.0)
+            order = np.lexsort((-ratio, self.itemLocation))
+            location = self.itemLocation[order]
+            sortedWeight = weight[order]
+            # demand of the items taken before each item of its location, the one that does not fit is taken partly
+            cumulative = np.concatenate([[0.0], np.cumsum(sortedWeight)])
+            segmentStart = np.searchsorted(location, np.arange(kernel.nLocations))[location]
+            before = cumulative[:-1] - cumulative[segmentStart]
+            taken = np.zeros(len(order))
+            taken[order] = np.where(sortedWeight > 0, np.clip((kernel.cap[t] - before) /
+                                                              np.where(sortedWeight > 0, sortedWeight, 1.0), 0, 1), 0)
+            value = np.bincount(self.itemLocation, weights=profit * taken, minlength=kernel.nLocations) - kernel.cost[t]
+
+            first, second = taken[:nPairs], taken[nPairs:]
+            servedByType.append((np.where(firstIsPrimary, first, 0.0) + second,
+                                 np.where(firstIsSecondary, first - second, 0.0)))
+            better = value > bestValue
+            bestValue[better] = value[better]
+            bestType[better] = t
+
+        # subgradient: 1 - number of centers serving each city role in the relaxed solution
+        subgradient = np.ones_like(u)
+        for t, (servedP, servedS) in enumerate(servedByType):
+            selected = bestType[self.pairLocation] == t
+            np.subtract.at(subgradient[:, PRIMARY], self.pairCity[selected], servedP[selected])
+            np.subtract.at(subgradient[:, SECONDARY], self.pairCity[selected], servedS[selected])
+        return float(u.sum() - bestValue.sum()), subgradient
+
+    # Initial multipliers: the cheapest cost per unit of capacity of a center able to serve each city role,
+    # times its demand
+    def initialMultipliers(self):
+        kernel = self.kernel
+        unitCost = kernel.cost / kernel.cap
+        u = np.full((kernel.nCities, 2), np.inf)
+        for t in range(len(kernel.cost)):
+            for role, demand in [(PRIMARY, self.demandP), (SECONDARY, self.demandS)]:
+                reachable = kernel.pairNeed[role] <= kernel.typeRank[t]
+                np.minimum.at(u[:, role], self.pairCity[reachable], unitCost[t] * demand[reachable])
+        u[np.isinf(u)] = 0.0
+        return u
+
+    # Best bound found by subgradient optimization. upperBound is the cost of a known solution, it steers the step
+    # and ends the search once the bound reaches it. Stops after timeLimit seconds if given.
+    def compute(self, upperBound=None, timeLimit=None):
+        startTime = time.time()
+        u = self.initialMultipliers()
+        best = -math.inf
+        step = 2.0
+        withoutImprovement = 0
+        for _ in range(MAX_ITERATIONS):
+            value, subgradient = self.evaluate(u)
+            if value > best + 1e-9:
+                best = value
+                withoutImprovement = 0
+            else:
+                withoutImprovement += 1
+                if withoutImprovement >= PATIENCE:
+                    step /= 2
+                    withoutImprovement = 0
+            norm = float((subgradient * subgradient).sum())
+            if norm == 0 or step < MIN_STEP:
+                break
+            if upperBound is not None and self.round(best) >= upperBound:
+                break
+            if timeLimit is not None and time.time() - startTime > timeLimit:
+                break
+            # without a known solution, aim a little above the best bound found
+            target = upperBound if upperBound is not None else best + max(1.0, 0.05 * abs(best))
+            u += step * (target - value) / norm * subgradient
+        return self.round(max(best, 0.0))
+
+    # A bound of an integer optimal cost can be rounded up
+    def round(self, bound):
+        return float(math.ceil(bound - 1e-6)) if self.integerCosts else bound
+
+
+# Relative gap (in %) between the cost of a solution and a lower bound, None if there is no solution or bound
+def optimalityGap(cost, bound):
+    if bound is None or cost == float('infinity'):
+        return None
+    if cost <= 0:
+        return 0.0
+    return 100.0 * (cost - bound) / cost
@@ -7,278 +7,411 @@ Modified for project purposes
 """
 
 import copy
-import random
+
+import numpy as np
 
 from Heuristics.solution import _Solution
+from Heuristics.problem.Assignment import Assignment
+from Heuristics.problem.assignmentKernel import AssignmentState, PRIMARY, SECONDARY
+from Heuristics.problem.candidateList import CandidateList
 
+# role name used by the public API -> role index used in the arrays
+ROLES = {'primary': PRIMARY, 'secondary': SECONDARY}
+ROLE_NAMES = ['primary', 'secondary']
 
-# This class stores the location and center type that serves as primary/secondary center a given city.
-class Assignment(object):
-    def __init__(self, location, type, city, is_primary, cost=None):
-        self.location = location
-        self.type = type
-        self.city = city
-        self.is_primary = is_primary
-        if cost is None:
-            self.cost = float('infinity')
-        else:
-            self.cost = cost
-
-    def __str__(self):
-        return "<c_%d, l_%d, t_%d>: %s center" % (
-            self.city.getId(), self.location.getId(), self.type.get_id(), 'Primary' if self.is_primary else 'Secondary')
+# marks a dictionary key that did not exist when it was logged in the undo trail
+_MISSING = object()
 
 
 # Solution includes functions to manage the solution, to perform feasibility
 # checks and to dump the solution into a string or file.
+# The state is kept in integer/float arrays indexed by city and location id, so cloning a solution
+# only copies a few arrays. Instance data (cities, locations, types, distances, kernel) is shared.
 class Solution(_Solution):
-    def __init__(self, cities, locations, types, compatible_locations, cl_distances):
+    def __init__(self, cities, locations, types, kernel):
         self.cost = 0.0
-        self.cities = copy.deepcopy(cities)
+        self.cities = cities
         self.locations = locations
         self.types = types
-        self.compatible_locations = compatible_locations
-        self.cl_distances = cl_distances
-        # add to this dict locations that are used. key: l_id , value: type class
-        self.locations_used = {}
-        self.aux_locations_used = {}
-        # for each city define its primary and secondary centers
-        # {c_id: {'primary': l1_id, 'secondary': l2_id}}
-        self.cities_centers = {}
-        self.usedPopulationPerCenter = {}
-        # key: location_id, value: [(city,primary/secondary)]
-        self.cities_served_per_each_location = {}
+        # batched feasibility kernel shared by all the solutions of the instance
+        self.kernel = kernel
+
+        nCities = len(cities)
+        nLocations = len(locations)
+        # location serving each city as primary/secondary center (-1 if not assigned)
+        self.primary = np.full(nCities, -1, dtype=int)
+        self.secondary = np.full(nCities, -1, dtype=int)
+        # type of the center at each location (-1 if the location is not used)
+        self.type_at = np.full(nLocations, -1, dtype=int)
+        # population served by each location (in tenths of inhabitants) and number of city roles it serves
+        self.load = np.zeros(nLocations)
+        # number of open centers closer than d_center to each location, a location can be opened iff it is 0
+        self.blocked = np.zeros(nLocations, dtype=int)
+        self.served = np.zeros(nLocations, dtype=int)
+        # needCount[l, k] is the number of city roles served by l that need at least rank k in the type ladder
+        # and maxNeed[l] the largest of those needs, i.e. the lowest rank a type at l must have
+        self.needCount = np.zeros((nLocations, kernel.nRanks + 1), dtype=int)
+        self.maxNeed = np.zeros(nLocations, dtype=int)
+        # order in which roles were assigned and locations opened, used to list them as they were created
+        self.roleStamp = np.full((nCities, 2), -1, dtype=int)
+        self.openedAt = np.full(nLocations, -1, dtype=int)
+        self.stamp = 0
+        # previous type of a location whose type was changed by a tentative assign (check_completeness=False)
+        self.previous_type = {}
         self.complete = False
+        # undo trail: while it is not None every change of the state is logged so it can be rolled back
+        self.trail = None
 
-        self.cities_not_assigned = {}
-        for c in cities:
-            self.cities_not_assigned[c.getId()] = c
-        # self.possible_locations_to_explore = copy.deepcopy(compatible_locations)
+        # feasible assignments kept between construction steps, built on first use
+        self.candidateList = None
         super().__init__()
 
+    # Copy of the solution. Only the arrays holding the state are copied.
+    def copy(self):
+        newSolution = copy.copy(self)
+        newSolution.primary = self.primary.copy()
+        newSolution.secondary = self.secondary.copy()
+        newSolution.type_at = self.type_at.copy()
+        newSolution.load = self.load.copy()
+        newSolution.blocked = self.blocked.copy()
+        newSolution.served = self.served.copy()
+        newSolution.needCount = self.needCount.copy()
+        newSolution.maxNeed = self.maxNeed.copy()
+        newSolution.roleStamp = self.roleStamp.copy()
+        newSolution.openedAt = self.openedAt.copy()
+        newSolution.previous_type = dict(self.previous_type)
+        newSolution.candidateList = None
+        newSolution.trail = None
+        return newSolution
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    # Copy of the solution without the instance data, to send it to another process, which restores the data
+    # of its own copy of the instance with attach()
+    def detach(self):
+        newSolution = self.copy()
+        newSolution.cities = newSolution.locations = newSolution.types = newSolution.kernel = None
+        return newSolution
+
+    def attach(self, instance):
+        self.cities = instance.cities
+        self.locations = instance.locations
+        self.types = instance.types
+        self.kernel = instance.kernel
+        return self
+
+    # Start logging the changes of the solution. Changes made from now on can be undone with rollback().
+    def startTrail(self):
+        self.trail = []
+
+    # Stop logging the changes, the ones made so far are kept
+    def stopTrail(self):
+        self.trail = None
+
+    # Position of the trail to which the solution can be rolled back
+    def getTrailMark(self):
+        return len(self.trail)
+
+    # Undo all the changes logged after the given trail mark
+    def rollback(self, mark):
+        trail = self.trail
+        while len(trail) > mark:
+            container, key, value = trail.pop()
+            if container is None:
+                setattr(self, key, value)
+            elif value is _MISSING:
+                del container[key]
+            else:
+                container[key] = value
+
+    # Set an entry of a state array/dictionary logging its previous value in the trail
+    def _set(self, container, key, value):
+        if self.trail is not None:
+            if isinstance(container, dict):
+                self.trail.append((container, key, container.get(key, _MISSING)))
+            else:
+                self.trail.append((container, key, container[key]))
+        container[key] = value
+
+    # Set a scalar attribute of the solution logging its previous value in the trail
+    def _setAttr(self, name, value):
+        if self.trail is not None:
+            self.trail.append((None, name, getattr(self, name)))
+        setattr(self, name, value)
+
     # Update the total cost of the solution
     def update_cost(self, assignment_cost):
-        self.cost += assignment_cost
+        self._setAttr('cost', self.cost + assignment_cost)
 
     def get_cost(self):
         return self.cost
 
     # Check if the solution is completed
     def is_complete(self):
-        if len(self.cities_centers.keys()) == len(self.cities):
-            complete_solution = True
-            for key in self.cities_centers.keys():
-                if self.cities_centers[key].get('primary') is None or self.cities_centers[key].get('secondary') is None:
-                    complete_solution = False
-            if complete_solution:
-                self.complete = True
-
-    def isFeasibleToAssignCenterToCity(self, city, location, type, pc_or_sc):
-        if self.cities_centers.get(city.getId()) is not None:
-            if self.cities_centers[city.getId()].get(pc_or_sc) is not None:
-                # Check if this city has already been a assigned a primary/secondary center
-                return False
-            elif pc_or_sc == 'primary' and self.cities_centers[city.getId()].get('primary') is None and \
-                    self.cities_centers[city.getId()].get('secondary') == location.getId():
-                return False
-            elif pc_or_sc == 'secondary' and self.cities_centers[city.getId()].get('secondary') is None and \
-                    self.cities_centers[city.getId()].get('primary') == location.getId():
-                return False
-
-        # Check if we want to make this location-type primary but distance constraint is not fulfilled
-        if pc_or_sc == 'primary' and self.cl_distances[city.getId()][location.getId()] > type.get_d_city():
-            return False
-        # Check if we want to make this location-type secondary but distance constraint is not fulfilled
-        elif pc_or_sc == 'secondary' and self.cl_distances[city.getId()][location.getId()] > 3 * type.get_d_city():
-            return False
+        if (self.primary >= 0).all() and (self.secondary >= 0).all():
+            self.complete = True
+
+    # ids of the cities that still miss a primary or a secondary center
+    def getUnassignedCities(self):
+        return np.flatnonzero((self.primary < 0) | (self.secondary < 0))
+
+    # ids of the used locations in the order they were opened
+    def getUsedLocations(self):
+        used = np.flatnonzero(self.type_at >= 0)
+        return used[np.argsort(self.openedAt[used], kind='stable')]
+
+    # cities served by a location and their roles, in the order they were assigned
+    def getServedCities(self, l_id):
+        primaries = np.flatnonzero(self.primary == l_id)
+        secondaries = np.flatnonzero(self.secondary == l_id)
+        cities = np.concatenate([primaries, secondaries])
+        roles = np.concatenate([np.full(len(primaries), PRIMARY, dtype=int),
+                                np.full(len(secondaries), SECONDARY, dtype=int)])
+        order = np.argsort(self.roleStamp[cities, roles], kind='stable')
+        return cities[order], roles[order]
+
+    def getCenter(self, c_id, role):
+        return self.primary[c_id] if role == PRIMARY else self.secondary[c_id]
+
+    def getType(self, l_id):
+        t_id = self.type_at[l_id]
+        return self.types[t_id] if t_id >= 0 else None
+
+    # population a city adds to a center serving it in the given role, in tenths of inhabitants
+    def getDemand(self, c_id, role):
+        return self.kernel.demand[c_id, role]
+
+    # lowest rank a type at location l_id must have once city c_id stops being served there in the given role
+    def getMaxNeedWithout(self, l_id, c_id, role):
+        need = self.kernel.getNeed(role, c_id, l_id)
+        if need < self.maxNeed[l_id] or self.needCount[l_id, need] > 1:
+            return self.maxNeed[l_id]
+        lower = np.flatnonzero(self.needCount[l_id, :need])
+        return lower[-1] if len(lower) > 0 else 0
+
+    # Cheapest type able to serve the cities of location l_id, optionally without the role of city c_id.
+    # Returns None if no type can serve them.
+    def getCheapestType(self, l_id, c_id=None, role=None):
+        if c_id is None:
+            need = self.maxNeed[l_id]
+            load = self.load[l_id]
+        else:
+            need = self.getMaxNeedWithout(l_id, c_id, role)
+            load = self.load[l_id] - self.getDemand(c_id, role) if self.served[l_id] > 1 else 0.0
+        t_id = self.kernel.cheapestType(need, load)
+        return self.types[t_id] if t_id >= 0 else None
+
+    # Lower bound of the cost of any solution obtained by adding assignments to this one: every location used
+    # so far will need at least the cheapest type able to serve its current need and load.
+    def getCompletionLowerBound(self):
+        bound = 0.0
+        for l_id in np.flatnonzero(self.type_at >= 0).tolist():
+            t_id = self.kernel.cheapestType(self.maxNeed[l_id], self.load[l_id])
+            if t_id < 0: return float('infinity')
+            bound += self.types[t_id].get_cost()
+        return bound
+
+    def _addNeed(self, l_id, need):
+        self._set(self.needCount, (l_id, need), self.needCount[l_id, need] + 1)
+        if need > self.maxNeed[l_id]:
+            self._set(self.maxNeed, l_id, need)
+
+    def _removeNeed(self, l_id, need):
+        self._set(self.needCount, (l_id, need), self.needCount[l_id, need] - 1)
+        if need == self.maxNeed[l_id] and self.needCount[l_id, need] == 0:
+            lower = np.flatnonzero(self.needCount[l_id, :need])
+            self._set(self.maxNeed, l_id, lower[-1] if len(lower) > 0 else 0)
+
+    # Update the blocked counters when the center at l_id is opened (+1) or closed (-1)
+    def _block(self, l_id, delta):
+        conflicts = self.kernel.conflicts[l_id]
+        self._set(self.blocked, conflicts, self.blocked[conflicts] + delta)
+
+    def isFeasibleToAssign(self, c_id, l_id, t_id, role):
+        return self.rejectionReason(c_id, l_id, t_id, role) is None
+
+    # First check that rejects assigning location l_id with type t_id to city c_id in the given role,
+    # None if the assignment is feasible
+    def rejectionReason(self, c_id, l_id, t_id, role):
+        # Check if this city has already been a assigned a primary/secondary center or if the
+        # other center of the city is at the same location
+        if role == PRIMARY:
+            if self.primary[c_id] >= 0 or self.secondary[c_id] == l_id:
+                return 'assigned'
+        elif self.secondary[c_id] >= 0 or self.primary[c_id] == l_id:
+            return 'assigned'
+
+        # Check if we want to make this location-type primary/secondary but distance constraint is not fulfilled
+        t = self.types[t_id]
+        if self.kernel.getNeed(role, c_id, l_id) > self.kernel.typeRank[t_id]:
+            return 'distance'
 
         # Check if location is compatible with locations already used
-        if len(self.locations_used.keys()) > 0:
-            flag = True
-            for k in self.locations_used.keys():
-                if location.getId() not in self.compatible_locations[k]:
-                    flag = False
-            if location.getId() in self.locations_used.keys():
-                flag = True
-            if not flag:
-                return False
+        old_t_id = self.type_at[l_id]
+        if old_t_id < 0 and self.blocked[l_id] > 0:
+            return 'compatibility'
 
         # Check if population fits in center type
-        if self.usedPopulationPerCenter.get(location.getId()) is not None:
-            if pc_or_sc == 'primary' and type.get_capacity() - self.usedPopulationPerCenter[
-                location.getId()] < city.getPopulation():
-                return False
-            elif pc_or_sc == 'secondary' and type.get_capacity() - self.usedPopulationPerCenter[
-                location.getId()] < 0.1 * city.getPopulation():
-                return False
-        else:
-            if pc_or_sc == 'primary' and type.get_capacity() < city.getPopulation():
-                return False
-            elif pc_or_sc == 'secondary' and type.get_capacity() < 0.1 * city.getPopulation():
-                return False
+        if self.kernel.cap[t_id] - self.load[l_id] < self.getDemand(c_id, role):
+            return 'capacity'
 
         # If we change center type, we have to respect the distances of the cities that it serves as primary/secondary
         # and its capacity
-        if self.locations_used.get(location.getId()) is not None:
-            old_type = self.locations_used[location.getId()]
-            if old_type.get_id() != type.get_id():
-                for value in self.cities_served_per_each_location[location.getId()]:
-                    if value[1] == 'primary' and self.cl_distances[value[0].getId()][
-                        location.getId()] > type.get_d_city():
-                        return False
-                    elif value[1] == 'secondary' and self.cl_distances[value[0].getId()][
-                        location.getId()] > 3 * type.get_d_city():
-                        return False
+        if old_t_id >= 0 and old_t_id != t_id and self.kernel.typeRank[t_id] < self.maxNeed[l_id]:
+            return 'type change'
 
-        return True
+        return None
 
-    def isFeasibleToUnassignCenterFromCity(self, city, location, type, pc_or_sc):
+    def isFeasibleToAssignCenterToCity(self, city, location, type, pc_or_sc):
+        return self.isFeasibleToAssign(city.getId(), location.getId(), type.get_id(), ROLES[pc_or_sc])
+
+    def isFeasibleToUnassign(self, c_id, l_id, t_id, role):
         # Check if feasible to unassing center from city
-        if self.locations_used.get(location.getId()) is None:
+        if self.type_at[l_id] < 0:
             return False
-        if self.locations_used[location.getId()].get_id() != type.get_id():
+        if self.type_at[l_id] != t_id:
             return False
-        if self.cities_centers[city.getId()][pc_or_sc] != location.getId():
+        if self.getCenter(c_id, role) != l_id:
             return False
         return True
 
-    # assign one center to a city
-    def assign(self, city, location, type, pc_or_sc, check_completeness=False):
-        if not self.isFeasibleToAssignCenterToCity(city, location, type, pc_or_sc): return False
-
-        assignment_cost = 0
-        if self.locations_used.get(location.getId()) is None:
-            assignment_cost = type.get_cost()
-        elif self.locations_used[location.getId()].get_id() != type.get_id():
-            assignment_cost = type.get_cost() - self.locations_used[location.getId()].get_cost()
-            if not check_completeness:
-                self.aux_locations_used[location.getId()] = self.locations_used[location.getId()]
-
-        self.locations_used[location.getId()] = type
-        if self.cities_served_per_each_location.get(location.getId()) is None:
-            self.cities_served_per_each_location[location.getId()] = []
-        self.cities_served_per_each_location[location.getId()].append((city, pc_or_sc))
-
-        if self.cities_centers.get(city.getId()) is not None:
-            self.cities_centers[city.getId()][pc_or_sc] = location.getId()
-        else:
-            self.cities_centers[city.getId()] = {}
-            self.cities_centers[city.getId()][pc_or_sc] = location.getId()
-
-        population = city.getPopulation() if pc_or_sc == 'primary' else 0.1 * city.getPopulation()
-        if self.usedPopulationPerCenter.get(location.getId()) is None:
-            self.usedPopulationPerCenter[location.getId()] = population
-        else:
-            self.usedPopulationPerCenter[location.getId()] += population
-
-        self.cost += assignment_cost
+    def isFeasibleToUnassignCenterFromCity(self, city, location, type, pc_or_sc):
+        return self.isFeasibleToUnassign(city.getId(), location.getId(), type.get_id(), ROLES[pc_or_sc])
+
+    # cost increment of placing a center of the given type at location
+    def getAssignmentCost(self, location, type):
+        old_type = self.getType(location.getId())
+        if old_type is None:
+            return type.get_cost()
+        elif old_type.get_id() != type.get_id():
+            return type.get_cost() - old_type.get_cost()
+        return 0
+
+    # current state of the solution in the array form used by the assignment kernel
+    def getAssignmentState(self):
+        return AssignmentState(self.type_at, self.load, self.maxNeed, self.blocked, self.primary, self.secondary)
+
+    # assign location l_id with type t_id as primary/secondary center of city c_id
+    def assignCenter(self, c_id, l_id, t_id, role, check_completeness=False):
+        if not self.isFeasibleToAssign(c_id, l_id, t_id, role): return False
+
+        location = self.locations[l_id]
+        opened = self.type_at[l_id] < 0
+        assignment_cost = self.getAssignmentCost(location, self.types[t_id])
+        if opened:
+            self._set(self.openedAt, l_id, self.stamp)
+            self._block(l_id, 1)
+        elif self.type_at[l_id] != t_id and not check_completeness:
+            self._set(self.previous_type, l_id, self.type_at[l_id])
+
+        self._set(self.type_at, l_id, t_id)
+        self._set(self.served, l_id, self.served[l_id] + 1)
+        self._set(self.load, l_id, self.load[l_id] + self.getDemand(c_id, role))
+        self._addNeed(l_id, self.kernel.getNeed(role, c_id, l_id))
+        self._set(self.primary if role == PRIMARY else self.secondary, c_id, l_id)
+        self._set(self.roleStamp, (c_id, role), self.stamp)
+        self._setAttr('stamp', self.stamp + 1)
+
+        self._setAttr('cost', self.cost + assignment_cost)
 
         if check_completeness:
             self.is_complete()
-            if self.cities_centers[city.getId()].get('primary') is not None and self.cities_centers[city.getId()].get(
-                    'secondary') is not None:
-                del self.cities_not_assigned[city.getId()]
+            if self.candidateList is not None:
+                if self.complete:
+                    self.candidateList = None
+                else:
+                    self.candidateList.update(c_id, l_id, role, opened)
+        else:
+            self.candidateList = None
         return True
 
-    # unassign one center to a city
-    def unassign(self, city, location, type, pc_or_sc):
-        if not self.isFeasibleToUnassignCenterFromCity(city, location, type, pc_or_sc): return False
-
-        assignment_cost = 0
-        if self.aux_locations_used.get(location.getId()) is not None:
-            assignment_cost = self.locations_used[location.getId()].get_cost() - self.aux_locations_used[
-                location.getId()].get_cost()
-            self.locations_used[location.getId()] = copy.deepcopy(self.aux_locations_used[location.getId()])
-            del self.aux_locations_used[location.getId()]
-        elif len(self.cities_served_per_each_location[location.getId()]) == 1:
-            assignment_cost = self.locations_used[location.getId()].get_cost()
-            del self.locations_used[location.getId()]
-
-        if len(self.cities_served_per_each_location[location.getId()]) > 1:
-            try:
-                self.cities_served_per_each_location[location.getId()].remove((city, pc_or_sc))
-            except ValueError:
-                index_to_delete = None
-                for i, v in enumerate(self.cities_served_per_each_location[location.getId()]):
-                    if v[0].getId() == city.getId():
-                        index_to_delete = i
-                        break
-                if index_to_delete is not None:
-                    del self.cities_served_per_each_location[location.getId()][index_to_delete]
-        else:
-            del self.cities_served_per_each_location[location.getId()]
+    # assign one center to a city
+    def assign(self, city, location, type, pc_or_sc, check_completeness=False):
+        return self.assignCenter(city.getId(), location.getId(), type.get_id(), ROLES[pc_or_sc], check_completeness)
 
-        self.cities_centers[city.getId()][pc_or_sc] = None
+    # remove location l_id as primary/secondary center of city c_id
+    def unassignCenter(self, c_id, l_id, t_id, role):
+        if not self.isFeasibleToUnassign(c_id, l_id, t_id, role): return False
+        self.candidateList = None
 
-        population = city.getPopulation() if pc_or_sc == 'primary' else 0.1 * city.getPopulation()
-        if self.usedPopulationPerCenter.get(location.getId()) == population:
-            del self.usedPopulationPerCenter[location.getId()]
+        assignment_cost = 0
+        if self.previous_type.get(l_id) is not None:
+            old_t_id = self.previous_type[l_id]
+            self._set(self.previous_type, l_id, None)
+            assignment_cost = self.types[t_id].get_cost() - self.types[old_t_id].get_cost()
+            self._set(self.type_at, l_id, old_t_id)
+        elif self.served[l_id] == 1:
+            assignment_cost = self.types[t_id].get_cost()
+            self._set(self.type_at, l_id, -1)
+            self._set(self.openedAt, l_id, -1)
+            self._block(l_id, -1)
+
+        self._set(self.served, l_id, self.served[l_id] - 1)
+        if self.served[l_id] == 0:
+            self._set(self.load, l_id, 0.0)
         else:
-            self.usedPopulationPerCenter[location.getId()] -= population
+            self._set(self.load, l_id, self.load[l_id] - self.getDemand(c_id, role))
+        self._removeNeed(l_id, self.kernel.getNeed(role, c_id, l_id))
+        self._set(self.primary if role == PRIMARY else self.secondary, c_id, -1)
+        self._set(self.roleStamp, (c_id, role), -1)
 
-        self.cost -= assignment_cost
+        self._setAttr('cost', self.cost - assignment_cost)
         return True
 
+    # unassign one center to a city
+    def unassign(self, city, location, type, pc_or_sc):
+        return self.unassignCenter(city.getId(), location.getId(), type.get_id(), ROLES[pc_or_sc])
+
     # change center type of a location
     def change_location_type(self, location, t):
-        population = self.usedPopulationPerCenter[location.getId()]
-        infeasible = False
-        for value in self.cities_served_per_each_location[location.getId()]:
-            # Check if new type would respect distance constraints of other cities
-            if value[1] == 'primary' and self.cl_distances[value[0].getId()][location.getId()] > t.get_d_city():
-                infeasible = True
-                break
-            elif value[1] == 'secondary' and self.cl_distances[value[0].getId()][location.getId()] > 3 * t.get_d_city():
-                infeasible = True
-                break
+        l_id = location.getId()
+        # Check if new type would respect distance constraints of other cities
+        if self.kernel.typeRank[t.get_id()] < self.maxNeed[l_id]:
+            return False
 
         # Check if new type would have capacity for other served cities
-        if t.get_capacity() < population:
-            infeasible = True
-
-        if infeasible:
+        if self.kernel.cap[t.get_id()] < self.load[l_id]:
             return False
+        self.candidateList = None
 
         assignment_cost = 0
-        if self.locations_used[location.getId()].get_id() != t.get_id():
-            assignment_cost = t.get_cost() - self.locations_used[location.getId()].get_cost()
-            self.locations_used[location.getId()] = t
-        self.cost += assignment_cost
+        if self.type_at[l_id] != t.get_id():
+            assignment_cost = t.get_cost() - self.types[self.type_at[l_id]].get_cost()
+            self._set(self.type_at, l_id, t.get_id())
+        self._setAttr('cost', self.cost + assignment_cost)
 
         return True
 
+    # Candidate list of the feasible assignments of the solution.
+    # The candidates are kept between calls and only the ones affected by the last committed
+    # assignment (assign with check_completeness=True) are re-evaluated.
+    def getCandidateList(self):
+        if self.candidateList is None:
+            self.candidateList = CandidateList(self)
+        return self.candidateList
+
     # find all feasible assigment and return a list
     def findFeasibleAssignments(self):
-        feasibleAssignments = []
-        for c in self.cities_not_assigned.values():
-            for l in self.locations:
-                for t in self.types:
-                    for pc_or_sc in ['primary', 'secondary']:
-                        feasible = self.assign(c, l, t, pc_or_sc)
-                        if not feasible: continue
-                        is_primary = True if pc_or_sc == 'primary' else False
-                        assignment = Assignment(l, t, c, is_primary)
-                        assignment.cost = self.cost
-                        feasibleAssignments.append(assignment)
-
-                        self.unassign(c, l, t, pc_or_sc)
-
-        return feasibleAssignments
+        return self.getCandidateList().getAssignments()
 
     def __str__(self):
         result_str = f'Solution found with cost {self.cost}\n'
-        for k in self.locations_used.keys():
-            result_str += f'Location {k} has a center of type {self.locations_used[k].get_id()}.'
-            result_str += f' It serves {round(self.usedPopulationPerCenter[k], 2)} inhabitants,'
-            result_str += f' max is {self.locations_used[k].get_capacity()}.\n'
-        for i in self.cities_centers.keys():
-            result_str += f'City {i} primary center is at location {self.cities_centers[i]["primary"]}'
-            result_str += f' (distance {self.cl_distances[i][self.cities_centers[i]["primary"]]},'
-            result_str += f' max is {self.locations_used[self.cities_centers[i]["primary"]].get_d_city()}).\n'
-
-            result_str += f'City {i} secondary center is at location {self.cities_centers[i]["secondary"]}'
-            result_str += f' (distance {self.cl_distances[i][self.cities_centers[i]["secondary"]]},'
-            result_str += f' max is {3 * self.locations_used[self.cities_centers[i]["secondary"]].get_d_city()}).\n'
+        for k in self.getUsedLocations().tolist():
+            t = self.getType(k)
+            result_str += f'Location {k} has a center of type {t.get_id()}.'
+            result_str += f' It serves {round(float(self.load[k]) / 10, 2)} inhabitants,'
+            result_str += f' max is {t.get_capacity()}.\n'
+        # cities by id: the first search of feasible assignments tries every city in id order, which is the order
+        # in which the dict-based solution listed them
+        for i in np.flatnonzero((self.primary >= 0) | (self.secondary >= 0)).tolist():
+            for role in [PRIMARY, SECONDARY]:
+                l_id = int(self.getCenter(i, role))
+                if l_id < 0: continue
+                d_city = self.getType(l_id).get_d_city()
+                result_str += f'City {i} {ROLE_NAMES[role]} center is at location {l_id}'
+                result_str += f' (distance {self.kernel.distance(i, l_id)},'
+                result_str += f' max is {d_city if role == PRIMARY else 3 * d_city}).\n'
 
         return result_str
 
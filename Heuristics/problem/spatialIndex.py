@@ -0,0 +1,63 @@
+"""
+AMMM Project
+Spatial grid index used to find the city-location pairs within a radius
+Eloy Marín, Pablo Pazos
+"""
+
+import math
+
+import numpy as np
+
+
+# Uniform grid over a set of points. Each point is stored in the square cell of size cellSize that contains it,
+# so the points within a radius of a query are found looking only at the cells that radius overlaps.
+class SpatialGrid(object):
+    def __init__(self, points, cellSize):
+        self.points = np.asarray(points, dtype=float).reshape(-1, 2)
+        self.cellSize = float(cellSize) if cellSize > 0 else 1.0
+        cells = np.floor(self.points / self.cellSize).astype(int)
+        self.cells = {}
+        for i, cell in enumerate(map(tuple, cells.tolist())):
+            self.cells.setdefault(cell, []).append(i)
+        for cell, ids in self.cells.items():
+            self.cells[cell] = np.asarray(ids, dtype=int)
+
+    # Points of the cells overlapping the square of the given radius around cell
+    def _neighborhood(self, cell, reach):
+        ids = []
+        for dx in range(-reach, reach + 1):
+            for dy in range(-reach, reach + 1):
+                found = self.cells.get((cell[0] + dx, cell[1] + dy))
+                if found is not None:
+                    ids.append(found)
+        return np.concatenate(ids) if ids else np.empty(0, dtype=int)
+
+    # Pairs <query, point> at distance <= radius in CSR form: the points of query q are
+    # indices[indptr[q]:indptr[q + 1]] at distances[indptr[q]:indptr[q + 1]], sorted by distance (then point id).
+    # Queries in the same cell are evaluated together against the points of the neighboring cells.
+    def pairsWithin(self, queries, radius):
+        queries = np.asarray(queries, dtype=float).reshape(-1, 2)
+        reach = int(math.ceil(radius / self.cellSize))
+        rowIndices = [None] * len(queries)
+        rowDistances = [None] * len(queries)
+
+        queryCells = np.floor(queries / self.cellSize).astype(int)
+        groups = {}
+        for q, cell in enumerate(map(tuple, queryCells.tolist())):
+            groups.setdefault(cell, []).append(q)
+
+        for cell, group in groups.items():
+            candidates = np.sort(self._neighborhood(cell, reach))
+            delta = queries[group][:, np.newaxis, :] - self.points[candidates][np.newaxis, :, :]
+            distances = np.sqrt(delta[:, :, 0] * delta[:, :, 0] + delta[:, :, 1] * delta[:, :, 1])
+            for row, q in enumerate(group):
+                within = np.flatnonzero(distances[row] <= radius)
+                order = within[np.argsort(distances[row, within], kind='stable')]
+                rowIndices[q] = candidates[order]
+                rowDistances[q] = distances[row, order]
+
+        indptr = np.zeros(len(queries) + 1, dtype=int)
+        indptr[1:] = np.cumsum([len(row) for row in rowIndices])
+        if len(queries) == 0:
+            return indptr, np.empty(0, dtype=int), np.empty(0)
+        return indptr, np.concatenate(rowIndices).astype(int), np.concatenate(rowDistances)
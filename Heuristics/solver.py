@@ -19,6 +19,8 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import time
 from Heuristics.logger import Logger
+from Heuristics.problem.lowerBound import optimalityGap
+from Heuristics.trace import CONSTRUCTION, ConvergenceTrace
 
 
 class _Solver(object):
@@ -30,19 +32,36 @@ class _Solver(object):
             {'id': 'objValue', 'name': 'Obj. Value', 'headerformat': '{:>10s}', 'valueformat': '{:>10.8f}'},
             {'id': 'iterations', 'name': 'Iterations', 'headerformat': '{:>12s}', 'valueformat': '{:>12d}'}
         ]
+        # lower bound of the optimal cost, the log and the trace then report the optimality gap of the incumbents
+        self.lowerBound = None
+        if instance is not None and self.config.lowerBound:
+            startTime = time.time()
+            self.lowerBound = instance.getLowerBound(self.config.lowerBoundTime)
+            if self.config.verbose:
+                print('Lower bound %s (%.2f s)' % (self.lowerBound, time.time() - startTime))
+            logFields.append({'id': 'gap', 'name': 'Gap (%)', 'headerformat': '{:>10s}', 'valueformat': '{:>10.2f}'})
         self.logger = Logger(fields=logFields)
         if instance is not None and self.config.verbose:
             self.logger.printHeaders()
         self.startTime = 0
         self.elapsedEvalTime = 0
         self.numSolutionsConstructed = 0
+        # improvements of the incumbent reported through writeLogLine
+        self.trace = ConvergenceTrace()
     
     def startTimeMeasure(self):
         self.startTime = time.time()
     
-    def writeLogLine(self, objValue, iterations):
+    # Report the incumbent: if it improves the trace it is recorded and, in verbose mode, printed.
+    # phase is the phase of the algorithm that found the incumbent (see Heuristics/trace.py) and timestamp the
+    # time it was found, now if not given.
+    def writeLogLine(self, objValue, iterations, phase=CONSTRUCTION, timestamp=None):
+        now = time.time() if timestamp is None else timestamp
+        gap = optimalityGap(objValue, self.lowerBound)
+        if not self.trace.record(now, now - self.startTime, objValue, iterations, phase, gap): return
         if not self.config.verbose: return
-        logValues = {'elapTime': time.time() - self.startTime, 'objValue': objValue, 'iterations': iterations}
+        logValues = {'elapTime': now - self.startTime, 'objValue': objValue, 'iterations': iterations,
+                     'gap': gap if gap is not None else float('infinity')}
         self.logger.printValues(logValues)
 
     def solve(self, **kwargs):
@@ -58,3 +77,7 @@ class _Solver(object):
         print('  Num. solutions constructed', self.numSolutionsConstructed)
         print('  Total Eval. Time     ', self.elapsedEvalTime, 's')
         print('  Avg. Time / solution', avg_evalTimePerCandidate, 'ms')
+        if self.lowerBound is not None:
+            gap = optimalityGap(self.trace.bestObjective, self.lowerBound)
+            print('  Lower bound          ', self.lowerBound)
+            print('  Optimality gap       ', '%.2f %%' % gap if gap is not None else '-')
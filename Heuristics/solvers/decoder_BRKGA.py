@@ -0,0 +1,67 @@
+"""
+AMMM Project
+Decoder of the BRKGA solver
+Eloy Marín, Pablo Pazos
+"""
+
+import numpy as np
+
+from Heuristics.problem.assignmentKernel import PRIMARY, SECONDARY
+
+
+# Turns random-key chromosomes into solutions.
+# A chromosome has one key per city followed by one key per location:
+#  - cities are assigned in increasing order of their keys, the primary center first,
+#  - each role takes the feasible <location, type> with the lowest cost increment plus a location bias
+#    proportional to the key of the location, so the keys steer which centers are opened and shared.
+# Feasibility is checked by the assignment kernel of the instance, as in the constructive algorithms.
+class Decoder_BRKGA(object):
+    def __init__(self, instance):
+        self.instance = instance
+        self.kernel = instance.kernel
+        self.nCities = instance.getNumCities()
+        self.nLocations = instance.getNumLocations()
+        self.chromosomeLength = self.nCities + self.nLocations
+        # a location key of 1 adds the cost of an average type to the cost increment
+        self.keyWeight = float(self.kernel.cost.mean())
+        # any feasible solution, at most the most expensive type at every location, costs less than a single role
+        # left unassigned
+        self.infeasibilityPenalty = float(self.kernel.cost.max()) * (self.nLocations + 1)
+
+    # Decode a chromosome. Returns the solution and its fitness: the cost of the solution plus a penalty for
+    # each city role that could not be assigned.
+    def decode(self, chromosome):
+        solution = self.instance.createSolution()
+        state = solution.getAssignmentState()
+        bias = self.keyWeight * chromosome[self.nCities:]
+
+        unassigned = 0
+        for c_id in np.argsort(chromosome[:self.nCities], kind='stable').tolist():
+            # only the admissible locations of the city, closest first
+            pairs = self.kernel.cityPairs(c_id)
+            locations = self.kernel.pairLocation[pairs]
+            for role in (PRIMARY, SECONDARY):
+                feasible = self.kernel.evaluatePairs(state, pairs)[:, :, role]
+                if not feasible.any():
+                    unassigned += 1
+                    continue
+                increment = self.kernel.assignmentCost(state, locations)
+                score = np.where(feasible, increment + bias[locations][:, np.newaxis], np.inf)
+                k, t_id = np.unravel_index(np.argmin(score), score.shape)
+                solution.assignCenter(c_id, int(locations[k]), int(t_id), role, check_completeness=True)
+
+        if unassigned > 0:
+            solution.makeInfeasible()
+            return solution, solution.cost + self.infeasibilityPenalty * unassigned
+        return solution, solution.cost
+
+    # Whether a fitness is the cost of a feasible solution, i.e. it has no penalty
+    def isFeasibleFitness(self, fitness):
+        return fitness < self.infeasibilityPenalty
+
+    # Fitness of each row of a population matrix
+    def decodeFitness(self, population):
+        fitness = np.empty(len(population))
+        for i, chromosome in enumerate(population):
+            fitness[i] = self.decode(chromosome)[1]
+        return fitness
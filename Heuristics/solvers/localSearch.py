@@ -6,24 +6,29 @@ File given Luis Velasco and under its copyright policy
 Modified for project purposes
 """
 
-import copy
 import time
+
+import numpy as np
+
+from Heuristics import instrumentation
 from Heuristics.solver import _Solver
 from AMMMGlobals import AMMMException
+from Heuristics.problem.assignmentKernel import PRIMARY, SECONDARY
+from Heuristics.problem.solution import ROLE_NAMES
 
 
 # This class is used to perform sets of modifications.
-# A new solution can be created based on an existing solution and a list of
-# changes using the createNeighborSolution(solution, moves) function.
+# The moves are applied in place on a solution using the applyMoves(solution, moves) function
+# and undone through the undo trail of the solution.
 class Move(object):
-    def __init__(self, c, pc_or_sc, old_l, new_l):  # TODO: Change parameters function
+    def __init__(self, c, role, old_l, new_l):
         self.old_l = old_l
         self.c = c
         self.new_l = new_l
-        self.pc_or_sc = pc_or_sc
+        self.role = role
 
     def __str__(self):
-        return f'City {self.c.getId()} {self.pc_or_sc}: Location {self.old_l.getId()} -> Location {self.new_l.getId()}'
+        return f'City {self.c.getId()} {ROLE_NAMES[self.role]}: Location {self.old_l.getId()} -> Location {self.new_l.getId()}'
 
 
 # Implementation of a local search using two neighborhoods and oen policy.
@@ -35,87 +40,91 @@ class LocalSearch(_Solver):
         self.maxExecTime = config.maxExecTime
         super().__init__(config, instance)
 
-    def createNeighborSolution(self, solution, moves,old_l_new_t):
-        newSolution = copy.deepcopy(solution)
+    # Apply the moves in place. If they are not feasible the solution is rolled back and False is returned.
+    # The solution must have an active undo trail.
+    def applyMoves(self, solution, moves, old_l_new_t):
+        mark = solution.getTrailMark()
+        types = [solution.type_at[move.new_l.getId()] for move in moves]
 
         for move in moves:
-            newSolution.unassign(move.c, move.old_l, solution.locations_used[move.old_l.getId()], move.pc_or_sc)
+            solution.unassignCenter(move.c.getId(), move.old_l.getId(), solution.type_at[move.old_l.getId()],
+                                    move.role)
 
-        for move in moves:
-            feasible = newSolution.assign(move.c, move.new_l, solution.locations_used[move.new_l.getId()],
-                                          move.pc_or_sc)
+        for move, t_id in zip(moves, types):
+            feasible = solution.assignCenter(move.c.getId(), move.new_l.getId(), t_id, move.role)
             if old_l_new_t is not None:
-                feasible = newSolution.change_location_type(move.old_l, old_l_new_t)
-            if not feasible: return None
-
-        return newSolution
-
-    def get_best_feasible_type(self, solution, city, old_location):
-        feasible_types = []
-        for t in solution.types:
-            population = 0
-            infeasible = False
-            for value in solution.cities_served_per_each_location[old_location.getId()]:
-                if value[0].getId() == city.getId(): continue
-
-                # Check if new type would respect distance constraints of other cities
-                if value[1] == 'primary' and solution.cl_distances[value[0].getId()][
-                    old_location.getId()] > t.get_d_city():
-                    infeasible = True
-                    break
-                elif value[1] == 'secondary' and solution.cl_distances[value[0].getId()][
-                    old_location.getId()] > 3 * t.get_d_city():
-                    infeasible = True
-                    break
+                feasible = solution.change_location_type(move.old_l, old_l_new_t)
+            if not feasible:
+                solution.rollback(mark)
+                return False
 
-                if value[1] == 'primary':
-                    population += value[0].getPopulation()
-                elif value[1] == 'secondary':
-                    population += 0.1 * value[0].getPopulation()
+        return True
 
-            # Check if new type would have capacity for other served cities
-            if t.get_capacity() < population:
-                infeasible = True
+    # Apply moves that relocate several city roles at once, setting the type of each location in newTypes
+    # (location id -> type id). If they are not feasible the solution is rolled back and False is returned.
+    def applyExchange(self, solution, moves, newTypes):
+        mark = solution.getTrailMark()
+        for move in moves:
+            solution.unassignCenter(move.c.getId(), move.old_l.getId(), solution.type_at[move.old_l.getId()],
+                                    move.role)
+
+        # locations that still serve other cities change their type before receiving the new ones,
+        # locations that were left empty are opened again with the new type
+        feasible = True
+        for l_id, t_id in newTypes.items():
+            if feasible and solution.type_at[l_id] >= 0 and solution.type_at[l_id] != t_id:
+                feasible = solution.change_location_type(solution.locations[l_id], solution.types[t_id])
+        for move in moves:
+            if not feasible: break
+            feasible = solution.assignCenter(move.c.getId(), move.new_l.getId(), newTypes[move.new_l.getId()],
+                                             move.role)
 
-            if not infeasible:
-                feasible_types.append(t)
+        if not feasible:
+            solution.rollback(mark)
+        return feasible
 
-        sorted_feasible_types = sorted(feasible_types, key=lambda x: x.get_cost())
+    # A neighbor built by the exploration, counted by the instrumentation. Returns whether it was feasible.
+    @staticmethod
+    def _created(feasible):
+        if instrumentation.ENABLED:
+            instrumentation.countAttempt('ls neighbors created', 'ls neighbors infeasible', feasible)
+        return feasible
 
-        return sorted_feasible_types[0]
+    def get_best_feasible_type(self, solution, city, old_location):
+        # cheapest type for the old location once the city leaves it, from the aggregates kept by the solution
+        role = PRIMARY if solution.primary[city.getId()] == old_location.getId() else SECONDARY
+        return solution.getCheapestType(old_location.getId(), city.getId(), role)
 
     def evaluateNeighbor(self, solution, moves):
-        assignment_cost = copy.deepcopy(solution.cost)
+        assignment_cost = solution.cost
 
         for move in moves:
             city = move.c
-            pc_or_sc = move.pc_or_sc
             old_location = move.old_l
-            new_location = move.new_l
+            old_type = solution.getType(old_location.getId())
 
-            if len(solution.cities_served_per_each_location[old_location.getId()]) == 1:
+            if solution.served[old_location.getId()] == 1:
                 # If old location only served this city, we can delete it
-                assignment_cost -= solution.locations_used[old_location.getId()].get_cost()
+                assignment_cost -= old_type.get_cost()
             else:
                 # If old location type can be changed for another one with lower cost, compute
                 # new cost
                 new_type = self.get_best_feasible_type(solution, city, old_location)
-                assignment_cost += new_type.get_cost() - solution.locations_used[old_location.getId()].get_cost()
-                if new_type.get_cost() - solution.locations_used[old_location.getId()].get_cost() != 0:
+                assignment_cost += new_type.get_cost() - old_type.get_cost()
+                if new_type.get_cost() - old_type.get_cost() != 0:
                     return assignment_cost, new_type
 
         return assignment_cost, None
 
     def getLocationAssignmentsSortedByCost(self, solution):
-        locations_used = solution.locations_used
         locations = solution.locations
 
         # create vector of assignments <location, type>
         assignments = []
-        for l_id in locations_used.keys():
-            t = locations_used[l_id]
+        for l_id in solution.getUsedLocations().tolist():
+            t = solution.getType(l_id)
             l = locations[l_id]
-            load = float(solution.usedPopulationPerCenter[l_id] / t.get_capacity())
+            load = float(solution.load[l_id] / solution.kernel.cap[t.get_id()])
             assignment = (l, t, t.get_cost(), load)
             assignments.append(assignment)
 
@@ -128,68 +137,253 @@ class LocalSearch(_Solver):
         sorted_assignments = sorted(assignments, key=lambda x: x[2], reverse=True)
         return sorted_assignments
 
-    def reassignment_is_feasible(self, solution, city, pc_or_sc, new_location):
-        # If new location already serves the city, is not feasible
-        if pc_or_sc == 'primary' and solution.cities_centers[city.getId()]['secondary'] == new_location.getId():
-            return False
-        elif pc_or_sc == 'secondary' and solution.cities_centers[city.getId()]['primary'] == new_location.getId():
-            return False
-
-        type = solution.locations_used[new_location.getId()]
-        if pc_or_sc == 'primary' and solution.cl_distances[city.getId()][new_location.getId()] > type.get_d_city():
-            # Check if we want to make this location-type primary but distance constraint is not fulfilled
-            return False
-        elif pc_or_sc == 'secondary' and solution.cl_distances[city.getId()][
-            new_location.getId()] > 3 * type.get_d_city():
-            # Check if we want to make this location-type secondary but distance constraint is not fulfilled
-            return False
-
-        # Check if population can fit in new location
-        if pc_or_sc == 'primary' and type.get_capacity() - solution.usedPopulationPerCenter[
-            new_location.getId()] < city.getPopulation():
-            return False
-        elif pc_or_sc == 'secondary' and type.get_capacity() - solution.usedPopulationPerCenter[
-            new_location.getId()] < 0.1 * city.getPopulation():
-            return False
-
-        return True
-
     def exploreReassignment(self, solution):
-        cities_served_per_each_location = solution.cities_served_per_each_location
-
+        cities = solution.cities
         current_cost = solution.get_cost()
-        bestNeighbor = solution
+        bestMoves = None
 
         sortedAssignments = self.getLocationAssignmentsSortedByCost(solution)
 
         nLocationsUsed = len(sortedAssignments)
+        locationIds = [assignment[0].getId() for assignment in sortedAssignments]
+        state = solution.getAssignmentState()
 
         for i in range(0, nLocationsUsed - 1):
             location = sortedAssignments[i][0]
-            for v in cities_served_per_each_location[location.getId()]:
+            served_cities, served_roles = solution.getServedCities(location.getId())
+            # feasibility of moving each served city role to each used location keeping its type
+            feasible = solution.kernel.reassignmentMask(state, served_cities, served_roles, locationIds)
+            for k, (c_id, role) in enumerate(zip(served_cities.tolist(), served_roles.tolist())):
                 for j in range(1, nLocationsUsed):
                     if i == j: continue
                     new_location = sortedAssignments[j][0]
-                    if self.reassignment_is_feasible(solution, v[0], v[1], new_location):
-                        moves = [Move(v[0], v[1], location, new_location)]
+                    if feasible[k, j]:
+                        moves = [Move(cities[c_id], role, location, new_location)]
                         neighbor_cost, old_l_new_t = self.evaluateNeighbor(solution, moves)
                         if neighbor_cost < current_cost:
-                            neighbor = self.createNeighborSolution(solution, moves,old_l_new_t)
-                            if neighbor is None: continue
+                            mark = solution.getTrailMark()
+                            if not self._created(self.applyMoves(solution, moves, old_l_new_t)): continue
                             if self.policy == 'FirstImprovement':
-                                return neighbor
+                                return solution
                             else:
-                                bestNeighbor = neighbor
+                                # keep the moves and undo them, the solution is explored unmodified
+                                solution.rollback(mark)
+                                bestMoves = (moves, old_l_new_t)
                                 current_cost = neighbor_cost
 
-        return bestNeighbor
+        if bestMoves is not None:
+            self.applyMoves(solution, bestMoves[0], bestMoves[1])
+            if instrumentation.ENABLED: instrumentation.count('ls moves re-applied')
+        return solution
+
+    # Swap the locations serving two cities in the same role.
+    # The cost of a swap only depends on the two locations involved: each one loses the demand and the distance
+    # need of a city, gains the ones of the other city and takes the cheapest type able to serve the result,
+    # which may be cheaper than its current type. The deltas of a city with all its partners are computed at
+    # once from the per-location aggregates of the solution, without building any neighbor.
+    def exploreTaskExchange(self, solution):
+        kernel = solution.kernel
+        cities = solution.cities
+        locations = solution.locations
+        nCities = len(cities)
+        exchanges = []
+        # needs of city a at the locations, filled from its admissible pairs while its partners are evaluated
+        needAt = np.full(kernel.nLocations, kernel.nRanks)
+
+        for role in (PRIMARY, SECONDARY):
+            center = solution.primary if role == PRIMARY else solution.secondary
+            other = solution.secondary if role == PRIMARY else solution.primary
+            demand = kernel.demand[:, role]
+            # need and load of the center of each city once the city leaves it
+            needWithout = np.array([solution.getMaxNeedWithout(l_id, c_id, role)
+                                    for c_id, l_id in enumerate(center.tolist())], dtype=int)
+            loadWithout = np.where(solution.served[center] > 1, solution.load[center] - demand, 0.0)
+            oldCost = kernel.cost[solution.type_at[center]]
+
+            for a in range(nCities - 1):
+                la = center[a]
+                # partners: the cities after a admissible at la (the pairs of a location are sorted by city)
+                pairs = kernel.locationPairsOf(la)
+                b = kernel.pairCity[pairs]
+                first = np.searchsorted(b, a, side='right')
+                pairs = pairs[first:]
+                b = b[first:]
+                lb = center[b]
+                needB = kernel.pairNeed[role, pairs]
+                row = slice(kernel.cityPtr[a], kernel.cityPtr[a + 1])
+                needAt[kernel.pairLocation[row]] = kernel.pairNeed[role, row]
+                needA = needAt[lb]
+                needAt[kernel.pairLocation[row]] = kernel.nRanks
+                valid = (lb != la) & (other[b] != la) & (lb != other[a]) & (needB < kernel.nRanks) & \
+                        (needA < kernel.nRanks)
+                b = b[valid]
+                if len(b) == 0: continue
+                lb = lb[valid]
+                if instrumentation.ENABLED: instrumentation.count('ls neighbors evaluated', len(b))
+
+                t_a = kernel.cheapestTypes(np.maximum(needWithout[a], needB[valid]), loadWithout[a] + demand[b])
+                t_b = kernel.cheapestTypes(np.maximum(needWithout[b], needA[valid]), loadWithout[b] + demand[a])
+                delta = kernel.cost[t_a] + kernel.cost[t_b] - oldCost[a] - oldCost[b]
+                # capacity is checked as in Solution.assignCenter, after the leaving city has been removed
+                fits = (kernel.cap[t_a] - loadWithout[a] >= demand[b]) & (kernel.cap[t_b] - loadWithout[b] >= demand[a])
+                delta[(t_a < 0) | (t_b < 0) | ~fits] = np.inf
+
+                improving = np.flatnonzero(delta < 0)
+                improving = improving[np.argsort(delta[improving], kind='stable')]
+                for k in improving.tolist():
+                    exchange = (float(delta[k]), role, a, int(b[k]), int(la), int(lb[k]), int(t_a[k]), int(t_b[k]))
+                    if self.policy == 'FirstImprovement':
+                        if self._created(self.applyExchange(solution, *self._exchangeMoves(solution, exchange))):
+                            return solution
+                    else:
+                        exchanges.append(exchange)
+
+        # best improvement: apply the best exchange that turns out to be feasible
+        for exchange in sorted(exchanges, key=lambda x: x[0]):
+            if self._created(self.applyExchange(solution, *self._exchangeMoves(solution, exchange))):
+                break
+        return solution
+
+    def _exchangeMoves(self, solution, exchange):
+        _, role, a, b, la, lb, t_a, t_b = exchange
+        cities = solution.cities
+        locations = solution.locations
+        moves = [Move(cities[a], role, locations[la], locations[lb]), Move(cities[b], role, locations[lb], locations[la])]
+        return moves, {la: t_a, lb: t_b}
+
+    # Plan the closure of location l_id: its city roles are moved, largest demand first, to the open location
+    # where they increase the cost the least, upgrading its type if needed. The needs, loads and types of all
+    # the receiving locations are tracked in arrays, so every role is placed with one vectorized evaluation.
+    # Returns the cost delta, the moves and the final types of the receiving locations (None if infeasible).
+    def _planClosure(self, solution, l_id, usedLocations):
+        kernel = solution.kernel
+        targets = usedLocations[usedLocations != l_id]
+        if len(targets) == 0: return None
+        need = solution.maxNeed[targets].copy()
+        load = solution.load[targets].copy()
+        types = solution.type_at[targets].copy()
+
+        served_cities, served_roles = solution.getServedCities(l_id)
+        demand = kernel.demand[served_cities, served_roles]
+        placed = []
+        for k in np.argsort(-demand, kind='stable').tolist():
+            c_id = int(served_cities[k])
+            role = int(served_roles[k])
+            other = solution.secondary[c_id] if role == PRIMARY else solution.primary[c_id]
+            newNeed = np.maximum(need, kernel.needs(role, c_id, targets))
+            newLoad = load + demand[k]
+            newTypes = kernel.cheapestTypes(newNeed, newLoad)
+            increment = kernel.cost[newTypes] - kernel.cost[types]
+            # capacity is checked as in Solution.assignCenter, so the plan is applied without round-off surprises
+            fits = kernel.cap[newTypes] - load >= demand[k]
+            increment[(newTypes < 0) | ~fits | (targets == other)] = np.inf
+            j = int(np.argmin(increment))
+            if increment[j] == np.inf: return None
+            need[j] = newNeed[j]
+            load[j] = newLoad[j]
+            types[j] = newTypes[j]
+            placed.append((c_id, role, j))
+
+        delta = kernel.cost[types].sum() - kernel.cost[solution.type_at[targets]].sum() \
+            - kernel.cost[solution.type_at[l_id]]
+        location = solution.locations[l_id]
+        moves = [Move(solution.cities[c_id], role, location, solution.locations[targets[j]]) for c_id, role, j in placed]
+        newTypes = {int(targets[j]): int(types[j]) for _, _, j in placed}
+        return float(delta), moves, newTypes
+
+    # Close an open location moving all its primary and secondary roles to the other open locations.
+    # Single reassignments rarely empty a location, so this reaches the savings of removing a whole center.
+    def exploreCloseCenter(self, solution):
+        usedLocations = solution.getUsedLocations()
+        # try the most expensive centers first
+        order = sorted(usedLocations.tolist(), key=lambda l_id: -solution.getType(l_id).get_cost())
+        plans = []
+        for l_id in order:
+            plan = self._planClosure(solution, l_id, usedLocations)
+            if plan is None or plan[0] >= 0: continue
+            if self.policy == 'FirstImprovement':
+                if self._created(self.applyExchange(solution, plan[1], plan[2])):
+                    return solution
+            else:
+                plans.append(plan)
+
+        for plan in sorted(plans, key=lambda x: x[0]):
+            if self._created(self.applyExchange(solution, plan[1], plan[2])):
+                break
+        return solution
+
+    # Move an open center, with all the city roles it serves, to an unused location.
+    # The target must be compatible with the other open centers and reachable from every served city: the
+    # type ladder need of the target is the largest need of the served roles at it, computed for all the
+    # locations at once from the city-location distances, which prunes the unreachable targets before any
+    # type is looked up. The target takes the cheapest type covering that need and the load of the center.
+    def exploreRelocation(self, solution):
+        kernel = solution.kernel
+        usedLocations = solution.getUsedLocations()
+        unused = solution.type_at < 0
+        bestDelta = 0.0
+        bestRelocation = None
+
+        for l_id in usedLocations.tolist():
+            served_cities, served_roles = solution.getServedCities(l_id)
+            # locations only blocked by this center become available once it leaves
+            candidates = unused & (solution.blocked - kernel.conflicts[l_id] == 0)
+            # a target has to be admissible for every served city, so the ones of the first city are enough
+            targets = np.sort(kernel.pairLocation[kernel.cityPairs(served_cities[0])])
+            targets = targets[candidates[targets]]
+            need = kernel.needs(served_roles[:, np.newaxis], served_cities[:, np.newaxis],
+                                targets[np.newaxis, :]).max(axis=0)
+            reachable = need < kernel.nRanks
+            targets = targets[reachable]
+            need = need[reachable]
+            if len(targets) == 0: continue
+            if instrumentation.ENABLED: instrumentation.count('ls neighbors evaluated', len(targets))
+
+            types = kernel.cheapestTypes(need, np.full(len(targets), solution.load[l_id]))
+            delta = np.where(types >= 0, kernel.cost[types], np.inf) - kernel.cost[solution.type_at[l_id]]
+            improving = np.flatnonzero(delta < bestDelta)
+            if len(improving) == 0: continue
+
+            # cheapest target first, ties broken by location id
+            improving = improving[np.argsort(delta[improving], kind='stable')]
+            for k in improving.tolist():
+                relocation = (float(delta[k]), l_id, int(targets[k]), int(types[k]))
+                if self.policy == 'FirstImprovement':
+                    if self._created(self.applyExchange(solution, *self._relocationMoves(solution, relocation))):
+                        return solution
+                else:
+                    bestDelta = relocation[0]
+                    bestRelocation = relocation
+                    break
+
+        if bestRelocation is not None:
+            self._created(self.applyExchange(solution, *self._relocationMoves(solution, bestRelocation)))
+        return solution
+
+    def _relocationMoves(self, solution, relocation):
+        _, l_id, m_id, t_id = relocation
+        served_cities, served_roles = solution.getServedCities(l_id)
+        location = solution.locations[l_id]
+        target = solution.locations[m_id]
+        moves = [Move(solution.cities[c_id], role, location, target)
+                 for c_id, role in zip(served_cities.tolist(), served_roles.tolist())]
+        return moves, {m_id: t_id}
 
     def exploreNeighborhood(self, solution):
         if self.nhStrategy == 'Reassignment':
             return self.exploreReassignment(solution)
+        elif self.nhStrategy == 'TaskExchange':
+            return self.exploreTaskExchange(solution)
+        elif self.nhStrategy == 'CloseCenter':
+            return self.exploreCloseCenter(solution)
+        elif self.nhStrategy == 'Relocation':
+            return self.exploreRelocation(solution)
         else:
             raise AMMMException('Unsupported NeighborhoodStrategy(%s)' % self.nhStrategy)
 
+    # Improve the given solution until no neighbor is better or endTime is reached. The solution is modified in
+    # place and returned (an infeasible one is returned untouched): callers that need to keep the solution they
+    # pass have to pass a copy.
     def solve(self, **kwargs):
         initialSolution = kwargs.get('solution', None)
         if initialSolution is None:
@@ -200,8 +394,10 @@ class LocalSearch(_Solver):
         self.startTime = kwargs.get('startTime', None)
         endTime = kwargs.get('endTime', None)
 
+        # the neighborhoods modify the incumbent in place, moves are tried and undone through its trail
         incumbent = initialSolution
         incumbentFitness = incumbent.cost
+        incumbent.startTrail()
         iterations = 0
 
         # keep iterating while improvements are found
@@ -215,5 +411,9 @@ class LocalSearch(_Solver):
                 break
             incumbent = neighbor
             incumbentFitness = neighborFitness
+            # the changes of this iteration are kept
+            incumbent.startTrail()
+
+        incumbent.stopTrail()
 
         return incumbent
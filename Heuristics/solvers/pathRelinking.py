@@ -0,0 +1,139 @@
+"""
+AMMM Project
+Elite set and path relinking for GRASP
+Eloy Marín, Pablo Pazos
+"""
+
+import random
+
+from Heuristics import instrumentation
+from Heuristics.problem.assignmentKernel import PRIMARY, SECONDARY
+from Heuristics.solvers.localSearch import LocalSearch, Move
+
+
+# Number of city roles served by a different location in the two solutions
+def distance(solution, other):
+    return int((solution.primary != other.primary).sum() + (solution.secondary != other.secondary).sum())
+
+
+# Pool of the best local optima found, kept diverse: two members never serve all the city roles from the same
+# locations and, unless it is the best solution found, a solution closer than minDistance to a member is not added.
+# When the pool is full a new solution replaces the most similar member among the ones worse than it.
+class EliteSet(object):
+    def __init__(self, maxSize, minDistance):
+        self.maxSize = maxSize
+        self.minDistance = minDistance
+        self.members = []
+
+    def __len__(self):
+        return len(self.members)
+
+    # Add a copy of the solution if it qualifies. Returns whether it was added.
+    def add(self, solution):
+        if not solution.isFeasible(): return False
+        full = len(self.members) >= self.maxSize
+        if full and solution.cost >= max(member.cost for member in self.members):
+            return False
+        distances = [distance(solution, member) for member in self.members]
+        if 0 in distances:
+            return False
+        isBest = not self.members or solution.cost < min(member.cost for member in self.members)
+        if not isBest and min(distances) < self.minDistance:
+            return False
+
+        if full:
+            worse = [i for i, member in enumerate(self.members) if member.cost > solution.cost]
+            replaced = min(worse, key=lambda i: (distances[i], -self.members[i].cost))
+            self.members[replaced] = solution.copy()
+        else:
+            self.members.append(solution.copy())
+        return True
+
+    # A random member different from the solution, None if there is none
+    def chooseGuide(self, solution):
+        candidates = [member for member in self.members if distance(solution, member) > 0]
+        return random.choice(candidates) if candidates else None
+
+
+# Path relinking between two solutions: starting from one of them, the city roles that the other one serves from
+# a different location are moved, one per step, to that location. Every step applies the move that leaves the
+# cheapest intermediate solution; moves that are not feasible yet are retried in the following steps.
+# The moves are applied with the exchange moves of the local search, which re-type the two locations involved.
+class PathRelinking(object):
+    def __init__(self, config):
+        self.localSearch = LocalSearch(config, None)
+
+    # Cost delta and new types of moving the role of city c_id from its location to l_id, None if not feasible
+    @staticmethod
+    def evaluateStep(solution, c_id, role, l_id):
+        kernel = solution.kernel
+        old_l = solution.getCenter(c_id, role)
+        other_l = solution.secondary[c_id] if role == PRIMARY else solution.primary[c_id]
+        need = kernel.getNeed(role, c_id, l_id)
+        if other_l == l_id or need >= kernel.nRanks:
+            return None
+
+        newTypes = {}
+        closes = solution.served[old_l] == 1
+        if closes:
+            delta = -kernel.cost[solution.type_at[old_l]]
+        else:
+            t = solution.getCheapestType(old_l, c_id, role)
+            delta = t.get_cost() - kernel.cost[solution.type_at[old_l]]
+            if t.get_id() != solution.type_at[old_l]:
+                newTypes[old_l] = t.get_id()
+
+        demand = kernel.demand[c_id, role]
+        if solution.type_at[l_id] < 0:
+            # the location can be opened if only the center that is closed blocked it
+            if solution.blocked[l_id] - (1 if closes and kernel.conflicts[old_l, l_id] else 0) > 0:
+                return None
+            t_id = kernel.cheapestType(need, demand)
+            oldCost = 0.0
+        else:
+            t_id = kernel.cheapestType(max(solution.maxNeed[l_id], need), solution.load[l_id] + demand)
+            oldCost = kernel.cost[solution.type_at[l_id]]
+        if t_id < 0:
+            return None
+        newTypes[l_id] = t_id
+        return float(delta + kernel.cost[t_id] - oldCost), newTypes
+
+    # Walk from the better solution to the worse one. Returns the best intermediate solution (the two ends are
+    # excluded), None if the path has no intermediate solution.
+    def relink(self, solution, other):
+        start, guide = (solution, other) if solution.cost <= other.cost else (other, solution)
+        current = start.copy()
+        remaining = {}
+        for role, centers, guideCenters in [(PRIMARY, current.primary, guide.primary),
+                                            (SECONDARY, current.secondary, guide.secondary)]:
+            for c_id in (centers != guideCenters).nonzero()[0].tolist():
+                remaining[(c_id, role)] = int(guideCenters[c_id])
+
+        best = None
+        current.startTrail()
+        while len(remaining) > 1:
+            steps = []
+            for (c_id, role), l_id in remaining.items():
+                step = PathRelinking.evaluateStep(current, c_id, role, l_id)
+                if step is not None:
+                    steps.append((step[0], c_id, role, l_id, step[1]))
+            steps.sort(key=lambda step: step[:3])
+
+            applied = None
+            for _, c_id, role, l_id, newTypes in steps:
+                move = Move(current.cities[c_id], role, current.locations[current.getCenter(c_id, role)],
+                            current.locations[l_id])
+                feasible = self.localSearch.applyExchange(current, [move], newTypes)
+                if instrumentation.ENABLED: instrumentation.countAttempt('pr steps', 'pr steps infeasible', feasible)
+                if feasible:
+                    applied = (c_id, role)
+                    break
+            # the remaining roles cannot be moved one at a time (e.g. primary and secondary centers swapped)
+            if applied is None: break
+            del remaining[applied]
+            # the changes of a step are kept, the trail only holds the ones of the next step
+            current.startTrail()
+            if best is None or current.cost < best.cost:
+                best = current.copy()
+        current.stopTrail()
+        return best
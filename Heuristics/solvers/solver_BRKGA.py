@@ -0,0 +1,115 @@
+"""
+AMMM Project
+BRKGA solver
+Eloy Marín, Pablo Pazos
+"""
+
+import math
+import multiprocessing
+import time
+
+import numpy as np
+
+from Heuristics.solver import _Solver
+from Heuristics.solvers.decoder_BRKGA import Decoder_BRKGA
+
+
+# Decoder of a pool worker, set by _initWorker when the process starts
+_worker = {}
+
+
+def _initWorker(decoder):
+    _worker['decoder'] = decoder
+
+
+def _decodeBatch(population):
+    return _worker['decoder'].decodeFitness(population)
+
+
+# Biased random-key genetic algorithm. Inherits from the parent abstract solver.
+# The population is a (numIndividuals x chromosomeLength) matrix of keys in [0, 1) kept sorted by fitness.
+# Each generation keeps the elite individuals, adds random mutants and fills the rest with children of an
+# elite and a non-elite parent, taking each key from the elite parent with probability inheritanceProb.
+# Only the new individuals are decoded, in batches spread over the worker processes.
+class Solver_BRKGA(_Solver):
+    def __init__(self, config, instance):
+        super(Solver_BRKGA, self).__init__(config, instance)
+        self.decoder = Decoder_BRKGA(instance)
+        n = self.decoder.chromosomeLength
+        self.numIndividuals = max(2, int(math.ceil(config.IndividualsMultiplier * n)))
+        self.numElite = min(self.numIndividuals - 1, max(1, int(math.ceil(config.eliteProp * self.numIndividuals))))
+        self.numMutants = min(self.numIndividuals - self.numElite, int(config.mutantProp * self.numIndividuals))
+        self.numCrossover = self.numIndividuals - self.numElite - self.numMutants
+
+    def _decode(self, population, pool):
+        if pool is None:
+            return self.decoder.decodeFitness(population)
+        batches = np.array_split(population, min(len(population), 4 * self.config.workers))
+        return np.concatenate(pool.map(_decodeBatch, batches))
+
+    def _nextGeneration(self, rng, population):
+        n = self.decoder.chromosomeLength
+        elite = population[:self.numElite]
+        mutants = rng.random((self.numMutants, n))
+        eliteParents = elite[rng.integers(self.numElite, size=self.numCrossover)]
+        otherParents = population[self.numElite:][rng.integers(self.numIndividuals - self.numElite,
+                                                               size=self.numCrossover)]
+        inherit = rng.random((self.numCrossover, n)) < self.config.inheritanceProb
+        children = np.where(inherit, eliteParents, otherParents)
+        return np.vstack([mutants, children])
+
+    def stopCriteria(self):
+        self.elapsedEvalTime = time.time() - self.startTime
+        return time.time() - self.startTime > self.config.maxExecTime
+
+    def _evolve(self, pool):
+        rng = np.random.default_rng(self.config.seed)
+        population = rng.random((self.numIndividuals, self.decoder.chromosomeLength))
+        fitness = self._decode(population, pool)
+        self.numSolutionsConstructed = self.numIndividuals
+
+        bestFitness = float('infinity')
+        bestChromosome = None
+        generation = 0
+        while True:
+            order = np.argsort(fitness, kind='stable')
+            population = population[order]
+            fitness = fitness[order]
+            if fitness[0] < bestFitness:
+                bestFitness = float(fitness[0])
+                bestChromosome = population[0].copy()
+                # the fitness of an infeasible chromosome is not the cost of a solution
+                if self.decoder.isFeasibleFitness(bestFitness):
+                    self.writeLogLine(bestFitness, generation)
+
+            if self.stopCriteria(): break
+            generation += 1
+            offspring = self._nextGeneration(rng, population)
+            offspringFitness = self._decode(offspring, pool)
+            self.numSolutionsConstructed += len(offspring)
+            population = np.vstack([population[:self.numElite], offspring])
+            fitness = np.concatenate([fitness[:self.numElite], offspringFitness])
+
+        return bestChromosome, generation
+
+    def solve(self, **kwargs):
+        self.startTimeMeasure()
+        self.writeLogLine(float('infinity'), 0)
+
+        pool = None
+        if self.config.workers > 1:
+            pool = multiprocessing.Pool(self.config.workers, initializer=_initWorker, initargs=(self.decoder,))
+        try:
+            bestChromosome, generation = self._evolve(pool)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        incumbent, _ = self.decoder.decode(bestChromosome)
+        if not incumbent.isFeasible():
+            print('Problem is infeasible. Please try again!')
+        else:
+            self.writeLogLine(incumbent.cost, generation)
+            self.printPerformance()
+        return incumbent
@@ -6,61 +6,336 @@ File given Luis Velasco and under its copyright policy
 Modified for project purposes
 """
 
+import multiprocessing
+import queue
 import random
-import copy
 import time
+from Heuristics import instrumentation
 from Heuristics.solver import _Solver
 from Heuristics.solvers.localSearch import LocalSearch
+from Heuristics.solvers.pathRelinking import EliteSet, PathRelinking
+from Heuristics.trace import CONSTRUCTION, LOCAL_SEARCH, PATH_RELINKING
 
 
-# Inherits from the parent abstract solver.
-class Solver_GRASP(_Solver):
+# Reports sent by the pool workers to the parent process while they run: an improvement of the worker incumbent
+# (IMPROVEMENT, timestamp, cost, iteration, phase) and, with path relinking, the solution of an iteration
+# (SOLUTION, iteration, solution, phase).
+IMPROVEMENT = 0
+SOLUTION = 1
 
-    def _selectCandidate(self, candidateList, alpha):
+# State of a pool worker: the solver it runs iterations for, the cost of the best solution found by any worker and
+# the queue where it sends its reports to the parent process.
+# It is set by _initWorker when the process starts.
+_worker = {}
+
+
+def _initWorker(solver, bestCost, reports):
+    _worker['solver'] = solver
+    _worker['bestCost'] = bestCost
+    _worker['reports'] = reports
+    # counts inherited from the parent process are already in the parent
+    if instrumentation.ENABLED: instrumentation.reset()
+
+
+# Run the iterations of worker w out of numWorkers (global iterations w+1, w+1+numWorkers, ...).
+# Returns the best solution found by the worker, its iteration, the worker statistics, its instrumentation, its
+# reactive alpha statistics and the number of reports it sent.
+def _runWorker(w, numWorkers):
+    return _worker['solver']._runIterations(w + 1, numWorkers, _worker['bestCost'], _worker['reports'])
+
+
+# Alpha values of reactive GRASP. Every iteration draws its alpha with a probability proportional to
+# (best mean cost / mean cost of the solutions built with that alpha) ^ REACTIVE_DELTA. The probabilities are
+# recomputed every period iterations from the solutions recorded so far.
+class ReactiveAlpha(object):
+    REACTIVE_DELTA = 10
+
+    def __init__(self, values, period):
+        self.values = values
+        self.period = period
+        self.probabilities = [1.0 / len(values)] * len(values)
+        self.uses = [0] * len(values)
+        self.costSum = [0.0] * len(values)
+        self.costCount = [0] * len(values)
+
+    # Index of the alpha value of the next iteration
+    def choose(self):
+        return random.choices(range(len(self.values)), weights=self.probabilities)[0]
+
+    # cost is None if the iteration did not produce a feasible solution
+    def record(self, index, cost):
+        self.uses[index] += 1
+        if cost is not None:
+            self.costSum[index] += cost
+            self.costCount[index] += 1
+        if sum(self.uses) % self.period == 0:
+            self.update()
+
+    def update(self):
+        means = [total / count if count > 0 else None for total, count in zip(self.costSum, self.costCount)]
+        known = [mean for mean in means if mean is not None and mean > 0]
+        if not known: return
+        best = min(known)
+        # values without solutions yet keep the largest quality, so they are still tried
+        qualities = [(best / mean) ** ReactiveAlpha.REACTIVE_DELTA if mean is not None and mean > 0 else 1.0
+                     for mean in means]
+        total = sum(qualities)
+        self.probabilities = [quality / total for quality in qualities]
 
-        # sort candidate assignments by cost in descending order
-        sortedCandidateList = sorted(candidateList, key=lambda x: x.cost, reverse=False)
+    # Statistics of the iterations of another worker added to these ones
+    def merge(self, other):
+        for i in range(len(self.values)):
+            self.uses[i] += other.uses[i]
+            self.costSum[i] += other.costSum[i]
+            self.costCount[i] += other.costCount[i]
+        self.update()
 
-        # compute boundary cost as a function of the minimum and maximum cost and the alpha parameter
-        minHLoad = sortedCandidateList[0].cost
-        maxHLoad = sortedCandidateList[-1].cost
-        boundaryHLoad = minHLoad + (maxHLoad - minHLoad) * alpha
+    def report(self):
+        print('Reactive alpha:')
+        print('  %8s %12s %8s %12s' % ('alpha', 'probability', 'uses', 'mean cost'))
+        for i, value in enumerate(self.values):
+            meanCost = self.costSum[i] / self.costCount[i] if self.costCount[i] > 0 else float('nan')
+            print('  %8.3f %12.4f %8d %12.2f' % (value, self.probabilities[i], self.uses[i], meanCost))
 
-        # find elements that fall into the RCL
-        maxIndex = 0
-        for candidate in sortedCandidateList:
-            if candidate.cost <= boundaryHLoad:
-                maxIndex += 1
 
-        # create RCL and pick an element randomly
-        rcl = sortedCandidateList[0:maxIndex]  # pick first maxIndex elements starting from element 0
+# Inherits from the parent abstract solver.
+class Solver_GRASP(_Solver):
+
+    # The restricted candidate list (the candidates whose cost is at most min + alpha * (max - min), sorted by
+    # cost) is built by the candidate list from its cost arrays, only the candidate picked becomes an Assignment
+    def _selectCandidate(self, candidateList, alpha):
+        rcl = candidateList.getRestricted(alpha)
         if not rcl:
             return None
         return random.choice(rcl)  # pick a candidate from rcl at random
 
-    def _greedyRandomizedConstruction(self, alpha):
+    # Construct a solution. If the cost of every completion of the partial solution is strictly larger
+    # than cutoff() the construction is abandoned and an infeasible solution is returned; cutOffBound is then
+    # the lower bound of the cost of those completions.
+    def _greedyRandomizedConstruction(self, alpha, cutoff=None):
         solution = self.instance.createSolution()
         assignment = 0
         complete = False
         while not complete:
 
-            candidateList = solution.findFeasibleAssignments()
+            candidate = self._selectCandidate(solution.getCandidateList(), alpha)
 
             # no candidate assignments => no feasible assignment found
-            if not candidateList:
+            if candidate is None:
                 solution.makeInfeasible()
                 break
 
-            candidate = self._selectCandidate(candidateList, alpha)
-
             pc_or_sc = 'primary' if candidate.is_primary is True else 'secondary'
             solution.assign(candidate.city, candidate.location,
                             candidate.type, pc_or_sc, check_completeness=True)
             complete = solution.complete
             assignment += 1
 
+            # the solution cannot improve the best one anymore
+            if cutoff is not None and not complete:
+                bound = solution.getCompletionLowerBound()
+                if bound > cutoff():
+                    solution.makeInfeasible()
+                    self.numCutOff += 1
+                    self.cutOffBound = bound
+                    break
+
         return solution
 
+    # One GRASP iteration: construction followed by the local search. Returns the solution and the phase that
+    # found it: the local search if it improved the constructed solution.
+    # With a seed, every iteration draws its random numbers from its own stream, so its outcome does not depend
+    # on the worker that runs it.
+    # In reactive mode the alpha of the iteration is drawn from the reactive alpha values, which learn from the
+    # cost of the solution. A construction that was cut off counts with the lower bound of its completions.
+    def _iterate(self, iteration, cutoff=None):
+        if self.seed is not None:
+            random.seed('%d-%d' % (self.seed, iteration))
+        # the completion bound does not hold once the local search can lower the cost of the solution, and with
+        # path relinking a solution that cannot improve the best one may still join the elite set
+        if self.config.localSearch or self.config.pathRelinking: cutoff = None
+        alpha = self.config.alpha
+        if self.reactive is not None:
+            alphaIndex = self.reactive.choose()
+            alpha = self.reactive.values[alphaIndex]
+            numCutOff = self.numCutOff
+        solution = self._greedyRandomizedConstruction(alpha, cutoff)
+        phase = CONSTRUCTION
+        if self.config.localSearch:
+            constructionCost = solution.cost
+            localSearch = LocalSearch(self.config, None)
+            endTime = self.startTime + self.config.maxExecTime
+            # the constructed solution is improved in place
+            solution = localSearch.solve(solution=solution, startTime=self.startTime, endTime=endTime)
+            if solution.cost < constructionCost:
+                phase = LOCAL_SEARCH
+        if self.reactive is not None:
+            cost = None
+            if solution.isFeasible():
+                cost = solution.cost
+            elif self.numCutOff > numCutOff:
+                cost = self.cutOffBound
+            self.reactive.record(alphaIndex, cost)
+        return solution, phase
+
+    # Path relinking of the solution of an iteration, run after _iterate in the order of the iterations. With a
+    # seed, it draws its random numbers from a stream of its own, so it does not depend on the process that runs it.
+    def _relinkIteration(self, iteration, solution, phase):
+        if not solution.isFeasible(): return solution, phase
+        if self.seed is not None:
+            random.seed('%d-%d-relink' % (self.seed, iteration))
+        return self._pathRelinking(solution, phase)
+
+    # Relink the solution with a random member of the elite set and improve the best solution of the path with the
+    # local search. The solution and the relinked one are offered to the elite set. Returns the better of the two
+    # and the phase that found it.
+    def _pathRelinking(self, solution, phase):
+        guide = self.elite.chooseGuide(solution)
+        self.elite.add(solution)
+        if guide is None: return solution, phase
+        relinked = self.pathRelinking.relink(solution, guide)
+        if relinked is None: return solution, phase
+        if self.config.localSearch:
+            endTime = self.startTime + self.config.maxExecTime
+            # relinked is a copy of its own (see PathRelinking.relink), the elite set keeps copies of its members
+            relinked = self.pathRelinking.localSearch.solve(solution=relinked, startTime=self.startTime,
+                                                            endTime=endTime)
+        self.elite.add(relinked)
+        if relinked.cost < solution.cost:
+            return relinked, PATH_RELINKING
+        return solution, phase
+
+    def _iterationsLeft(self, iteration):
+        if self.config.maxIterations is not None and iteration > self.config.maxIterations:
+            return False
+        return not self.stopCriteria()
+
+    # Iterations run by a pool worker. The best cost is shared with the other workers to cut off constructions.
+    # Every improvement of the worker incumbent is sent to the parent through reports when it is found.
+    # In reactive mode the constructions are cut off with the cost of the worker incumbent instead: the alpha
+    # values learn from the cut off constructions, which would otherwise depend on the timing of the workers.
+    # With path relinking, the solution of every iteration is also sent to the parent through reports.
+    def _runIterations(self, first, step, bestCost, reports):
+        workerStart = time.time()
+        incumbent = None
+        incumbentIteration = 0
+        numReports = 0
+        iterations = 0
+        iteration = first
+        cutoff = lambda: bestCost.value
+        if self.reactive is not None:
+            cutoff = lambda: incumbent.cost if incumbent is not None else float('infinity')
+        while self._iterationsLeft(iteration):
+            solution, phase = self._iterate(iteration, cutoff=cutoff)
+            iterations += 1
+            if self.elite is not None:
+                reports.put((SOLUTION, iteration, solution.detach() if solution.isFeasible() else None, phase))
+                numReports += 1
+
+            if solution.isFeasible() and (incumbent is None or solution.cost < incumbent.cost):
+                incumbent = solution.copy()
+                incumbentIteration = iteration
+                reports.put((IMPROVEMENT, time.time(), solution.cost, iteration, phase))
+                numReports += 1
+                with bestCost.get_lock():
+                    if solution.cost < bestCost.value:
+                        bestCost.value = solution.cost
+            iteration += step
+
+        elapsed = time.time() - workerStart
+        counts = instrumentation.snapshot() if instrumentation.ENABLED else None
+        return incumbent, incumbentIteration, iterations, self.numCutOff, elapsed, counts, self.reactive, numReports
+
+    def _solveSequential(self, incumbent):
+        cost = incumbent.cost
+        iteration = 0
+        while self._iterationsLeft(iteration + 1):
+            iteration += 1
+            solution, phase = self._iterate(iteration, cutoff=lambda: cost)
+            if self.elite is not None:
+                solution, phase = self._relinkIteration(iteration, solution, phase)
+
+            if solution.isFeasible():
+                solutionLowestCost = solution.cost
+                if solutionLowestCost < cost:
+                    incumbent = solution.copy()
+                    cost = solutionLowestCost
+                    self.writeLogLine(cost, iteration, phase)
+        return incumbent, iteration
+
+    # Reports of the workers of a parallel run, handled while they run. The improvements of the workers are logged
+    # when they arrive, the trace keeps the ones that improve the best cost found by any worker so far.
+    # With path relinking, the solutions of the iterations are relinked here in the order of the iterations as in a
+    # sequential run, so the elite set does not depend on the number of workers. Iterations received after the time
+    # limit are not relinked.
+    # Returns the best solution found by the path relinking and its iteration (None, 0 without path relinking).
+    def _handleReports(self, results, reports):
+        incumbent = None
+        incumbentIteration = 0
+        pending = {}
+        nextIteration = 1
+        received = 0
+        while True:
+            # the workers are done once every report they sent has been received
+            if results.ready() and received == sum(result[7] for result in results.get()):
+                break
+            try:
+                report = reports.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            received += 1
+            if report[0] == IMPROVEMENT:
+                _, timestamp, cost, iteration, phase = report
+                self.writeLogLine(cost, iteration, phase, timestamp)
+                continue
+            _, iteration, solution, phase = report
+            pending[iteration] = (solution, phase)
+            while nextIteration in pending:
+                solution, phase = pending.pop(nextIteration)
+                if solution is not None and not self.stopCriteria():
+                    solution, phase = self._relinkIteration(nextIteration, solution.attach(self.instance), phase)
+                    if incumbent is None or solution.cost < incumbent.cost:
+                        incumbent = solution.copy()
+                        incumbentIteration = nextIteration
+                        self.writeLogLine(solution.cost, nextIteration, phase)
+                nextIteration += 1
+        return incumbent, incumbentIteration
+
+    def _solveParallel(self, incumbent):
+        numWorkers = self.config.workers
+        bestCost = multiprocessing.Value('d', incumbent.cost)
+        reports = multiprocessing.Queue()
+        pool = multiprocessing.Pool(numWorkers, initializer=_initWorker, initargs=(self, bestCost, reports))
+        try:
+            results = pool.starmap_async(_runWorker, [(w, numWorkers) for w in range(numWorkers)])
+            relinked = self._handleReports(results, reports)
+            results = results.get()
+        finally:
+            pool.close()
+            pool.join()
+
+        # the best solutions of the path relinking and of the workers, the one of the path relinking comes first:
+        # for an iteration it is at least as good as the one of its worker
+        candidates = [relinked] + [(result[0], result[1]) for result in results]
+
+        # ties are broken by iteration, so the result does not depend on the timing of the workers
+        bestIteration = 0
+        for solution, solutionIteration in candidates:
+            if solution is None: continue
+            if solution.cost < incumbent.cost or (solution.cost == incumbent.cost and solutionIteration < bestIteration):
+                incumbent = solution
+                bestIteration = solutionIteration
+
+        if self.config.verbose:
+            for w, (_, _, iterations, numCutOff, elapsed, _, _, _) in enumerate(results):
+                throughput = iterations / elapsed if elapsed > 0 else 0.0
+                print('  Worker %d: %d iterations (%d cut off), %.2f iterations/s' % (w, iterations, numCutOff, throughput))
+        self.numCutOff = sum(result[3] for result in results)
+        for result in results:
+            if result[5] is not None: instrumentation.merge(result[5])
+            if result[6] is not None: self.reactive.merge(result[6])
+        return incumbent, sum(result[2] for result in results)
+
     def stopCriteria(self):
         self.elapsedEvalTime = time.time() - self.startTime
         return time.time() - self.startTime > self.config.maxExecTime
@@ -70,25 +345,29 @@ class Solver_GRASP(_Solver):
         incumbent = self.instance.createSolution()
         incumbent.makeInfeasible()
         incumbent.cost = float('infinity')
-        cost = incumbent.cost
-        self.writeLogLine(cost, 0)
+        self.writeLogLine(incumbent.cost, 0)
 
-        iteration = 0
-        while not self.stopCriteria():
-            iteration += 1
-            alpha = self.config.alpha
-            solution = self._greedyRandomizedConstruction(alpha)
-            if self.config.localSearch:
-                localSearch = LocalSearch(self.config, None)
-                endTime = self.startTime + self.config.maxExecTime
-                solution = localSearch.solve(solution=solution, startTime=self.startTime, endTime=endTime)
+        # parallel workers need distinct random streams even if no seed was given
+        self.seed = self.config.seed
+        if self.seed is None and self.config.workers > 1:
+            self.seed = random.randrange(2 ** 31)
+        self.numCutOff = 0
+        self.cutOffBound = None
+        self.reactive = None
+        if self.config.reactive:
+            self.reactive = ReactiveAlpha(self.config.reactiveAlphas, self.config.reactivePeriod)
+        # in parallel runs the elite set is kept by this process (see _relinkInOrder)
+        self.elite = None
+        if self.config.pathRelinking:
+            self.elite = EliteSet(self.config.eliteSize, self.config.eliteMinDistance)
+            self.pathRelinking = PathRelinking(self.config)
 
-            if solution.isFeasible():
-                solutionLowestCost = solution.cost
-                if solutionLowestCost < cost:
-                    incumbent = copy.deepcopy(solution)
-                    cost = solutionLowestCost
-                    self.writeLogLine(cost, iteration)
+        if self.config.workers > 1:
+            incumbent, iteration = self._solveParallel(incumbent)
+        else:
+            incumbent, iteration = self._solveSequential(incumbent)
+        cost = incumbent.cost
+        self.elapsedEvalTime = time.time() - self.startTime
 
         if incumbent.cost == float('infinity'):
             print('Problem is infeasible. Please try again!')
@@ -97,4 +376,6 @@ class Solver_GRASP(_Solver):
             self.writeLogLine(cost, iteration)
             self.numSolutionsConstructed = iteration
             self.printPerformance()
+            if self.reactive is not None and self.config.verbose:
+                self.reactive.report()
         return incumbent
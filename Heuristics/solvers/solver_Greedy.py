@@ -11,6 +11,7 @@ import random, time
 from AMMMGlobals import AMMMException
 from Heuristics.solver import _Solver
 from Heuristics.solvers.localSearch import LocalSearch
+from Heuristics.trace import CONSTRUCTION, LOCAL_SEARCH
 
 
 # Inherits from the parent abstract solver.
@@ -18,19 +19,14 @@ class Solver_Greedy(_Solver):
 
     def _selectCandidate(self, candidateList):
         if self.config.solver == 'Greedy':
-            # sort candidate assignments by cost in ascending order
-            sortedCandidateList = sorted(candidateList, key=lambda x: x.cost)
             # choose assignment with minimum cost
-            best_candidates = []
-            min_value = sortedCandidateList[0].cost
-            for c in sortedCandidateList:
-                if c.cost == min_value:
-                    best_candidates.append(c)
-                else:
-                    break
+            best_candidates = candidateList.getRestricted(0.0)
+            if not best_candidates:
+                return None
             # if there are multiple assignments with min cost, select one randomly
             return random.choice(best_candidates)
-        return random.choice(candidateList)
+        candidates = candidateList.getAssignments()
+        return random.choice(candidates) if candidates else None
 
     def construction(self):
         # get an empty solution for the problem
@@ -39,18 +35,15 @@ class Solver_Greedy(_Solver):
         complete = False
         while not complete:
 
-            # get feasible assignments
-            candidates = solution.findFeasibleAssignments()
+            # assign the assignment with min cost
+            candidate_with_min_cost = self._selectCandidate(solution.getCandidateList())
 
             # no candidate assignments => no feasible assignment found
-            if not candidates:
+            if candidate_with_min_cost is None:
                 solution.makeInfeasible()
                 raise AMMMException('Greedy construction is infeasible. Please try again!')
                 # break
 
-            # assign the assignment with min cost
-            candidate_with_min_cost = self._selectCandidate(candidates)
-
             pc_or_sc = 'primary' if candidate_with_min_cost.is_primary is True else 'secondary'
             solution.assign(candidate_with_min_cost.city, candidate_with_min_cost.location,
                             candidate_with_min_cost.type, pc_or_sc, check_completeness=True)
@@ -81,10 +74,11 @@ class Solver_Greedy(_Solver):
         if self.config.localSearch:
             localSearch = LocalSearch(self.config, None)
             endTime = self.startTime + self.config.maxExecTime
+            # the constructed solution is improved in place
             solution = localSearch.solve(solution=solution, startTime=self.startTime, endTime=endTime)
 
         self.elapsedEvalTime = time.time() - self.startTime
-        self.writeLogLine(solution.cost, 1)
+        self.writeLogLine(solution.cost, 1, LOCAL_SEARCH if self.config.localSearch else CONSTRUCTION)
         self.numSolutionsConstructed = 1
 
         self.printPerformance()
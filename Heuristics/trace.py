@@ -0,0 +1,53 @@
+"""
+AMMM Project
+Convergence trace of the solvers: every improvement of the incumbent
+Eloy Marín, Pablo Pazos
+"""
+
+import csv
+import json
+import os
+
+from AMMMGlobals import AMMMException
+
+# Phase of the algorithm that found an incumbent
+CONSTRUCTION = 'construction'
+LOCAL_SEARCH = 'local search'
+PATH_RELINKING = 'path relinking'
+
+TRACE_FORMATS = ['jsonl', 'csv']
+FIELDS = ['timestamp', 'elapsedTime', 'objective', 'iteration', 'phase', 'gap']
+
+
+# Trace file of a solution file: solutions/x.sol -> solutions/x.trace.jsonl
+def traceFilePath(solutionFile, traceFormat):
+    return '%s.trace.%s' % (os.path.splitext(solutionFile)[0], traceFormat)
+
+
+# Incumbents of a run in the order they were found. Recording an incumbent only appends a tuple,
+# the records are formatted when the trace is written.
+class ConvergenceTrace(object):
+    def __init__(self):
+        self.records = []
+        self.bestObjective = float('inf')
+
+    # Record the incumbent if it improves the best objective recorded so far. gap is the optimality gap (in %)
+    # of the incumbent, None if no lower bound is known. Returns True if the incumbent was recorded.
+    def record(self, timestamp, elapsedTime, objective, iteration, phase, gap=None):
+        if objective >= self.bestObjective:
+            return False
+        self.bestObjective = objective
+        self.records.append((timestamp, elapsedTime, objective, iteration, phase, gap))
+        return True
+
+    def write(self, filePath, traceFormat):
+        if traceFormat not in TRACE_FORMATS:
+            raise AMMMException('Unsupported trace format(%s). Supported: %s' % (traceFormat, ' / '.join(TRACE_FORMATS)))
+        with open(filePath, 'w', newline='') as f:
+            if traceFormat == 'jsonl':
+                for record in self.records:
+                    f.write(json.dumps(dict(zip(FIELDS, record))) + '\n')
+            else:
+                writer = csv.writer(f)
+                writer.writerow(FIELDS)
+                writer.writerows(self.records)
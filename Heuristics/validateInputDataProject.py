@@ -17,6 +17,8 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import numpy as np
+
 from AMMMGlobals import AMMMException
 
 
@@ -33,6 +35,11 @@ class ValidateInputData(object):
             if paramName not in data.__dict__:
                 raise AMMMException('Parameter/Set(%s) not contained in Input Data' % str(paramName))
 
+        # Binary instances hold NumPy arrays, they are validated without materialising them into lists
+        if isinstance(data.p, np.ndarray):
+            ValidateInputData._validateArrays(data)
+            return
+
         # Validate nLocations
         nLocations = data.nLocations
         if not isinstance(nLocations, int) or (nLocations <= 0):
@@ -129,3 +136,31 @@ class ValidateInputData(object):
             raise AMMMException(
                 'Invalid parameter value(%s) in d_center. Should be a float greater or equal than zero.' % str(
                     d_center))
+
+    @staticmethod
+    def _validateArrays(data):
+        # Validate sizes
+        for paramName in ['nLocations', 'nCities', 'nTypes']:
+            value = data.__dict__[paramName]
+            if not isinstance(value, int) or (value <= 0):
+                raise AMMMException('%s(%s) has to be a positive integer value.' % (paramName, str(value)))
+
+        shapes = {'p': (data.nCities,), 'posCities': (data.nCities, 2), 'posLocations': (data.nLocations, 2),
+                  'd_city': (data.nTypes,), 'cap': (data.nTypes,), 'cost': (data.nTypes,)}
+        for paramName, shape in shapes.items():
+            value = data.__dict__[paramName]
+            if not isinstance(value, np.ndarray) or value.shape != shape:
+                raise AMMMException('Shape of %s(%s) does not match with expected shape(%s).'
+                                    % (paramName, str(np.shape(value)), str(shape)))
+            if value.dtype.kind not in 'iuf':
+                raise AMMMException('Invalid dtype(%s) in %s. Should be numeric.' % (str(value.dtype), paramName))
+            if value.size > 0 and not (value >= 0).all():
+                raise AMMMException(
+                    'Invalid parameter value in %s. Should be a float greater or equal than zero.' % paramName)
+
+        # Validate d_center
+        d_center = data.d_center
+        if not isinstance(d_center, (int, float)) or (d_center < 0):
+            raise AMMMException(
+                'Invalid parameter value(%s) in d_center. Should be a float greater or equal than zero.' % str(
+                    d_center))
@@ -0,0 +1,49 @@
+"""
+AMMM Project
+Tuner main function
+Eloy Marín, Pablo Pazos
+"""
+
+import sys
+import time
+from argparse import ArgumentParser
+
+from AMMMGlobals import AMMMException
+from Heuristics.datParser import DATParser
+from Tuner.racing import RacingTuner, candidateName
+from Tuner.ValidateConfig import ValidateConfig
+
+
+def run(configFile):
+    try:
+        print("AMMM Tuner")
+        print("----------")
+        print("Reading Config file %s..." % configFile)
+        config = DATParser.parse(configFile)
+        ValidateConfig.validate(config)
+        tuner = RacingTuner(config)
+        print("Racing %d candidates on %d instances..." % (len(tuner.candidates), len(tuner.instanceFiles)))
+        startTime = time.time()
+        best = tuner.run()
+        print("Race finished in %.1f s" % (time.time() - startTime))
+
+        print('%-60s %-24s %6s %9s %9s %10s' % ('candidate', 'status', 'blocks', 'mean rank', 'mean dev.', 'infeasible'))
+        for row in tuner.summary():
+            meanRank = '%9.2f' % row['meanRank'] if row['meanRank'] is not None else '%9s' % '-'
+            meanDeviation = '%8.2f%%' % row['meanDeviation'] if row['meanDeviation'] is not None else '%9s' % '-'
+            print('%-60s %-24s %6d %s %s %10d' % (row['candidate'], row['status'], row['blocks'], meanRank,
+                                                 meanDeviation, row['infeasible']))
+        csvFile, configFile = tuner.writeResults(best)
+        print("Best configuration: %s" % candidateName(best))
+        print("Results written to %s and %s" % (csvFile, configFile))
+        return 0
+    except AMMMException as e:
+        print("Exception: %s" % e)
+        return 1
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='AMMM Lab Project - racing tuner of the GRASP parameters')
+    parser.add_argument('-c', '--configFile', type=str, default='config/config.dat')
+    args = parser.parse_args()
+    sys.exit(run(args.configFile))
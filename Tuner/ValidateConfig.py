@@ -0,0 +1,105 @@
+"""
+AMMM Project
+Tuner config attributes validator.
+Eloy Marín, Pablo Pazos
+"""
+
+import os
+
+from AMMMGlobals import AMMMException
+from Tuner.racing import TUNED_PARAMETERS
+
+
+class ValidateConfig(object):
+    # Validate config attributes read from a DAT file.
+    @staticmethod
+    def validate(data):
+        # Validate that mandatory input parameters were found
+        paramList = ['solverConfigFile', 'instancesDirectory', 'instances', 'resultsDirectory', 'maxExecTime']
+        paramList += [listName for listName, _ in TUNED_PARAMETERS]
+        for paramName in paramList:
+            if paramName not in data.__dict__:
+                raise AMMMException('Parameter(%s) has not been not specified in Configuration' % str(paramName))
+
+        solverConfigFile = data.solverConfigFile
+        if not os.path.exists(solverConfigFile):
+            raise AMMMException('solverConfigFile(%s) does not exist' % solverConfigFile)
+
+        instancesDirectory = data.instancesDirectory
+        if not os.path.isdir(instancesDirectory):
+            raise AMMMException('Directory(%s) does not exist' % instancesDirectory)
+
+        data.instances = [str(instance) for instance in data.instances]
+        if len(data.instances) == 0: raise AMMMException('Value for instances is empty')
+        for instance in data.instances:
+            if not os.path.exists(os.path.join(instancesDirectory, instance)):
+                raise AMMMException('Instance(%s) does not exist in %s' % (instance, instancesDirectory))
+
+        resultsDirectory = data.resultsDirectory
+        if len(resultsDirectory) == 0: raise AMMMException('Value for resultsDirectory is empty')
+
+        # Validate the tuned values, a single value is allowed; the values themselves are validated by the solver
+        for listName, _ in TUNED_PARAMETERS:
+            values = data.__dict__[listName]
+            if not isinstance(values, list):
+                values = [values]
+            if len(values) == 0: raise AMMMException('Value for %s is empty' % listName)
+            data.__dict__[listName] = values
+
+        maxExecTime = data.maxExecTime
+        if not isinstance(maxExecTime, (int, float)) or isinstance(maxExecTime, bool) or (maxExecTime <= 0):
+            raise AMMMException('maxExecTime(%s) has to be a positive value.' % str(maxExecTime))
+
+        # Validate maxIterations
+        maxIterations = None
+        if 'maxIterations' in data.__dict__:
+            maxIterations = data.maxIterations
+            if not isinstance(maxIterations, int) or isinstance(maxIterations, bool) or (maxIterations <= 0):
+                raise AMMMException('maxIterations(%s) has to be a positive integer value.' % str(maxIterations))
+        else:
+            data.maxIterations = maxIterations
+
+        # Validate seed
+        seed = 0
+        if 'seed' in data.__dict__:
+            seed = data.seed
+            if not isinstance(seed, int) or isinstance(seed, bool) or (seed < 0):
+                raise AMMMException('seed(%s) has to be a non-negative integer value.' % str(seed))
+        else:
+            data.seed = seed
+
+        # Validate workers
+        workers = 1
+        if 'workers' in data.__dict__:
+            workers = data.workers
+            if not isinstance(workers, int) or isinstance(workers, bool) or (workers <= 0):
+                raise AMMMException('workers(%s) has to be a positive integer value.' % str(workers))
+        else:
+            data.workers = workers
+
+        # Validate minBlocks: blocks solved before the first candidate can be discarded
+        minBlocks = 5
+        if 'minBlocks' in data.__dict__:
+            minBlocks = data.minBlocks
+            if not isinstance(minBlocks, int) or isinstance(minBlocks, bool) or (minBlocks <= 0):
+                raise AMMMException('minBlocks(%s) has to be a positive integer value.' % str(minBlocks))
+        else:
+            data.minBlocks = minBlocks
+
+        # Validate maxBlocks, by default every instance is solved with 3 seeds
+        maxBlocks = 3 * len(data.instances)
+        if 'maxBlocks' in data.__dict__:
+            maxBlocks = data.maxBlocks
+            if not isinstance(maxBlocks, int) or isinstance(maxBlocks, bool) or (maxBlocks < minBlocks):
+                raise AMMMException('maxBlocks(%s) has to be an integer value >= minBlocks.' % str(maxBlocks))
+        else:
+            data.maxBlocks = max(maxBlocks, minBlocks)
+
+        # Validate significance
+        significance = 0.05
+        if 'significance' in data.__dict__:
+            significance = data.significance
+            if not isinstance(significance, float) or (significance <= 0) or (significance >= 1):
+                raise AMMMException('significance(%s) has to be a real value in range (0, 1).' % str(significance))
+        else:
+            data.significance = significance
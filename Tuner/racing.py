@@ -0,0 +1,223 @@
+"""
+AMMM Project
+Racing tuner: races candidate configurations of the GRASP solver over a set of instances
+Eloy Marín, Pablo Pazos
+"""
+
+import copy
+import csv
+import itertools
+import math
+import multiprocessing
+import os
+import re
+
+from Heuristics.batch import readInstance
+from Heuristics.datParser import DATParser
+from Heuristics.problem.instance import Instance
+from Heuristics.solvers.solver_GRASP import Solver_GRASP
+from Heuristics.ValidateConfig import ValidateConfig
+
+# Tuned solver parameters: list of values in the tuner config -> parameter of the solver config
+TUNED_PARAMETERS = [('alphas', 'alpha'), ('policies', 'policy'), ('neighborhoods', 'neighborhoodStrategy')]
+# Solver parameters fixed for every candidate
+FIXED_PARAMETERS = {'solver': 'GRASP', 'reactive': False, 'localSearch': True, 'lowerBound': False}
+
+CSV_FIELDS = ['candidate', 'status', 'blocks', 'meanRank', 'meanDeviation', 'infeasible']
+
+
+# Every combination of the tuned values
+def createCandidates(config):
+    names = [paramName for _, paramName in TUNED_PARAMETERS]
+    values = [config.__dict__[listName] for listName, _ in TUNED_PARAMETERS]
+    return [dict(zip(names, combination)) for combination in itertools.product(*values)]
+
+
+def candidateName(candidate):
+    return ' '.join('%s=%s' % (name, value) for name, value in candidate.items())
+
+
+# Ranks of the objectives of a block (1 = best), tied objectives get the mean of their ranks
+def ranks(objectives):
+    order = sorted(range(len(objectives)), key=lambda i: objectives[i])
+    result = [0.0] * len(objectives)
+    first = 0
+    while first < len(order):
+        last = first
+        while last + 1 < len(order) and objectives[order[last + 1]] == objectives[order[first]]:
+            last += 1
+        for position in range(first, last + 1):
+            result[order[position]] = (first + last) / 2.0 + 1
+        first = last + 1
+    return result
+
+
+# One-sided sign test: probability of losing at least `losses` of the losses + wins untied blocks if both
+# candidates were equally good
+def signTest(losses, wins):
+    n = losses + wins
+    if n == 0:
+        return 1.0
+    combinations = sum(math.factorial(n) // (math.factorial(k) * math.factorial(n - k)) for k in range(losses, n + 1))
+    return combinations / 2.0 ** n
+
+
+# State of a pool worker: the instances it has already read and precomputed, by input data file.
+# It is set by _initWorker when the process starts.
+_worker = {}
+
+
+def _initWorker():
+    _worker['instances'] = {}
+
+
+# Objective of one run of a candidate configuration, infinity if it found no feasible solution
+def _runCandidate(config):
+    instances = _worker['instances']
+    if config.inputDataFile not in instances:
+        instances[config.inputDataFile] = Instance(config, readInstance(config.inputDataFile))
+    solution = Solver_GRASP(config, instances[config.inputDataFile]).solve()
+    return solution.cost if solution.isFeasible() else float('infinity')
+
+
+# Race of the candidate configurations. Each block of the race is an <instance, seed> pair solved by every
+# candidate still in the race with the same seed. Once minBlocks blocks have been solved, a candidate is dropped
+# when the sign test over the blocks says it is worse than the candidate with the best mean rank.
+class RacingTuner(object):
+    def __init__(self, config):
+        self.config = config
+        self.baseConfig = DATParser.parse(config.solverConfigFile)
+        self.candidates = createCandidates(config)
+        self.instanceFiles = [os.path.join(config.instancesDirectory, name) for name in config.instances]
+        # objectives[c][b]: objective of candidate c on block b
+        self.objectives = [[] for _ in self.candidates]
+        self.alive = list(range(len(self.candidates)))
+        self.eliminatedAt = [None] * len(self.candidates)
+        self.numBlocks = 0
+        # fail early on candidates the solver does not accept
+        for candidate in self.candidates:
+            self.solverConfig(candidate, 0)
+
+    # Block b: instance b mod number of instances, solved with seed + b div number of instances
+    def block(self, b):
+        numInstances = len(self.instanceFiles)
+        return self.instanceFiles[b % numInstances], self.config.seed + b // numInstances
+
+    def solverConfig(self, candidate, b):
+        config = copy.copy(self.baseConfig)
+        config.__dict__.update(FIXED_PARAMETERS)
+        config.__dict__.update(candidate)
+        config.inputDataFile, config.seed = self.block(b)
+        config.solutionFile = os.path.join(self.config.resultsDirectory, 'race.sol')
+        config.verbose = False
+        config.__dict__.pop('traceFormat', None)
+        config.workers = 1
+        config.maxExecTime = self.config.maxExecTime
+        if self.config.maxIterations is not None:
+            config.maxIterations = self.config.maxIterations
+        ValidateConfig.validate(config)
+        return config
+
+    def run(self):
+        pool = None
+        if self.config.workers > 1:
+            pool = multiprocessing.Pool(self.config.workers, initializer=_initWorker)
+        else:
+            _initWorker()
+        try:
+            while len(self.alive) > 1 and self.numBlocks < self.config.maxBlocks:
+                # with few candidates left, several blocks are solved at once to keep every worker busy
+                numBlocks = min(self.config.maxBlocks - self.numBlocks,
+                                max(1, math.ceil(self.config.workers / len(self.alive))))
+                blocks = range(self.numBlocks, self.numBlocks + numBlocks)
+                runs = [(c, b) for b in blocks for c in self.alive]
+                configs = [self.solverConfig(self.candidates[c], b) for c, b in runs]
+                objectives = pool.map(_runCandidate, configs, chunksize=1) if pool else map(_runCandidate, configs)
+                for (c, b), objective in zip(runs, objectives):
+                    self.objectives[c].append(objective)
+                self.numBlocks += numBlocks
+
+                if self.numBlocks >= self.config.minBlocks:
+                    self.eliminate()
+                print('Block %3d: %3d candidates left, best %s' % (self.numBlocks, len(self.alive),
+                                                                   candidateName(self.candidates[self.leader()])))
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+        return self.candidates[self.leader()]
+
+    # Mean rank of the candidates still in the race over all the blocks
+    def meanRanks(self):
+        total = {c: 0.0 for c in self.alive}
+        for b in range(self.numBlocks):
+            for c, rank in zip(self.alive, ranks([self.objectives[c][b] for c in self.alive])):
+                total[c] += rank
+        return {c: total[c] / max(1, self.numBlocks) for c in self.alive}
+
+    def leader(self):
+        meanRanks = self.meanRanks()
+        return min(self.alive, key=lambda c: (meanRanks[c], c))
+
+    def eliminate(self):
+        leader = self.leader()
+        best = self.objectives[leader]
+        for c in list(self.alive):
+            if c == leader: continue
+            losses = sum(1 for objective, bestObjective in zip(self.objectives[c], best) if objective > bestObjective)
+            wins = sum(1 for objective, bestObjective in zip(self.objectives[c], best) if objective < bestObjective)
+            if signTest(losses, wins) < self.config.significance:
+                self.alive.remove(c)
+                self.eliminatedAt[c] = self.numBlocks
+
+    # One line per candidate: blocks solved, mean rank among the candidates left, mean deviation (in %) from the best
+    # objective found in each block and number of runs without a feasible solution
+    def summary(self):
+        meanRanks = self.meanRanks()
+        bestOfBlock = [min(self.objectives[c][b] for c in range(len(self.candidates)) if b < len(self.objectives[c]))
+                       for b in range(self.numBlocks)]
+        leader = self.leader()
+        rows = []
+        for c, candidate in enumerate(self.candidates):
+            deviations = [100.0 * (objective - best) / best for objective, best in zip(self.objectives[c], bestOfBlock)
+                          if objective != float('infinity') and 0 < best < float('infinity')]
+            if c == leader:
+                status = 'best'
+            elif self.eliminatedAt[c] is None:
+                status = 'not discarded'
+            else:
+                status = 'discarded at block %d' % self.eliminatedAt[c]
+            rows.append({'candidate': candidateName(candidate), 'status': status, 'blocks': len(self.objectives[c]),
+                         'meanRank': meanRanks.get(c), 'infeasible': self.objectives[c].count(float('infinity')),
+                         'meanDeviation': sum(deviations) / len(deviations) if deviations else None})
+        infinity = float('infinity')
+        rows.sort(key=lambda row: (-row['blocks'], row['meanRank'] if row['meanRank'] is not None else infinity,
+                                   row['meanDeviation'] if row['meanDeviation'] is not None else infinity))
+        return rows
+
+    # The solver configuration file with the parameters of the best candidate
+    def writeBestConfig(self, candidate, filePath):
+        with open(self.config.solverConfigFile, 'r') as f:
+            text = f.read()
+        parameters = dict(FIXED_PARAMETERS)
+        parameters.update(candidate)
+        for name, value in parameters.items():
+            statement = re.compile(r'^(\s*%s\s*=\s*)[^;]*;' % re.escape(name), re.MULTILINE)
+            if statement.search(text) is None:
+                text += '%s = %s;\n' % (name, value)
+            else:
+                text = statement.sub(lambda match: '%s%s;' % (match.group(1), value), text, count=1)
+        with open(filePath, 'w') as f:
+            f.write(text)
+
+    def writeResults(self, candidate):
+        directory = self.config.resultsDirectory
+        os.makedirs(directory, exist_ok=True)
+        csvFile = os.path.join(directory, 'race.csv')
+        with open(csvFile, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            writer.writerows(self.summary())
+        configFile = os.path.join(directory, 'best_config.dat')
+        self.writeBestConfig(candidate, configFile)
+        return csvFile, configFile
@@ -0,0 +1,75 @@
+"""
+AMMM Project
+Shared helpers of the tests
+Eloy Marín, Pablo Pazos
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from Heuristics.datParser import DATAttributes, DATParser
+from Heuristics.problem.instance import Instance
+from Heuristics.validateInputDataProject import ValidateInputData
+from Heuristics.ValidateConfig import ValidateConfig
+
+DATA_DIR = os.path.join(ROOT, 'Heuristics', 'data')
+
+
+# Solver configuration of the repository for the given input data file, quiet and without the on-disk cache
+def makeConfig(inputDataFile=os.path.join(DATA_DIR, 'project.1.dat'), **parameters):
+    config = DATParser.parse(os.path.join(ROOT, 'Heuristics', 'config', 'config.dat'))
+    config.inputDataFile = inputDataFile
+    config.verbose = False
+    config.useCache = False
+    config.lowerBound = False
+    config.__dict__.update(parameters)
+    ValidateConfig.validate(config)
+    return config
+
+
+# Instance of a data file of Heuristics/data
+def loadInstance(name, **parameters):
+    inputDataFile = os.path.join(DATA_DIR, '%s.dat' % name)
+    data = DATParser.parse(inputDataFile)
+    ValidateInputData.validate(data)
+    return Instance(makeConfig(inputDataFile, **parameters), data)
+
+
+# Instance built from the given values
+def makeInstance(p, posCities, posLocations, d_city, cap, cost, d_center):
+    data = DATAttributes()
+    data.nLocations, data.nCities, data.nTypes = len(posLocations), len(posCities), len(d_city)
+    data.p, data.posCities, data.posLocations = p, posCities, posLocations
+    data.d_city, data.cap, data.cost, data.d_center = d_city, cap, cost, d_center
+    ValidateInputData.validate(data)
+    return Instance(makeConfig(), data)
+
+
+# Check every constraint of a complete solution from scratch and its cost
+def checkFeasible(solution):
+    kernel = solution.kernel
+    assert (solution.primary >= 0).all() and (solution.secondary >= 0).all()
+    assert (solution.primary != solution.secondary).all()
+    used = np.flatnonzero(solution.type_at >= 0)
+    assert set(np.concatenate([solution.primary, solution.secondary]).tolist()) == set(used.tolist())
+    cost = 0.0
+    for l_id in used.tolist():
+        t_id = solution.type_at[l_id]
+        cost += kernel.cost[t_id]
+        load = 0
+        for role, centers in enumerate((solution.primary, solution.secondary)):
+            cities = np.flatnonzero(centers == l_id)
+            for c_id in cities.tolist():
+                assert kernel.distance(c_id, l_id) <= kernel.reach[t_id, role]
+            load += kernel.demand[cities, role].sum()
+        assert load == solution.load[l_id]
+        assert load <= kernel.cap[t_id]
+        for other in used.tolist():
+            assert other == l_id or kernel.compatible[l_id, other]
+    assert cost == pytest.approx(solution.cost)
@@ -0,0 +1,58 @@
+"""
+AMMM Project
+Tests of the incremental candidate list and the restricted candidate list
+Eloy Marín, Pablo Pazos
+"""
+
+import random
+
+import pytest
+
+from conftest import loadInstance
+from Heuristics.problem.candidateList import CandidateList
+
+ALPHAS = [0.0, 0.1, 0.3, 1.0]
+
+
+def key(assignment):
+    return (assignment.city.getId(), assignment.location.getId(), assignment.type.get_id(), assignment.is_primary,
+            assignment.cost)
+
+
+# Random constructions: at every step the incremental candidate list matches a candidate list rebuilt from scratch
+# and the restricted candidate list matches the sorted list of candidates cut at the GRASP boundary
+@pytest.mark.parametrize('name', ['project.1', 'instance_0', 'instance_1', 'alpha_tuning2'])
+@pytest.mark.parametrize('seed', [0, 1])
+def test_incremental_matches_rebuild(name, seed):
+    instance = loadInstance(name)
+    random.seed(seed)
+    solution = instance.createSolution()
+    while not solution.complete:
+        candidateList = solution.getCandidateList()
+        candidates = candidateList.getAssignments()
+        fresh = CandidateList(solution)
+        assert (fresh.mask == candidateList.mask).all()
+        assert (fresh.count == candidateList.count).all()
+        assert (fresh.increment == candidateList.increment).all()
+        assert [key(a) for a in fresh.getAssignments()] == [key(a) for a in candidates]
+        if not candidates:
+            break
+
+        ordered = sorted(candidates, key=lambda a: a.cost)
+        for alpha in ALPHAS:
+            boundary = ordered[0].cost + (ordered[-1].cost - ordered[0].cost) * alpha
+            rcl = candidateList.getRestricted(alpha)
+            assert [key(rcl[i]) for i in range(len(rcl))] == [key(a) for a in ordered if a.cost <= boundary]
+            assert candidateList.numFeasible == len(candidates)
+
+        pick = random.choice(candidates)
+        solution.assign(pick.city, pick.location, pick.type, 'primary' if pick.is_primary else 'secondary',
+                        check_completeness=True)
+
+
+def test_restricted_index_out_of_range():
+    solution = loadInstance('project.1').createSolution()
+    rcl = solution.getCandidateList().getRestricted(0.0)
+    assert len(rcl) > 0
+    with pytest.raises(IndexError):
+        rcl[len(rcl)]
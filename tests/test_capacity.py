@@ -0,0 +1,62 @@
+"""
+AMMM Project
+Tests of the capacity constraint when a center is filled exactly
+Eloy Marín, Pablo Pazos
+"""
+
+import pytest
+
+from conftest import makeInstance
+from Heuristics.problem.assignmentKernel import PRIMARY, SECONDARY
+from Heuristics.problem.candidateList import CandidateList
+
+CHEAP = 0
+LARGE = 1
+
+
+# One location to fill and a far away one. The cities are all at the first location, with the given populations
+# and roles; the cheap type has capacity cap and the large one is more expensive.
+def fill(populations, roles, cap):
+    instance = makeInstance(p=populations + [1], posCities=[[0, 0]] * (len(populations) + 1),
+                            posLocations=[[0, 0], [20, 0]], d_city=[5, 5], cap=[cap, 1000], cost=[1, 10],
+                            d_center=1)
+    solution = instance.createSolution()
+    for c_id, role in list(enumerate(roles))[:-1]:
+        assert solution.assignCenter(c_id, 0, CHEAP, role)
+    return solution
+
+
+# (populations, roles, capacity): 105 + 1 = 106 and 34.2 + 1.8 = 36 inhabitants
+CASES = [([105, 10], [PRIMARY, SECONDARY], 106), ([342, 18], [SECONDARY, SECONDARY], 36),
+         ([7, 3, 6], [SECONDARY, SECONDARY, PRIMARY], 7)]
+
+
+@pytest.mark.parametrize('populations, roles, cap', CASES)
+def test_exact_fit_is_feasible(populations, roles, cap):
+    solution = fill(populations, roles, cap)
+    c_id, role = len(roles) - 1, roles[-1]
+    assert solution.rejectionReason(c_id, 0, CHEAP, role) is None
+
+    # the kernel and the candidate list agree
+    state = solution.getAssignmentState()
+    pairs = solution.kernel.cityPairs(c_id)
+    pair = pairs[solution.kernel.pairLocation[pairs] == 0][0]
+    assert solution.kernel.evaluatePairs(state, [pair])[0, CHEAP, role]
+    assert CandidateList(solution).mask[pair, CHEAP, role]
+
+    assert solution.assignCenter(c_id, 0, CHEAP, role)
+    assert solution.load[0] == solution.kernel.cap[CHEAP]
+    # the cheapest type that fits the load is the one that is filled exactly
+    assert solution.getCheapestType(0).get_id() == CHEAP
+    assert solution.kernel.cheapestTypes(solution.maxNeed[[0]], solution.load[[0]])[0] == CHEAP
+
+
+@pytest.mark.parametrize('populations, roles, cap', CASES)
+def test_one_more_inhabitant_is_rejected(populations, roles, cap):
+    solution = fill(populations, roles, cap)
+    assert solution.assignCenter(len(roles) - 1, 0, CHEAP, roles[-1])
+    # the last city has one inhabitant: its secondary role adds 0.1 to the full center
+    extra = len(populations)
+    assert solution.rejectionReason(extra, 0, CHEAP, SECONDARY) == 'capacity'
+    assert solution.rejectionReason(extra, 0, LARGE, SECONDARY) is None
+    assert not solution.getCandidateList().mask[solution.kernel.cityPairs(extra), CHEAP, SECONDARY].any()
@@ -0,0 +1,47 @@
+"""
+AMMM Project
+Tests of the feasibility of the solutions found by the local search neighborhoods
+Eloy Marín, Pablo Pazos
+"""
+
+import random
+import time
+
+import pytest
+
+from conftest import checkFeasible, loadInstance, makeConfig
+from Heuristics.solvers.localSearch import LocalSearch
+from Heuristics.solvers.solver_GRASP import Solver_GRASP
+
+NEIGHBORHOODS = ['Reassignment', 'TaskExchange', 'CloseCenter', 'Relocation']
+POLICIES = ['FirstImprovement', 'BestImprovement']
+
+
+# GRASP constructions improved by the local search: every neighbor it moves to and its result are feasible
+# and their cost is the one of their centers
+@pytest.mark.parametrize('neighborhood', NEIGHBORHOODS)
+@pytest.mark.parametrize('policy', POLICIES)
+@pytest.mark.parametrize('name', ['project.1', 'instance_1', 'instance_2'])
+def test_local_search_keeps_solutions_feasible(neighborhood, policy, name):
+    instance = loadInstance(name)
+    config = makeConfig(localSearch=True, neighborhoodStrategy=neighborhood, policy=policy)
+    for seed in range(3):
+        random.seed(seed)
+        solution = Solver_GRASP(config, instance)._greedyRandomizedConstruction(0.3)
+        if not solution.isFeasible():
+            continue
+        checkFeasible(solution)
+        constructionCost = solution.cost
+
+        # one exploration, then the whole search
+        localSearch = LocalSearch(config, None)
+        solution.startTrail()
+        neighbor = localSearch.exploreNeighborhood(solution)
+        if neighbor is not None:
+            checkFeasible(neighbor)
+        solution.stopTrail()
+        checkFeasible(solution)
+
+        result = localSearch.solve(solution=solution, startTime=time.time(), endTime=time.time() + 60)
+        checkFeasible(result)
+        assert result.cost <= constructionCost
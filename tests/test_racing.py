@@ -0,0 +1,50 @@
+"""
+AMMM Project
+Tests of the statistics of the racing tuner
+Eloy Marín, Pablo Pazos
+"""
+
+import math
+
+import pytest
+
+from Tuner.racing import ranks, signTest
+
+
+@pytest.mark.parametrize('objectives, expected', [
+    ([3.0, 1.0, 2.0], [3.0, 1.0, 2.0]),
+    ([1.0, 1.0, 2.0], [1.5, 1.5, 3.0]),
+    ([5.0, 2.0, 5.0, 2.0, 5.0], [4.0, 1.5, 4.0, 1.5, 4.0]),
+    ([7.0, 7.0, 7.0], [2.0, 2.0, 2.0]),
+    ([float('infinity'), 4.0, float('infinity')], [2.5, 1.0, 2.5]),
+    ([4.0], [1.0]),
+    ([], []),
+])
+def test_ranks(objectives, expected):
+    assert ranks(objectives) == expected
+
+
+def test_ranks_sum():
+    objectives = [3.0, 1.0, 3.0, 2.0, 2.0, 9.0]
+    assert sum(ranks(objectives)) == len(objectives) * (len(objectives) + 1) / 2
+
+
+@pytest.mark.parametrize('losses, wins, expected', [
+    (0, 0, 1.0),
+    (3, 0, 1 / 8.0),
+    (0, 3, 1.0),
+    (2, 1, 4 / 8.0),
+    (5, 1, 7 / 64.0),
+])
+def test_sign_test(losses, wins, expected):
+    assert signTest(losses, wins) == pytest.approx(expected)
+
+
+# the probability of the binomial tail with p = 1/2
+@pytest.mark.parametrize('n', [1, 4, 9, 20])
+def test_sign_test_is_a_binomial_tail(n):
+    for losses in range(n + 1):
+        tail = sum(math.comb(n, k) for k in range(losses, n + 1)) / 2.0 ** n
+        assert signTest(losses, n - losses) == pytest.approx(tail)
+        if losses > 0:
+            assert signTest(losses, n - losses) <= signTest(losses - 1, n - losses + 1)
@@ -0,0 +1,45 @@
+"""
+AMMM Project
+Tests of the spatial grid against a brute force search
+Eloy Marín, Pablo Pazos
+"""
+
+import numpy as np
+import pytest
+
+from Heuristics.problem.spatialIndex import SpatialGrid
+
+
+# Pairs <query, point> at distance <= radius sorted by distance, then point id, computed over every pair
+def bruteForce(queries, points, radius):
+    indptr = [0]
+    indices = []
+    distances = []
+    for query in queries:
+        d = np.sqrt(((points - query) ** 2).sum(axis=1))
+        within = [i for i in sorted(range(len(points)), key=lambda i: (d[i], i)) if d[i] <= radius]
+        indices.extend(within)
+        distances.extend(d[within].tolist())
+        indptr.append(len(indices))
+    return indptr, indices, distances
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('cellSize, radius', [(3.0, 3.0), (1.0, 4.5), (10.0, 2.0), (0.0, 5.0)])
+def test_pairs_within_matches_brute_force(seed, cellSize, radius):
+    rng = np.random.default_rng(seed)
+    # integer coordinates give points exactly at the radius and repeated points
+    points = rng.integers(-20, 20, size=(60, 2)).astype(float)
+    queries = np.vstack([rng.integers(-25, 25, size=(40, 2)), rng.uniform(-25, 25, size=(40, 2))])
+    indptr, indices, distances = SpatialGrid(points, cellSize).pairsWithin(queries, radius)
+    expected = bruteForce(queries, points, radius)
+    assert indptr.tolist() == expected[0]
+    assert indices.tolist() == expected[1]
+    assert distances.tolist() == pytest.approx(expected[2])
+
+
+def test_no_queries_and_no_points():
+    indptr, indices, distances = SpatialGrid(np.empty((0, 2)), 1.0).pairsWithin([[0, 0], [1, 1]], 2.0)
+    assert indptr.tolist() == [0, 0, 0] and len(indices) == 0 and len(distances) == 0
+    indptr, indices, distances = SpatialGrid([[0, 0]], 1.0).pairsWithin(np.empty((0, 2)), 2.0)
+    assert indptr.tolist() == [0] and len(indices) == 0 and len(distances) == 0